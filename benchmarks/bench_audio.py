@@ -0,0 +1,50 @@
+"""
+Real-time factor of the offline audio renderer (seconds of audio rendered
+per second of computation), for a synth arrangement and a drum map.
+
+    python benchmarks/bench_audio.py
+"""
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.audio import Synth, Sampler, render_blocks
+import time
+import numpy as np
+
+
+def make_arrangement(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    grid = np.arange(16 * bars)
+    drums, chords = [], []
+    for pitch in [36, 38, 42, 46, 49, 51]:
+        start_time_vector = Sine_Zeros(rng.integers(2, 14), 16, repeat=bars).project(grid).multiply(0.25)
+        velocity_vector = Vector(100).resize(len(start_time_vector)).rvs_normal(scale=10, rng=rng).clip(1, 127)
+        drums.append(Sequence(start_time_vector, Vector(pitch), velocity_vector, Vector(0.25)))
+    for voice in [48, 52, 55, 59]:
+        start_time_vector = Vector(np.arange(2 * bars) * 2.0)
+        pitch_vector = Vector(rng.integers(voice, voice + 5, 2 * bars))
+        chords.append(Sequence(start_time_vector, pitch_vector, Vector(80), Vector(1.5)))
+    return drums, chords
+
+
+def measure(sequences, voice, sample_rate):
+    start = time.perf_counter()
+    samples = sum(len(block) for block in render_blocks(sequences, voice, sample_rate=sample_rate))
+    elapsed = time.perf_counter() - start
+    return samples / sample_rate, elapsed
+
+
+def main(bars=64, sample_rate=44100):
+    rng = np.random.default_rng(0)
+    drums, chords = make_arrangement(bars)
+    samples = {pitch: rng.uniform(-1, 1, int(0.3 * sample_rate)) * np.exp(-np.arange(int(0.3 * sample_rate)) / 2000)
+               for pitch in [36, 38, 42, 46, 49, 51]}
+    for label, sequences, voice in [
+        ("synth (4 voices)", chords, Synth("saw")),
+        ("drum map (6 voices)", drums, Sampler(samples)),
+    ]:
+        duration, elapsed = measure(sequences, voice, sample_rate)
+        print(f"{label}: {duration:.1f} s of audio in {elapsed:.3f} s (real-time factor {duration / elapsed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Throughput of the MIDI reader (notes per second), for a single file and for
+a directory read by worker processes.
+
+    python benchmarks/bench_midi_import.py
+"""
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.midi import midi_bytes, read_midi, read_midi_dir
+import os
+import tempfile
+import time
+import numpy as np
+
+
+def make_file(bars, voices=6, seed=0):
+    rng = np.random.default_rng(seed)
+    grid = np.arange(16 * bars)
+    tracks = []
+    for voice in range(voices):
+        start_time_vector = Sine_Zeros(rng.integers(2, 14), 16, repeat=bars).project(grid).multiply(0.25)
+        velocity_vector = Vector(100).resize(len(start_time_vector)).rvs_normal(scale=10, rng=rng).clip(1, 127)
+        tracks.append(Sequence(start_time_vector, Vector(36 + voice), velocity_vector, Vector(0.25)))
+    return midi_bytes(tracks)
+
+
+def main():
+    data = make_file(bars=2000)
+    start = time.perf_counter()
+    sequence = read_midi(data)
+    elapsed = time.perf_counter() - start
+    print(f"single file: {len(sequence)} notes in {elapsed:.3f} s ({len(sequence) / elapsed:,.0f} notes/s)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for index in range(32):
+            with open(os.path.join(directory, f"{index:03d}.mid"), "wb") as f:
+                f.write(make_file(bars=200, seed=index))
+        for processes in [0, None]:
+            start = time.perf_counter()
+            sequences = read_midi_dir(directory, processes=processes)
+            elapsed = time.perf_counter() - start
+            notes = sum(len(sequence) for sequence in sequences.values())
+            label = "serial" if processes == 0 else "parallel"
+            print(f"directory ({label}): {len(sequences)} files, {notes} notes in {elapsed:.3f} s ({notes / elapsed:,.0f} notes/s)")
+
+
+if __name__ == "__main__":
+    main()
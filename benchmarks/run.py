@@ -0,0 +1,226 @@
+"""
+Benchmark suite of the hot paths (time and peak memory).
+
+    python benchmarks/run.py                 # run and compare with the baseline
+    python benchmarks/run.py --save          # run and store the baseline
+    python benchmarks/run.py --filter project --threshold 0.5
+
+Each benchmark is run for several input sizes. The best time of `--repeat`
+runs and the peak memory traced by `tracemalloc` are reported. When a
+baseline file exists, results slower or using more memory than the baseline
+by more than `--threshold` (relative) are flagged and the exit code is 1.
+"""
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.midi import midi_bytes, read_midi
+from orthophonic.ableton import send_notes
+from orthophonic.audio import render_audio
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+BENCHMARKS = {}
+
+
+def benchmark(name, sizes):
+    """
+    Register a benchmark.
+
+    The decorated function takes a size and returns a function running the
+    measured operation (the preparation is not measured).
+    """
+    def decorator(function):
+        BENCHMARKS[name] = (function, sizes)
+        return function
+    return decorator
+
+
+def make_sequence(size, seed=0):
+    rng = np.random.default_rng(seed)
+    start_time_vector = Vector(np.sort(rng.integers(0, 4 * size, size)) / 4)
+    pitch_vector = Vector(rng.integers(36, 60, size))
+    velocity_vector = Vector(rng.integers(60, 127, size))
+    return Sequence(start_time_vector, pitch_vector, velocity_vector, Vector(0.25))
+
+
+@benchmark("vector.project", sizes=[1000, 100000, 1000000])
+def bench_project(size):
+    array = np.random.default_rng(0).uniform(0, size / 10, size)
+    grid = np.arange(size // 10)
+    return lambda: Vector(array).project(grid, scale=0.1)
+
+
+@benchmark("vector.project.small", sizes=[16, 64])
+def bench_project_small(size):
+    array = np.random.default_rng(0).uniform(0, size, size)
+    grid = np.arange(size)
+    return lambda: Vector(array).project(grid)
+
+
+@benchmark("vector.direct_sum", sizes=[100, 1000])
+def bench_direct_sum(size):
+    first = Vector(np.arange(size))
+    second = np.arange(size)
+    return lambda: first.direct_sum(second)
+
+
+@benchmark("sine_zeros", sizes=[16, 4096, 262144])
+def bench_sine_zeros(size):
+    return lambda: Sine_Zeros(7, 16, theta=0.3, repeat=size // 7 + 1).project(np.arange(16 * (size // 7 + 1)))
+
+
+@benchmark("sequence.init", sizes=[100, 10000, 1000000])
+def bench_sequence(size):
+    rng = np.random.default_rng(0)
+    start_time = np.sort(rng.uniform(0, size, size))
+    pitch = rng.integers(36, 60, size)
+    return lambda: Sequence(Vector(start_time), Vector(pitch), Vector(100), Vector(0.25))
+
+
+@benchmark("sequence.init_defaults", sizes=[100, 10000, 1000000])
+def bench_sequence_defaults(size):
+    rng = np.random.default_rng(0)
+    start_time = np.sort(rng.uniform(0, size, size))
+    return lambda: Sequence(Vector(start_time), Vector(36))
+
+
+@benchmark("midi.write", sizes=[100, 10000, 200000])
+def bench_write_midi(size):
+    sequence = make_sequence(size)
+    return lambda: midi_bytes([sequence])
+
+
+@benchmark("midi.read", sizes=[100, 10000, 200000])
+def bench_read_midi(size):
+    data = midi_bytes([make_sequence(size)])
+    return lambda: read_midi(data)
+
+
+class NullTransport:
+    def cmd(self, msg, args=()):
+        pass
+
+
+class NullClip:
+    class track:
+        index = 0
+    index = 0
+
+
+@benchmark("ableton.send_notes", sizes=[100, 10000])
+def bench_send_notes(size):
+    notes = make_sequence(size).notes
+    return lambda: send_notes(NullClip(), notes, NullTransport())
+
+
+@benchmark("audio.render", sizes=[100, 2000])
+def bench_render_audio(size):
+    sequence = make_sequence(size)
+    return lambda: render_audio(sequence, sample_rate=22050)
+
+
+def measure(run, repeat):
+    """
+    Return the best time (in seconds) and the peak traced memory (in bytes) of a function.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_suite(filter=None, repeat=5, max_size=None):
+    """
+    Run the registered benchmarks.
+
+    Returns
+    -------
+    dict
+        The {"time": seconds, "memory": bytes} of each "name[size]".
+    """
+    results = {}
+    for name, (function, sizes) in BENCHMARKS.items():
+        if filter is not None and filter not in name:
+            continue
+        for size in sizes:
+            if max_size is not None and size > max_size:
+                continue
+            seconds, peak = measure(function(size), repeat)
+            results[f"{name}[{size}]"] = {"time": seconds, "memory": peak}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Return the regressions of results with respect to a baseline.
+
+    Returns
+    -------
+    list of str
+        A message for each measure exceeding the baseline by more than `threshold`.
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        for measure_name in ("time", "memory"):
+            reference = baseline[key][measure_name]
+            if reference > 0 and result[measure_name] > reference * (1 + threshold):
+                ratio = result[measure_name] / reference
+                regressions.append(f"{key} {measure_name}: {ratio:.2f}x baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filter", help="run only the benchmarks whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs (default 5)")
+    parser.add_argument("--max-size", type=int, help="skip the sizes above this value")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative regression threshold (default 0.25)")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.filter, args.repeat, args.max_size)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{'benchmark':<36}{'time (ms)':>12}{'memory (MB)':>14}{'vs baseline':>14}")
+    for key, result in results.items():
+        ratio = ""
+        if key in baseline and baseline[key]["time"] > 0:
+            ratio = f"{result['time'] / baseline[key]['time']:.2f}x"
+        print(f"{key:<36}{1000 * result['time']:>12.3f}{result['memory'] / 1e6:>14.3f}{ratio:>14}")
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
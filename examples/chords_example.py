@@ -1,8 +1,8 @@
 from orthophonic.sequence import Sequence
 from orthophonic.base import Vector, Sine_Zeros
-from orthophonic.utils import generate_scale, generate_grid, create_clip
+from orthophonic.utils import generate_scale_table, generate_grid, create_clip
 import numpy as np
-import live
+from orthophonic.session import Session
 
 # initial parameters
 theta = 1/6  # minor grid (see upcoming paper)
@@ -11,7 +11,7 @@ clip_index = 1
 track_index = 3
 
 # generate scale from projection and master grid
-scale = generate_scale(root=40, theta=theta) # (see upcoming paper)
+scale = generate_scale_table(root=40, theta=theta) # (see upcoming paper)
 grid = generate_grid(N=16, repeat=repeat)
 
 # pitch progression (numpy spirit)
@@ -27,7 +27,7 @@ v4 = Sine_Zeros(5, 16, repeat=repeat).add(5)
 v_list = [v1, v2, v3, v4]
 
 # connect to Ableton / create clip
-set = live.Set(scan=True)
+set = Session()
 clip = create_clip(set, track_index, clip_index, 16, erase=True)
 
 for index, v in enumerate(v_list):
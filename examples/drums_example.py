@@ -2,7 +2,7 @@ from orthophonic.base import Vector, Sine_Zeros
 from orthophonic.utils import generate_grid, create_clip
 from orthophonic.sequence import Sequence
 import numpy as np
-import live
+from orthophonic.session import Session
 
 # initial parameters
 track_index = 0
@@ -28,7 +28,7 @@ v_list = [
 pitch_list = [36, 41, 44, 57, 49, 55]
 
 # connect to Ableton / create clip
-set = live.Set(scan=True)
+set = Session()
 clip = create_clip(set, track_index, clip_index, 16, erase=True)
 
 for index, v in enumerate(v_list):
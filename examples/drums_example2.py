@@ -1,7 +1,7 @@
 from orthophonic.base import Vector, Sine_Zeros
 from orthophonic.utils import generate_grid, create_clip
 from orthophonic.sequence import Sequence
-import live
+from orthophonic.session import Session
 import numpy as np
 
 # initial parameters
@@ -27,7 +27,7 @@ v_list = [
 pitch_list = [36, 41, 44, 52, 61, 55]
 
 # connect to Ableton / create clip
-set = live.Set(scan=True)
+set = Session()
 clip = create_clip(set, track_index, clip_index, 16, erase=True)
 
 for index, v in enumerate(v_list[:6]):
@@ -1,8 +1,6 @@
 from orthophonic.base import Vector, Sine_Zeros
-from orthophonic.utils import generate_grid, save_to_midi
+from orthophonic.utils import generate_grid, save_sequences_to_midi
 from orthophonic.sequence import Sequence
-import numpy as np
-import live
 
 # initial parameters
 track_index = 0
@@ -27,8 +25,8 @@ v_list = [
 # generate list of pitch. Each pitch correspond to a note of a the drumkit
 pitch_list = [36, 41, 44, 57, 49, 55]
 
-# sort list of notes
-note_list = []
+# one track per drum voice (channel 10 is the General MIDI drum channel)
+arrangement = []
 
 for index, v in enumerate(v_list):
     pitch = pitch_list[index]
@@ -37,7 +35,7 @@ for index, v in enumerate(v_list):
     velocity_vector = Vector(100).resize(len(v)).rvs_normal(scale=10)
     duration_vector = Vector(0.25)
     sequence = Sequence(start_time_vector, pitch_vector, velocity_vector, duration_vector)
-    note_list += sequence.get_notes()
+    arrangement.append((sequence, index, 9))
     
 # export to midi file
-save_to_midi(note_list, filename="data.mid")
+save_sequences_to_midi(arrangement, filename="data.mid")
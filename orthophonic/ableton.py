@@ -0,0 +1,276 @@
+import time
+import numpy as np
+
+
+# number of notes packed in a single /live/clip/add/notes message
+# (5 arguments per note, keeps each datagram well below the UDP size limit)
+MAX_NOTES_PER_MESSAGE = 256
+
+# time span (in beats) of the /live/clip/remove/notes range used to delete a single note
+REMOVE_TIME_SPAN = 1e-3
+
+
+class OSCTransport:
+    """
+    A fire-and-forget OSC transport to AbletonOSC.
+
+    Messages are sent over UDP without waiting for any reply, so many messages
+    can be pipelined. It exposes the same `cmd` method as `live.Query`.
+
+    Parameters
+    ----------
+    address : tuple, optional
+        The (host, port) of the AbletonOSC server (default is ("127.0.0.1", 11000)).
+    """
+    def __init__(self, address=("127.0.0.1", 11000)):
+        from pythonosc.udp_client import SimpleUDPClient
+
+        self.address = address
+        self.client = SimpleUDPClient(*address)
+
+    def cmd(self, msg, args=()):
+        """
+        Send an OSC message without expecting a response.
+
+        Parameters
+        ----------
+        msg : str
+            The OSC address (e.g. "/live/clip/add/notes").
+        args : tuple, optional
+            The OSC arguments.
+        """
+        self.client.send_message(msg, list(args))
+
+
+class TransferStats:
+    """
+    Statistics of a bulk transfer to Ableton.
+
+    Attributes
+    ----------
+    notes : int
+        The number of notes sent.
+    messages : int
+        The number of OSC messages sent.
+    elapsed : float
+        The transfer duration in seconds.
+    removed : int
+        The number of note removal requests (see `ClipSync`).
+    """
+    def __init__(self, notes=0, messages=0, elapsed=0.0, removed=0):
+        self.notes = notes
+        self.messages = messages
+        self.elapsed = elapsed
+        self.removed = removed
+
+    @property
+    def notes_per_second(self):
+        """
+        Return the throughput in notes per second.
+        """
+        if self.elapsed == 0:
+            return float("inf") if self.notes else 0.0
+        return self.notes / self.elapsed
+
+    def __repr__(self):
+        return f"TransferStats(notes={self.notes}, messages={self.messages}, removed={self.removed}, elapsed={self.elapsed:.6f}, notes_per_second={self.notes_per_second:.1f})"
+
+
+def send_notes(clip, notes, transport=None, batch_size=MAX_NOTES_PER_MESSAGE):
+    """
+    Send notes to an Ableton clip using as few OSC messages as possible.
+
+    AbletonOSC accepts any number of (pitch, start_time, duration, velocity, mute)
+    groups in a single "/live/clip/add/notes" message, so the notes are packed
+    by chunks of `batch_size` and sent without waiting for Live.
+
+    Parameters
+    ----------
+    clip : live.Clip
+        The destination clip (uses `clip.track.index` and `clip.index`).
+    notes : NoteBatch
+        The notes to send.
+    transport : object, optional
+        An object with a `cmd(msg, args)` method (default is `clip.live`).
+    batch_size : int, optional
+        The maximum number of notes per message (default is MAX_NOTES_PER_MESSAGE).
+
+    Returns
+    -------
+    TransferStats
+        The number of notes and messages sent and the elapsed time.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    if transport is None:
+        transport = clip.live
+
+    start = time.perf_counter()
+    header = (clip.track.index, clip.index)
+    messages = _add_notes(transport, header, notes.data, batch_size)
+    return TransferStats(len(notes.data), messages, time.perf_counter() - start)
+
+
+def _add_notes(transport, header, data, batch_size):
+    """
+    Send the rows of a note array by "/live/clip/add/notes" messages of `batch_size` notes.
+
+    Returns
+    -------
+    int
+        The number of messages sent.
+    """
+    rows = data.tolist()
+    messages = 0
+    for index in range(0, len(rows), batch_size):
+        args = [value for row in rows[index:index + batch_size] for value in row]
+        transport.cmd("/live/clip/add/notes", header + tuple(args))
+        messages += 1
+    return messages
+
+
+def _occurrences(ids):
+    """
+    Return the rank of each element among the previous elements with the same id.
+    """
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    starts = np.flatnonzero(np.r_[True, sorted_ids[1:] != sorted_ids[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(ids)]))
+    rank = np.empty(len(ids), dtype=np.int64)
+    rank[order] = np.arange(len(ids)) - group_start
+    return rank
+
+
+def diff_notes(old, new):
+    """
+    Compare two note arrays as multisets.
+
+    Parameters
+    ----------
+    old, new : np.ndarray
+        Structured arrays of notes (see `orthophonic.sequence.NOTE_DTYPE`).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The masks of the notes of `old` missing from `new` (removed) and of
+        the notes of `new` missing from `old` (added).
+    """
+    rows = np.concatenate([old, new])
+    for field in ("start_time", "duration"):
+        rows[field] += 0.0  # -0.0 and 0.0 are the same note
+    rows = np.ascontiguousarray(rows)
+    keys = rows.view(np.dtype((np.void, rows.dtype.itemsize)))
+    _, ids = np.unique(keys, return_inverse=True)
+    ids = ids.ravel()
+    old_ids, new_ids = ids[:len(old)], ids[len(old):]
+    count = len(ids)
+    old_count = np.bincount(old_ids, minlength=count)
+    new_count = np.bincount(new_ids, minlength=count)
+    removed = _occurrences(old_ids) >= new_count[old_ids]
+    added = _occurrences(new_ids) >= old_count[new_ids]
+    return removed, added
+
+
+def _in_ranges(pitch, start_time, range_pitch, range_start, span):
+    """
+    Return the mask of the notes starting in one of the ranges [range_start, range_start + span) of the same pitch.
+    """
+    mask = np.zeros(len(pitch), dtype=bool)
+    for value in np.unique(range_pitch):
+        starts = np.sort(range_start[range_pitch == value])
+        selected = np.flatnonzero(pitch == value)
+        position = np.searchsorted(starts, start_time[selected], side="right") - 1
+        inside = position >= 0
+        inside[inside] = start_time[selected[inside]] < starts[position[inside]] + span
+        mask[selected[inside]] = True
+    return mask
+
+
+class ClipSync:
+    """
+    Incremental updates of Ableton clips.
+
+    The notes last sent to each (track, clip) are remembered. A new version of
+    the notes is compared with them and only the differences are sent: one
+    "/live/clip/remove/notes" message (pitch, 1, start_time, time_span) per
+    removed (pitch, start_time) and "/live/clip/add/notes" messages for the
+    added notes. A removal range also deletes the unchanged notes starting in
+    it, so these notes are sent again. When the removals and additions
+    outnumber the notes of the clip, the clip is erased and sent again instead.
+
+    The first update of a clip always erases it, as its content is unknown.
+
+    Parameters
+    ----------
+    transport : object, optional
+        An object with a `cmd(msg, args)` method (default is `clip.live`).
+    batch_size : int, optional
+        The maximum number of notes per message (default is MAX_NOTES_PER_MESSAGE).
+    time_span : float, optional
+        The time span of the removal ranges in beats (default is REMOVE_TIME_SPAN).
+    """
+    def __init__(self, transport=None, batch_size=MAX_NOTES_PER_MESSAGE, time_span=REMOVE_TIME_SPAN):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.transport = transport
+        self.batch_size = batch_size
+        self.time_span = time_span
+        self.sent = {}
+
+    def update(self, clip, notes):
+        """
+        Update a clip with new notes.
+
+        Parameters
+        ----------
+        clip : live.Clip
+            The destination clip (uses `clip.track.index` and `clip.index`).
+        notes : NoteBatch
+            The new content of the clip.
+
+        Returns
+        -------
+        TransferStats
+            The number of notes added, of removal requests and of messages.
+        """
+        transport = self.transport if self.transport is not None else clip.live
+        start = time.perf_counter()
+        header = (clip.track.index, clip.index)
+        new = notes.data
+        old = self.sent.get(header)
+
+        if old is None:
+            removed_keys = None
+        else:
+            removed, added = diff_notes(old, new)
+            key_pitch, key_start = np.unique(np.stack([old["pitch"][removed], old["start_time"][removed]]), axis=1)
+            if len(key_pitch):
+                added |= _in_ranges(new["pitch"], new["start_time"], key_pitch.astype(np.int64), key_start, self.time_span)
+            removed_keys = (key_pitch.astype(np.int64), key_start)
+            if len(key_pitch) + added.sum() > 1 + len(new):
+                removed_keys = None
+
+        if removed_keys is None:
+            transport.cmd("/live/clip/remove/notes", header)
+            removals, messages = 1, 1
+            to_send = new
+        else:
+            for pitch, start_time in zip(*[values.tolist() for values in removed_keys]):
+                transport.cmd("/live/clip/remove/notes", header + (pitch, 1, start_time, self.time_span))
+            removals = messages = len(removed_keys[0])
+            to_send = new[added]
+
+        messages += _add_notes(transport, header, to_send, self.batch_size)
+        self.sent[header] = new.copy()
+        return TransferStats(len(to_send), messages, time.perf_counter() - start, removals)
+
+    def forget(self, clip=None):
+        """
+        Forget the notes sent to a clip (or to all clips), so the next update erases it.
+        """
+        if clip is None:
+            self.sent.clear()
+        else:
+            self.sent.pop((clip.track.index, clip.index), None)
@@ -0,0 +1,358 @@
+from .sequence import Sequence, NoteBatch
+import os
+import wave
+import numpy as np
+
+
+class Synth:
+    """
+    A simple oscillator voice.
+
+    The frequency follows the MIDI pitch (A4 = 69 = 440 Hz), the amplitude the
+    velocity. The note is shaped by a linear attack and a linear release
+    starting at the end of the note.
+
+    Parameters
+    ----------
+    waveform : str, optional
+        "sine", "square", "saw" or "triangle" (default is "sine").
+    attack : float, optional
+        The attack time in seconds (default is 0.005).
+    release : float, optional
+        The release time in seconds (default is 0.05).
+    """
+    def __init__(self, waveform="sine", attack=0.005, release=0.05):
+        if waveform not in ("sine", "square", "saw", "triangle"):
+            raise ValueError(f"Unknown waveform {waveform!r}.")
+        self.waveform = waveform
+        self.attack = attack
+        self.release = release
+
+    def lengths(self, pitch, duration, sample_rate):
+        """
+        Return the number of samples of each note.
+        """
+        return duration + int(round(self.release * sample_rate))
+
+    def render(self, pitch, velocity, duration, note, position, sample_rate):
+        """
+        Return the samples at the given positions of the given notes.
+
+        Parameters
+        ----------
+        pitch, velocity, duration : np.ndarray
+            The pitch, velocity and duration (in samples) of each note.
+        note : np.ndarray
+            The note index of each sample.
+        position : np.ndarray
+            The position of each sample from the start of its note.
+        sample_rate : int
+            The sampling rate in Hz.
+        """
+        frequency = 440 * 2 ** ((pitch[note] - 69) / 12)
+        phase = np.mod(frequency * position / sample_rate, 1)
+        if self.waveform == "sine":
+            output = np.sin(2 * np.pi * phase)
+        elif self.waveform == "square":
+            output = np.where(phase < 0.5, 1.0, -1.0)
+        elif self.waveform == "saw":
+            output = 2 * phase - 1
+        else:
+            output = 1 - 4 * np.abs(phase - 0.5)
+
+        envelope = np.ones(len(position))
+        attack = self.attack * sample_rate
+        if attack > 0:
+            np.minimum(envelope, position / attack, out=envelope)
+        release = self.release * sample_rate
+        note_duration = duration[note]
+        if release > 0:
+            np.minimum(envelope, 1 - (position - note_duration) / release, out=envelope)
+        else:
+            envelope[position >= note_duration] = 0
+        output *= envelope
+        output *= velocity[note] / 127
+        return output
+
+
+class Sampler:
+    """
+    A one-shot sample player keyed by pitch (e.g. a drum map).
+
+    Each note plays its whole sample, whatever its duration. The notes whose
+    pitch has no sample are silent. The samples recorded at another sampling
+    rate than the rendering one are resampled (linear interpolation, once per
+    rendering rate).
+
+    Parameters
+    ----------
+    samples : dict
+        A dict mapping each pitch to a mono sample (np.ndarray of floats in [-1, 1]).
+    sample_rate : int or dict, optional
+        The sampling rate of the samples in Hz, or a dict mapping each pitch to
+        the rate of its sample (default is the rendering rate).
+    """
+    def __init__(self, samples, sample_rate=None):
+        pitches = sorted(samples)
+        self.samples = [np.asarray(samples[pitch], dtype=float).ravel() for pitch in pitches]
+        if isinstance(sample_rate, dict):
+            self.rates = [sample_rate[pitch] for pitch in pitches]
+        else:
+            self.rates = [sample_rate] * len(pitches)
+        self.table = np.full(128, -1, dtype=np.int64)
+        self.table[pitches] = np.arange(len(pitches))
+        self._tables = {}
+
+    @classmethod
+    def from_files(cls, filenames):
+        """
+        Create a Sampler from a dict mapping each pitch to a WAV filename (see `read_wav`).
+
+        The sampling rate of each file is kept (see `Sampler`).
+        """
+        samples, rates = {}, {}
+        for pitch, filename in filenames.items():
+            samples[pitch], rates[pitch] = read_wav(filename)
+        return cls(samples, rates)
+
+    def _resample(self, sample, rate, sample_rate):
+        if rate is None or rate == sample_rate or len(sample) == 0:
+            return sample
+        size = max(int(round(len(sample) * sample_rate / rate)), 1)
+        return np.interp(np.arange(size) * (rate / sample_rate), np.arange(len(sample)), sample)
+
+    def _get_table(self, sample_rate):
+        """
+        Return the sizes, offsets and concatenated data of the samples at a sampling rate.
+        """
+        table = self._tables.get(sample_rate)
+        if table is None:
+            arrays = [self._resample(sample, rate, sample_rate) for sample, rate in zip(self.samples, self.rates)]
+            sizes = np.array([len(array) for array in arrays] + [0], dtype=np.int64)
+            offsets = np.concatenate([[0], np.cumsum(sizes[:-1])]).astype(np.int64)
+            table = self._tables[sample_rate] = (sizes, offsets, np.concatenate(arrays + [np.zeros(1)]))
+        return table
+
+    def _index(self, pitch):
+        return self.table[np.clip(pitch, 0, 127)]
+
+    def lengths(self, pitch, duration, sample_rate):
+        """
+        Return the number of samples of each note.
+        """
+        sizes, _, _ = self._get_table(sample_rate)
+        return sizes[self._index(pitch)]
+
+    def render(self, pitch, velocity, duration, note, position, sample_rate):
+        """
+        Return the samples at the given positions of the given notes (see `Synth.render`).
+        """
+        _, offsets, data = self._get_table(sample_rate)
+        index = self._index(pitch)[note]
+        return data[offsets[index] + position] * (velocity[note] / 127)
+
+
+class Track:
+    """
+    The notes of a sequence in samples, sorted by start, with their voice.
+    """
+    def __init__(self, notes, voice, bpm, sample_rate):
+        if isinstance(notes, Sequence):
+            notes = notes.notes
+        elif not isinstance(notes, NoteBatch):
+            notes = NoteBatch.from_notes(notes)
+        data = notes.data[~notes.mute]
+        samples_per_beat = 60 * sample_rate / bpm
+        start = np.round(data["start_time"] * samples_per_beat).astype(np.int64)
+        order = np.argsort(start, kind="stable")
+        self.start = start[order]
+        self.pitch = data["pitch"][order]
+        self.velocity = data["velocity"][order].astype(float)
+        self.duration = np.round(data["duration"][order] * samples_per_beat).astype(np.int64)
+        self.length = np.asarray(voice.lengths(self.pitch, self.duration, sample_rate), dtype=np.int64)
+        self.length = np.broadcast_to(self.length, self.start.shape)
+        self.max_length = int(self.length.max()) if len(self.length) else 0
+        self.end = self.start + self.length
+        self.voice = voice
+        self.sample_rate = sample_rate
+
+    def add_block(self, output, block_start):
+        """
+        Overlap-add the notes sounding in a block to `output`.
+        """
+        block_end = block_start + len(output)
+        first = np.searchsorted(self.start, block_start - self.max_length, side="right")
+        last = np.searchsorted(self.start, block_end, side="left")
+        index = np.arange(first, last)
+        index = index[self.end[index] > block_start]
+        if len(index) == 0:
+            return
+        start = self.start[index]
+        lower = np.maximum(start, block_start)
+        counts = np.minimum(self.end[index], block_end) - lower
+        total = counts.sum()
+        if total <= 0:
+            return
+        note = np.repeat(index, counts)
+        # position of each sample from the start of its note
+        position = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        position += np.repeat(lower - start, counts)
+        values = self.voice.render(self.pitch, self.velocity, self.duration, note, position, self.sample_rate)
+        output += np.bincount(position + self.start[note] - block_start, weights=values, minlength=len(output))
+
+
+def get_tracks(sequences, voice, bpm, sample_rate):
+    """
+    Return the Tracks of a Sequence, a NoteBatch or a list of them.
+
+    The list can also contain (sequence, voice) tuples to use a specific voice.
+    """
+    if isinstance(sequences, (Sequence, NoteBatch)):
+        sequences = [sequences]
+    tracks = []
+    for item in sequences:
+        item_voice = voice
+        if isinstance(item, tuple):
+            item, item_voice = item
+        tracks.append(Track(item, item_voice, bpm, sample_rate))
+    return tracks
+
+
+def render_blocks(sequences, voice=None, bpm=120, sample_rate=44100, block_size=4096, gain=0.5):
+    """
+    Render sequences to audio, block by block.
+
+    The notes sounding in each block are rendered at once (vectorized) and
+    overlap-added, so the memory depends on the block size and the polyphony,
+    not on the length of the piece.
+
+    Parameters
+    ----------
+    sequences : Sequence, NoteBatch or list
+        The notes to render. A list can contain (sequence, voice) tuples.
+    voice : Synth or Sampler, optional
+        The default voice (default is a sine Synth).
+    bpm : float, optional
+        The tempo in beats per minute (default is 120).
+    sample_rate : int, optional
+        The sampling rate in Hz (default is 44100).
+    block_size : int, optional
+        The number of samples per block (default is 4096).
+    gain : float, optional
+        The output gain (default is 0.5).
+
+    Yields
+    ------
+    np.ndarray
+        The mono blocks (floats, the last block can be shorter).
+    """
+    if voice is None:
+        voice = Synth()
+    tracks = get_tracks(sequences, voice, bpm, sample_rate)
+    length = max([int(track.end.max()) for track in tracks if len(track.end)], default=0)
+    for block_start in range(0, length, block_size):
+        output = np.zeros(min(block_size, length - block_start))
+        for track in tracks:
+            track.add_block(output, block_start)
+        output *= gain
+        yield output
+
+
+def render_audio(sequences, voice=None, bpm=120, sample_rate=44100, block_size=4096, gain=0.5):
+    """
+    Render sequences to a mono buffer (see `render_blocks`).
+
+    Returns
+    -------
+    np.ndarray
+        The samples (floats).
+    """
+    blocks = list(render_blocks(sequences, voice, bpm, sample_rate, block_size, gain))
+    if len(blocks) == 0:
+        return np.zeros(0)
+    return np.concatenate(blocks)
+
+
+def to_pcm16(buffer):
+    """
+    Convert float samples to 16-bit PCM bytes (the samples are clipped to [-1, 1]).
+    """
+    return (np.clip(buffer, -1, 1) * 32767).round().astype("<i2").tobytes()
+
+
+def _wave_file(filename):
+    """
+    Convert an os.PathLike filename to a string (`wave.open` only accepts str or file objects).
+    """
+    if isinstance(filename, os.PathLike):
+        return os.fspath(filename)
+    return filename
+
+
+def write_wav(filename, buffer, sample_rate=44100):
+    """
+    Write a mono float buffer to a 16-bit WAV file.
+
+    Parameters
+    ----------
+    filename : str, os.PathLike or file-like
+        The output file.
+    buffer : np.ndarray
+        The samples (floats in [-1, 1]).
+    sample_rate : int, optional
+        The sampling rate in Hz (default is 44100).
+    """
+    with wave.open(_wave_file(filename), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(to_pcm16(buffer))
+
+
+def read_wav(filename):
+    """
+    Read a 8, 16 or 32-bit PCM WAV file (the channels are mixed down to mono).
+
+    Parameters
+    ----------
+    filename : str, os.PathLike or file-like
+        The input file.
+
+    Returns
+    -------
+    tuple
+        The samples (floats in [-1, 1]) and the sampling rate.
+    """
+    with wave.open(_wave_file(filename), "rb") as f:
+        channels = f.getnchannels()
+        width = f.getsampwidth()
+        sample_rate = f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width == 1:
+        buffer = (np.frombuffer(data, dtype=np.uint8).astype(float) - 128) / 128
+    elif width in (2, 4):
+        dtype = "<i2" if width == 2 else "<i4"
+        buffer = np.frombuffer(data, dtype=dtype) / float(2 ** (8 * width - 1))
+    else:
+        raise ValueError(f"Unsupported sample width {width}.")
+    return buffer.reshape(-1, channels).mean(axis=1), sample_rate
+
+
+def save_to_wav(sequences, filename="output.wav", voice=None, bpm=120, sample_rate=44100, block_size=4096, gain=0.5):
+    """
+    Render sequences to a 16-bit mono WAV file, block by block (see `render_blocks`).
+
+    Returns
+    -------
+    int
+        The number of samples written.
+    """
+    frames = 0
+    with wave.open(_wave_file(filename), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        for block in render_blocks(sequences, voice, bpm, sample_rate, block_size, gain):
+            f.writeframes(to_pcm16(block))
+            frames += len(block)
+    return frames
@@ -1,6 +1,95 @@
+from .instrument import instrument
 import numpy as np
 
 
+# size of the distance matrix (len(array) x len(grid)) above which `Vector.project`
+# switches from the dense argmin search to the sorted-grid binary search
+DENSE_PROJECTION_LIMIT = 4096
+
+
+def get_rng(rng=None):
+    """
+    Return a random generator.
+
+    Parameters
+    ----------
+    rng : None, int or np.random.Generator
+        - None returns the legacy global generator (`np.random`, seeded by `np.random.seed`),
+        - an int or a SeedSequence creates a new `np.random.Generator`,
+        - a `np.random.Generator` is returned as is.
+    """
+    if rng is None:
+        return np.random
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def spawn_generators(seed, n):
+    """
+    Return `n` independent random generators derived from a seed.
+
+    Parameters
+    ----------
+    seed : int, np.random.SeedSequence or None
+        The root seed.
+    n : int
+        The number of generators.
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed.spawn(n)]
+
+
+def _project_dense(array, grid):
+    """
+    Return the nearest element of `grid` for each element of `array` (N*G distance matrix).
+    """
+    return grid[np.argmin(np.abs(array[:, None] - grid), axis=1)]
+
+
+def _project_sorted(array, grid, out=None, chunk_size=65536):
+    """
+    Return the nearest element of `grid` for each element of `array` (binary search).
+
+    The grid is sorted once and each value is compared with its two neighbours.
+    Ties are broken in favour of the grid value appearing first in `grid`, which
+    matches the behaviour of `np.argmin` in `_project_dense`. The values are
+    processed by chunks, so the temporaries do not grow with `len(array)`.
+    """
+    values, first_index = np.unique(grid, return_index=True)
+    last = len(values) - 1
+    if out is None:
+        out = np.empty(len(array), dtype=grid.dtype)
+    # non-finite values have equal (inf or NaN) distances to every grid element
+    invalid = ~np.isfinite(array)
+    for start in range(0, len(array), chunk_size):
+        chunk = array[start:start + chunk_size]
+        right = np.searchsorted(values, chunk)
+        np.minimum(right, last, out=right)
+        left = np.maximum(right - 1, 0)
+        dist_left = np.abs(chunk - values[left])
+        dist_right = np.abs(chunk - values[right])
+        use_right = dist_right < dist_left
+        tie = dist_right == dist_left
+        use_right[tie] = first_index[right[tie]] < first_index[left[tie]]
+
+        # for large values the rounded distances to farther grid elements can tie
+        # with the nearest ones; these values are resolved by the dense search
+        dist = np.minimum(dist_left, dist_right)
+        outer_left = np.maximum(left - 1, 0)
+        outer_right = np.minimum(right + 1, last)
+        invalid[start:start + chunk_size] |= ((outer_left < left) & (np.abs(chunk - values[outer_left]) == dist)) | (
+            (outer_right > right) & (np.abs(chunk - values[outer_right]) == dist))
+
+        np.copyto(left, right, where=use_right)
+        out[start:start + chunk_size] = values[left]
+
+    if invalid.any():
+        out[invalid] = _project_dense(array[invalid], grid)
+    return out
+
+
 class Vector:
     """
     A class representing a mathematical vector with various operations.
@@ -9,9 +98,12 @@ class Vector:
     ----------
     array : np.ndarray
         The underlying array storing vector elements.
+    inplace : bool
+        If True, the operations overwrite the underlying buffer instead of
+        allocating new arrays (see `copy` in `__init__`).
     """
     
-    def __init__(self, data):
+    def __init__(self, data, copy=True):
         """
         Initialize the vector.
 
@@ -20,6 +112,17 @@ class Vector:
         data : int, list, or np.ndarray
             - If `data` is an integer or float, use an array of size 1
             - If `data` is a list or np.ndarray, uses it as the vector content.
+        copy : bool, optional
+            If False, a float np.ndarray is used as the vector buffer without
+            copy and the vector works in place: `clip`, `roll`, `reverse`,
+            `project`, `clear` and `resize` (to a smaller length) reuse the
+            buffer, so a chain of operations does not allocate full-size
+            temporaries (default is True). The caller's array is then owned by
+            the vector: it always holds the current values of the vector (its
+            first elements after `resize` to a smaller length) and is never
+            used for intermediate results. The operations which change the
+            length or the type (`repeat`, `resize` to a larger length, `astype`)
+            allocate a new buffer, which the caller's array no longer follows.
 
         Raises
         ------
@@ -29,9 +132,21 @@ class Vector:
         if isinstance(data, (int, float, np.int64, np.float32)):
             self.array = np.array([data], dtype=float)
         elif isinstance(data, (list, np.ndarray)):
-            self.array = np.array(data, dtype=float)
+            self.array = np.array(data, dtype=float, copy=copy or None)
         else:
             raise ValueError("Invalid input. Provide an integer for size or a list/array-like for content.")
+        self.inplace = not copy
+        self._scratch = None
+
+    def _get_scratch(self):
+        """
+        Return a scratch buffer with the shape and type of the vector (reused between calls).
+
+        The scratch buffer is private: it never becomes the vector buffer.
+        """
+        if self._scratch is None or self._scratch.shape != self.array.shape or self._scratch.dtype != self.array.dtype:
+            self._scratch = np.empty_like(self.array)
+        return self._scratch
 
     def astype(self, dtype):
         """
@@ -42,14 +157,17 @@ class Vector:
         dtype : type
             The desired data type (e.g., np.float32, np.int32).
         """
-        self.array = self.array.astype(dtype)
+        self.array = self.array.astype(dtype, copy=False)
         return self
     
     def clear(self):
         """
         Reset the vector to all zeros.
         """
-        self.array = np.zeros(len(self.array))
+        if self.inplace:
+            self.array.fill(0)
+        else:
+            self.array = np.zeros(len(self.array))
         return self
     
     def multiply(self, scalar):
@@ -80,17 +198,35 @@ class Vector:
         """
         Reverse the elements of the vector.
         """
-        self.array = self.array[::-1]
+        if self.inplace and len(self.array) > 0:
+            scratch = self._get_scratch()
+            scratch[:] = self.array[::-1]
+            self.array[:] = scratch
+        else:
+            self.array = self.array[::-1]
         return self
 
-    def direct_sum(self, data):
+    def direct_sum(self, *data, lazy=False):
         """
-        Direct sum with a vector
-        """
-        array1 = self.array
-        array2 = self.get_array(data)
-        array = np.kron(array1, np.ones(len(array2))) + np.kron(np.ones(len(array1)), array2)
-        return Vector(array)
+        Direct sum with one or several vectors
+
+        The element `i*len(b) + j` of the direct sum of `a` and `b` is `a[i] + b[j]`.
+        The result is computed by broadcasting (see `direct_sum`).
+
+        Parameters
+        ----------
+        *data : list, Vector, np.array
+            The other operands.
+        lazy : bool, optional
+            If True, return a `Lattice` which computes the elements on demand
+            instead of a Vector (default is False).
+        """
+        operands = [self.array] + [self.get_array(d) for d in data]
+        if lazy:
+            return Lattice(*operands)
+        vector = Vector(0)
+        vector.array = direct_sum(*operands)
+        return vector
     
     def set_value(self, pos, value):
         """
@@ -106,7 +242,7 @@ class Vector:
         self.array[pos] = value
         return self
     
-    def rvs_normal(self, loc=0, scale=1):
+    def rvs_normal(self, loc=0, scale=1, rng=None):
         """
         Add normally distributed random noise to the vector.
 
@@ -116,8 +252,10 @@ class Vector:
             Mean of the normal distribution (default is 0).
         scale : float, optional
             Standard deviation of the normal distribution (default is 1).
+        rng : int or np.random.Generator, optional
+            The random generator or its seed (default is the global NumPy generator).
         """
-        self.array += np.random.normal(loc=loc, scale=scale, size=len(self.array))
+        self.array += get_rng(rng).normal(loc=loc, scale=scale, size=len(self.array))
         return self
     
     def roll(self, shift):
@@ -129,7 +267,14 @@ class Vector:
         shift : int
             The number of positions to shift the elements.
         """
-        self.array = np.roll(self.array, shift)
+        if self.inplace and len(self.array) > 0:
+            shift = shift % len(self.array)
+            scratch = self._get_scratch()
+            scratch[shift:] = self.array[:len(self.array) - shift]
+            scratch[:shift] = self.array[len(self.array) - shift:]
+            self.array[:] = scratch
+        else:
+            self.array = np.roll(self.array, shift)
         return self
     
     def repeat(self, times):
@@ -162,25 +307,46 @@ class Vector:
         max_value : float, optional
             Maximum allowed value (default is 127).
         """
-        self.array = np.clip(self.array, min_value, max_value)
+        if self.inplace:
+            np.clip(self.array, min_value, max_value, out=self.array)
+        else:
+            self.array = np.clip(self.array, min_value, max_value)
         return self
 
+    @instrument("Vector.project", elements=lambda self, *args, **kwargs: len(self.array))
     def project(self, data, scale=0):
         """
         Project the vector into the nearest element of data.
 
         Parameters
         ----------
-        data : list, Vector
-            The alphabet 
+        data : list, Vector, ScaleTable
+            The alphabet (a ScaleTable projects the MIDI pitches with a lookup)
         scale : float, optional
             the hardness of projection (0: hard projection, 1: no projection)
         """
+        array_before = self.array
+        inplace = self.inplace and self.array.dtype.kind == "f"
+        if isinstance(data, ScaleTable):
+            return self._mix(data.snap(array_before), scale, inplace)
         grid = self.get_array(data)
         grid = np.insert(grid, 0, 0)
-        array_before = self.array
-        array_hard = grid[np.argmin(np.abs(array_before[:, None] - grid), axis=1)]
-        self.array = array_before*scale + (1-scale)*array_hard
+        if len(array_before) * len(grid) <= DENSE_PROJECTION_LIMIT:
+            array_hard = _project_dense(array_before, grid)
+        else:
+            array_hard = _project_sorted(array_before, grid, out=self._get_scratch() if inplace else None)
+        return self._mix(array_hard, scale, inplace)
+
+    def _mix(self, array_hard, scale, inplace):
+        """
+        Replace the vector by `array*scale + (1-scale)*array_hard` (soft projection).
+        """
+        if inplace:
+            # the dense result is a small fresh array which may have the grid (integer) type
+            self.array *= scale
+            self.array += np.multiply(array_hard, 1-scale, out=array_hard if array_hard.dtype == self.array.dtype else None)
+        else:
+            self.array = self.array*scale + (1-scale)*array_hard
         return self
 
     def resize(self, length):
@@ -192,7 +358,13 @@ class Vector:
         length: integer
 
         """
-        self.array = np.resize(self.array, length)
+        if self.inplace and length <= len(self.array):
+            self.array = self.array[:length]
+        elif len(self.array) == 0:
+            self.array = np.resize(self.array, length)
+        else:
+            # np.resize concatenates a tuple of `length / len(array)` arrays
+            self.array = np.tile(self.array, -(-length // len(self.array)))[:length]
         return self
 
 
@@ -241,6 +413,242 @@ class Vector:
         return f"Vector({self.array.tolist()})"
 
 
+def direct_sum(*arrays):
+    """
+    Return the direct sum (all the sums of one element per operand) of several arrays.
+
+    The elements are ordered as `np.add.outer(a, b).ravel()`, the last operand
+    varying fastest, which is also the order of
+    `np.kron(a, np.ones(len(b))) + np.kron(np.ones(len(a)), b)`.
+
+    Parameters
+    ----------
+    *arrays : np.ndarray
+        The operands.
+    """
+    output = np.asarray(arrays[0], dtype=float).ravel()
+    for array in arrays[1:]:
+        output = np.add(output[:, None], np.asarray(array, dtype=float).ravel()).ravel()
+    return output
+
+
+class Lattice:
+    """
+    A lazy direct sum of several vectors.
+
+    The elements are computed on demand, in the order of `direct_sum`, so
+    large lattices (e.g. progression x voicing x octave) can be indexed and
+    projected without materializing the full sum.
+
+    Parameters
+    ----------
+    *data : list, Vector, np.array
+        The operands.
+
+    Attributes
+    ----------
+    arrays : list of np.ndarray
+        The operands as float arrays.
+    shape : tuple of int
+        The length of each operand.
+    """
+    def __init__(self, *data):
+        self.arrays = [np.asarray(d.array if isinstance(d, Vector) else d, dtype=float).ravel() for d in data]
+        self.shape = tuple(len(array) for array in self.arrays)
+
+    def __len__(self):
+        return int(np.prod(self.shape, dtype=np.int64))
+
+    def __getitem__(self, index):
+        """
+        Return the elements at an integer, a slice or an array of indices.
+        """
+        if isinstance(index, slice):
+            index = np.arange(*index.indices(len(self)))
+        index = np.asarray(index)
+        if not np.issubdtype(index.dtype, np.integer):
+            raise IndexError("Lattice indices must be integers, slices or integer arrays.")
+        length = len(self)
+        if np.any((index < -length) | (index >= length)):
+            raise IndexError("Lattice index out of range.")
+        positions = np.unravel_index(np.where(index < 0, index + length, index), self.shape)
+        output = self.arrays[0][positions[0]]
+        for array, position in zip(self.arrays[1:], positions[1:]):
+            output = output + array[position]
+        return output
+
+    def chunks(self, chunk_size=65536):
+        """
+        Iterate over the elements by consecutive blocks of at most `chunk_size` elements.
+        """
+        length = len(self)
+        for start in range(0, length, chunk_size):
+            yield self[start:min(start + chunk_size, length)]
+
+    def to_vector(self):
+        """
+        Materialize the lattice.
+        """
+        vector = Vector(0)
+        vector.array = direct_sum(*self.arrays)
+        return vector
+
+    def project(self, data, scale=0, chunk_size=65536):
+        """
+        Project the elements into the nearest element of data (see `Vector.project`).
+
+        The lattice is processed by blocks, so the temporaries do not grow with
+        the size of the lattice. Only the projected vector is allocated.
+
+        Parameters
+        ----------
+        data : list, Vector
+            The alphabet
+        scale : float, optional
+            the hardness of projection (0: hard projection, 1: no projection)
+        chunk_size : int, optional
+            The number of elements projected at once.
+        """
+        output = np.empty(len(self))
+        start = 0
+        for chunk in self.chunks(chunk_size):
+            projected = Vector(chunk, copy=False).project(data, scale).array
+            output[start:start + len(chunk)] = projected
+            start += len(chunk)
+        vector = Vector(0)
+        vector.array = output
+        return vector
+
+    def __repr__(self):
+        return f"Lattice(shape={self.shape})"
+
+
+class ScaleTable:
+    """
+    A scale compiled into lookup tables over the MIDI pitches (0 to 127).
+
+    The tables hold the projection of each MIDI pitch with the semantics of
+    `Vector.project` (0 is added to the alphabet, ties go to the first scale
+    element), so projecting integer pitches is a single gather. The other
+    values (non-integer or out of range) are projected with a search.
+
+    Parameters
+    ----------
+    data : list, Vector, np.array
+        The alphabet (e.g. the output of `generate_scale`).
+    period : int, optional
+        The number of semitones of an octave, used for the degree and
+        octave tables (default is 12).
+    root : int, optional
+        The pitch class of the first degree (default is the pitch class of
+        the lowest scale pitch).
+
+    Attributes
+    ----------
+    grid : np.ndarray
+        The alphabet, with the inserted 0.
+    values : np.ndarray
+        The distinct pitches of the scale (without the inserted 0).
+    classes : np.ndarray
+        The distinct pitch classes of the scale (without the inserted 0), by degree.
+    snap_table : np.ndarray
+        The projection of each MIDI pitch.
+    step_table : np.ndarray
+        The rank of the projected pitch among the distinct scale pitches.
+    degree_table : np.ndarray
+        The degree of the projected pitch (0 for the root).
+    octave_table : np.ndarray
+        The octave of the projected pitch (`snap // period`).
+
+    Notes
+    -----
+    The pitches projected onto the inserted 0 have no step nor degree when 0
+    is not a pitch of the scale: their step and degree are -1.
+    """
+    def __init__(self, data, period=12, root=None):
+        grid = np.asarray(data.array if isinstance(data, Vector) else data).ravel()
+        self.grid = np.insert(grid, 0, 0)
+        self.period = period
+        self.values = np.unique(grid)
+        if root is None:
+            root = self.values[0] if len(self.values) else 0
+        self.root = np.mod(root, period)
+        # pitch classes relative to the root, sorted by degree
+        self._intervals = np.unique(np.mod(self.values - self.root, period))
+        self.classes = np.mod(self._intervals + self.root, period)
+        self.snap_table = self._search(np.arange(128))
+        self.step_table, self.degree_table = self._ranks(self.snap_table)
+        self.octave_table = np.floor_divide(self.snap_table, period).astype(np.int64)
+        for table in (self.snap_table, self.step_table, self.degree_table, self.octave_table):
+            table.flags.writeable = False
+
+    def _search(self, array):
+        if len(array) * len(self.grid) <= DENSE_PROJECTION_LIMIT:
+            return _project_dense(array, self.grid)
+        return _project_sorted(array, self.grid)
+
+    def _ranks(self, snapped):
+        """
+        Return the step and the degree of projected pitches (-1 for the pitches not in the scale).
+        """
+        step = np.searchsorted(self.values, snapped)
+        found = np.zeros(len(step), dtype=bool) if len(self.values) == 0 else \
+            self.values[np.minimum(step, len(self.values) - 1)] == snapped
+        degree = np.searchsorted(self._intervals, np.mod(snapped - self.root, self.period))
+        return np.where(found, step, -1), np.where(found, degree, -1)
+
+    def _lookup(self, array):
+        """
+        Return the table index of each value and the mask of the values found in the tables.
+        """
+        array = np.asarray(array)
+        valid = (array >= 0) & (array <= 127)
+        if array.dtype.kind == "f":
+            valid &= np.floor(array) == array
+        return np.where(valid, array, 0).astype(np.int64), valid
+
+    def snap(self, array):
+        """
+        Return the nearest scale pitch of each value (the hard projection of `Vector.project`).
+        """
+        index, valid = self._lookup(array)
+        output = self.snap_table[index]
+        if not valid.all():
+            invalid = ~valid
+            output[invalid] = self._search(np.asarray(array)[invalid])
+        return output
+
+    def step(self, array):
+        """
+        Return the rank of the projected pitches among the distinct scale pitches (-1 for the inserted 0).
+        """
+        index, valid = self._lookup(array)
+        if valid.all():
+            return self.step_table[index]
+        return self._ranks(np.ravel(self.snap(array)))[0].reshape(np.shape(array))
+
+    def degree(self, array):
+        """
+        Return the scale degree of the projected pitches (-1 for the inserted 0).
+        """
+        index, valid = self._lookup(array)
+        if valid.all():
+            return self.degree_table[index]
+        return self._ranks(np.ravel(self.snap(array)))[1].reshape(np.shape(array))
+
+    def octave(self, array):
+        """
+        Return the octave of the projected pitches.
+        """
+        index, valid = self._lookup(array)
+        if valid.all():
+            return self.octave_table[index]
+        return np.floor_divide(self.snap(array), self.period).astype(np.int64)
+
+    def __repr__(self):
+        return f"ScaleTable({len(self.classes)} pitch classes, period={self.period})"
+
+
 class Sine_Zeros(Vector):
     """
     A subclass of `Vector` representing zero crossings of a sine wave.
@@ -262,3 +670,82 @@ class Sine_Zeros(Vector):
         m = np.arange(M)
         array = m * N / M - theta
         super().__init__(array)
+
+
+def sine_zeros_onsets(M, N, theta=0, repeat=1, size=None):
+    """
+    Return the zero crossings of `Sine_Zeros` quantized on an integer grid.
+
+    The result is equal to
+    `Sine_Zeros(M, N, theta, repeat).project(np.arange(size)).astype(int)`
+    (including the tie-breaking towards the lower step and the inserted 0
+    grid point) but each onset is obtained from its two neighbouring integer
+    steps, in O(M) time and memory.
+
+    Parameters
+    ----------
+    M : int
+        The number of zero crossings in the period.
+    N : int
+        The total number of points in the period.
+    theta : float, optional
+        Phase shift of the sine wave (default is 0).
+    repeat : int, optional
+        Number of times to repeat the pattern (default is 1).
+    size : int, optional
+        The number of steps of the grid (default is `repeat * N`).
+
+    Returns
+    -------
+    np.ndarray
+        The integer onsets.
+    """
+    M = repeat * M
+    N = repeat * N
+    if size is None:
+        size = N
+    last = max(size - 1, 0)
+
+    # same floating-point expression as Sine_Zeros, so that ties are identical
+    array = np.arange(M) * N / M - theta
+    finite = np.isfinite(array)
+    low = np.clip(np.floor(np.where(finite, array, 0)), 0, last)
+    high = np.minimum(low + 1, last)
+    onsets = np.where(np.abs(array - high) < np.abs(array - low), high, low)
+    onsets[~finite] = 0
+
+    # beyond 2**52 the distances to the grid steps are rounded and may tie
+    huge = finite & (np.abs(array) >= 2**52)
+    if huge.any():
+        onsets[huge] = _project_dense(array[huge], np.insert(np.arange(size), 0, 0))
+    return onsets.astype(int)
+
+
+def sine_zeros_mask(M, N, theta=0, repeat=1, packed=False):
+    """
+    Return the step mask of a quantized `Sine_Zeros` rhythm.
+
+    Parameters
+    ----------
+    M : int
+        The number of zero crossings in the period.
+    N : int
+        The total number of points in the period.
+    theta : float, optional
+        Phase shift of the sine wave (default is 0).
+    repeat : int, optional
+        Number of times to repeat the pattern (default is 1).
+    packed : bool, optional
+        If True, return the mask packed in bytes with `np.packbits` (default is False).
+
+    Returns
+    -------
+    np.ndarray
+        A boolean array of `repeat * N` steps (True for the steps with an onset),
+        or its packed uint8 representation.
+    """
+    mask = np.zeros(repeat * N, dtype=bool)
+    mask[sine_zeros_onsets(M, N, theta, repeat)] = True
+    if packed:
+        return np.packbits(mask)
+    return mask
@@ -0,0 +1,182 @@
+from .base import Vector, get_rng, _project_dense, _project_sorted, DENSE_PROJECTION_LIMIT
+import numpy as np
+
+
+class VectorBatch:
+    """
+    A batch of vectors of possibly different lengths processed with single NumPy calls.
+
+    The vectors are stored as the rows of a 2-D array padded with NaN.
+
+    Attributes
+    ----------
+    array : np.ndarray
+        A (rows, max_length) array storing the elements of each vector.
+    lengths : np.ndarray
+        The length of each vector.
+    """
+    def __init__(self, data, lengths=None):
+        """
+        Initialize the batch.
+
+        Parameters
+        ----------
+        data : list or np.ndarray
+            - a list of Vector, lists or 1-D arrays (rows of any length),
+            - a 2-D array (rows of equal length, or padded rows if `lengths` is given).
+        lengths : array_like, optional
+            The length of each row when `data` is a padded 2-D array.
+        """
+        if isinstance(data, np.ndarray) and data.ndim == 2:
+            array = np.array(data, dtype=float)
+            if lengths is None:
+                lengths = np.full(len(array), array.shape[1])
+        elif isinstance(data, list):
+            rows = [row.array if isinstance(row, Vector) else np.asarray(row, dtype=float) for row in data]
+            lengths = np.array([len(row) for row in rows], dtype=int)
+            array = np.full((len(rows), max(lengths, default=0)), np.nan)
+            array[self.mask_from_lengths(lengths, array.shape[1])] = np.concatenate(rows) if rows else []
+        else:
+            raise ValueError("Invalid input. Provide a list of vectors or a 2-D array.")
+
+        self.lengths = np.asarray(lengths, dtype=int)
+        self.array = array
+        self.array[~self.mask] = np.nan
+
+    @staticmethod
+    def mask_from_lengths(lengths, width):
+        """
+        Return the boolean mask of the valid elements of padded rows.
+        """
+        return np.arange(width) < np.asarray(lengths)[:, None]
+
+    @property
+    def mask(self):
+        """
+        Return the boolean mask of the valid elements.
+        """
+        return self.mask_from_lengths(self.lengths, self.array.shape[1])
+
+    def get_column(self, value):
+        """
+        Return a scalar or a per-row value broadcastable against the rows.
+        """
+        value = np.asarray(value, dtype=float)
+        if value.ndim == 1:
+            value = value[:, None]
+        return value
+
+    def multiply(self, scalar):
+        """
+        Multiply the elements by a scalar (or by one scalar per row).
+        """
+        self.array *= self.get_column(scalar)
+        return self
+
+    def add(self, offset):
+        """
+        Offset the elements by a scalar (or by one scalar per row).
+        """
+        self.array += self.get_column(offset)
+        return self
+
+    def clip(self, min_value=0, max_value=127):
+        """
+        Clip the values to be within the range [min_value, max_value].
+        """
+        self.array = np.clip(self.array, min_value, max_value)
+        return self
+
+    def rvs_normal(self, loc=0, scale=1, rng=None):
+        """
+        Add normally distributed random noise to every element.
+
+        Parameters
+        ----------
+        loc : float, optional
+            Mean of the normal distribution (default is 0).
+        scale : float, optional
+            Standard deviation of the normal distribution (default is 1).
+        rng : int or np.random.Generator, optional
+            The random generator or its seed (default is the global NumPy generator).
+        """
+        self.array += get_rng(rng).normal(loc=loc, scale=scale, size=self.array.shape)
+        return self
+
+    def roll(self, shift):
+        """
+        Roll (circular shift) each row by a specified amount (or by one amount per row).
+        """
+        shift = np.broadcast_to(np.asarray(shift, dtype=int), self.lengths.shape)
+        lengths = np.maximum(self.lengths, 1)
+        columns = (np.arange(self.array.shape[1]) - shift[:, None]) % lengths[:, None]
+        mask = self.mask
+        rolled = np.take_along_axis(self.array, columns, axis=1)
+        self.array = np.where(mask, rolled, np.nan)
+        return self
+
+    def project(self, data, scale=0):
+        """
+        Project every element into the nearest element of data (see `Vector.project`).
+        """
+        grid = data.array if isinstance(data, Vector) else np.asarray(data)
+        grid = np.insert(grid, 0, 0)
+        mask = self.mask
+        values = self.array[mask]
+        if len(values) * len(grid) <= DENSE_PROJECTION_LIMIT:
+            hard = _project_dense(values, grid)
+        else:
+            hard = _project_sorted(values, grid)
+        self.array[mask] = values * scale + (1 - scale) * hard
+        return self
+
+    def to_vectors(self):
+        """
+        Convert the batch to a list of Vector.
+        """
+        return [Vector(row[:length]) for row, length in zip(self.array, self.lengths)]
+
+    def __len__(self):
+        """
+        Return the number of vectors.
+        """
+        return len(self.array)
+
+    def __getitem__(self, index):
+        """
+        Retrieve a vector by index.
+        """
+        return Vector(self.array[index, :self.lengths[index]])
+
+    def __repr__(self):
+        return f"VectorBatch({len(self.array)} vectors)"
+
+
+class Sine_Zeros_Batch(VectorBatch):
+    """
+    A batch of `Sine_Zeros` vectors.
+
+    All parameters are broadcast together: each combination gives one row
+    equal to `Sine_Zeros(M, N, theta, repeat)`, the rows following the C
+    order of the broadcast shape.
+
+    Parameters
+    ----------
+    M : int or array_like
+        The number of zero crossings in the period.
+    N : int or array_like
+        The total number of points in the period.
+    theta : float or array_like, optional
+        Phase shift of the sine wave (default is 0).
+    repeat : int or array_like, optional
+        Number of times to repeat the pattern (default is 1).
+    """
+    def __init__(self, M, N, theta=0, repeat=1):
+        # one row per combination, in C order of the broadcast shape
+        M, N, theta, repeat = [np.atleast_1d(array).ravel() for array in np.broadcast_arrays(M, N, theta, repeat)]
+        M = (repeat * M).astype(int)
+        N = (repeat * N).astype(int)
+        width = max(M.max(initial=0), 0)
+        m = np.arange(width)
+        array = m * N[:, None] / M[:, None] - theta[:, None]
+        super().__init__(array, lengths=M)
@@ -0,0 +1,308 @@
+import numpy as np
+
+
+# number of notes scanned linearly (leaves of the interval tree, and
+# queries answered from the running maximum of the end times)
+SCAN_LIMIT = 64
+
+
+class IntervalTree:
+    """
+    A centered interval tree over the half-open intervals [start, end).
+
+    Each node stores the intervals containing its center, sorted by start and
+    by end, the intervals ending before the center go to the left child and the
+    intervals starting after it to the right child. A stabbing query visits
+    O(log n) nodes and costs O(log n) plus the size of the answer.
+
+    Parameters
+    ----------
+    start : np.ndarray
+        The sorted start times.
+    end : np.ndarray
+        The end times, in the order of `start`.
+    """
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+        # node: [center, positions by start, ends of positions by end, positions by end, left, right]
+        # leaf: [None, positions]
+        self.nodes = []
+        root = self._add(np.arange(len(start)))
+        stack = [root]
+        while stack:
+            node = self.nodes[stack.pop()]
+            if node[0] is None:
+                continue
+            for side in (4, 5):
+                if len(node[side]):
+                    node[side] = self._add(node[side])
+                    stack.append(node[side])
+                else:
+                    node[side] = -1
+
+    def _add(self, positions):
+        """
+        Create a node (its children are created later) and return its index.
+        """
+        self.nodes.append(self._split(positions))
+        return len(self.nodes) - 1
+
+    def _split(self, positions):
+        if len(positions) <= SCAN_LIMIT:
+            return [None, positions]
+        start, end = self.start[positions], self.end[positions]
+        center = np.median(np.concatenate([start, end]))
+        left = end <= center
+        right = start > center
+        inside = ~(left | right)
+        if left.all() or right.all():
+            return [None, positions]
+        by_end = positions[inside][np.argsort(end[inside], kind="stable")]
+        return [center, positions[inside], self.end[by_end], by_end, positions[left], positions[right]]
+
+    def stab(self, time):
+        """
+        Return the positions of the intervals containing a time, sorted.
+        """
+        found = []
+        index = 0 if self.nodes else -1
+        while index >= 0:
+            node = self.nodes[index]
+            if node[0] is None:
+                positions = node[1]
+                found.append(positions[(self.start[positions] <= time) & (self.end[positions] > time)])
+                break
+            center, by_start, ends, by_end, left, right = node
+            if time < center:
+                # the intervals of the node end after the center
+                found.append(by_start[:np.searchsorted(self.start[by_start], time, side="right")])
+                index = left
+            else:
+                # the intervals of the node start before the center
+                found.append(by_end[np.searchsorted(ends, time, side="right"):])
+                index = right
+        if len(found) == 0:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(found))
+
+
+class NoteIndex:
+    """
+    A time-range index over notes.
+
+    The notes are kept sorted by start time together with the running maximum
+    of their end times. As the running maximum is non-decreasing, the notes
+    which end before a time form a prefix that is found by binary search. When
+    the remaining notes to scan are few, queries are answered by a scan;
+    otherwise (e.g. after a long note) an `IntervalTree`, built on first use
+    and rebuilt after appends, finds the sounding notes. Window, active-at
+    and overlap queries cost O(log n) plus the size of the answer. A note
+    with start time `s` and duration `d` sounds in the half-open interval
+    [s, s + d).
+
+    Parameters
+    ----------
+    start_time : array_like
+        The start times of the notes.
+    duration : array_like
+        The durations of the notes (broadcast to the number of notes).
+
+    Attributes
+    ----------
+    start : np.ndarray
+        The sorted start times.
+    end : np.ndarray
+        The end times, in the order of `start`.
+    max_end : np.ndarray
+        The running maximum of `end`.
+    order : np.ndarray
+        The position of each sorted note in the indexed notes.
+    """
+    def __init__(self, start_time, duration):
+        start_time = np.asarray(start_time, dtype=float)
+        end = start_time + np.broadcast_to(np.asarray(duration, dtype=float), start_time.shape)
+        order = np.argsort(start_time, kind="stable")
+        self.size = 0
+        self._allocate(len(start_time))
+        self._store(0, start_time[order], end[order], order)
+
+    def _allocate(self, capacity):
+        self._start = np.empty(capacity)
+        self._end = np.empty(capacity)
+        self._max_end = np.empty(capacity)
+        self._order = np.empty(capacity, dtype=np.int64)
+
+    def _store(self, position, start, end, order):
+        """
+        Write sorted notes from a position and update the running maximum.
+        """
+        stop = position + len(start)
+        self._tree = None
+        self._start[position:stop] = start
+        self._end[position:stop] = end
+        self._order[position:stop] = order
+        self.size = stop
+        self._update_max_end(position)
+
+    def _update_max_end(self, position):
+        if position >= self.size:
+            return
+        np.maximum.accumulate(self._end[position:self.size], out=self._max_end[position:self.size])
+        if position > 0:
+            np.maximum(self._max_end[position:self.size], self._max_end[position - 1], out=self._max_end[position:self.size])
+
+    @property
+    def start(self):
+        return self._start[:self.size]
+
+    @property
+    def end(self):
+        return self._end[:self.size]
+
+    @property
+    def max_end(self):
+        return self._max_end[:self.size]
+
+    @property
+    def order(self):
+        return self._order[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    def append(self, start_time, duration):
+        """
+        Index new notes, numbered after the already indexed notes.
+
+        Notes starting at or after the last indexed start time (e.g. a live
+        stream) are appended in amortized O(k); otherwise they are merged
+        in O(n).
+
+        Parameters
+        ----------
+        start_time : array_like
+            The start times of the new notes.
+        duration : array_like
+            The durations of the new notes.
+        """
+        start_time = np.asarray(start_time, dtype=float).ravel()
+        end = start_time + np.broadcast_to(np.asarray(duration, dtype=float), start_time.shape)
+        order = np.argsort(start_time, kind="stable")
+        start_time, end = start_time[order], end[order]
+        order = order + self.size
+        size = self.size + len(start_time)
+        if size > len(self._start):
+            start, end_all, max_end, order_all = self.start, self.end, self.max_end, self.order
+            self._allocate(max(size, 2 * len(self._start)))
+            self._start[:self.size], self._end[:self.size] = start, end_all
+            self._max_end[:self.size], self._order[:self.size] = max_end, order_all
+        if self.size == 0 or len(start_time) == 0 or start_time[0] >= self._start[self.size - 1]:
+            self._store(self.size, start_time, end, order)
+            return self
+        # equal start times keep the indexed notes first
+        positions = np.searchsorted(self.start, start_time, side="right")
+        first = int(positions[0])
+        merged_start = np.insert(self._start[first:self.size], positions - first, start_time)
+        merged_end = np.insert(self._end[first:self.size], positions - first, end)
+        merged_order = np.insert(self._order[first:self.size], positions - first, order)
+        self._store(first, merged_start, merged_end, merged_order)
+        return self
+
+    def starting(self, start, end):
+        """
+        Return the notes starting in [start, end), sorted by start time.
+
+        Returns
+        -------
+        np.ndarray
+            The positions of the notes in the indexed notes.
+        """
+        first = np.searchsorted(self.start, start, side="left")
+        last = np.searchsorted(self.start, end, side="left")
+        return self.order[first:last]
+
+    @property
+    def tree(self):
+        """
+        Return the interval tree of the notes (built on first use).
+        """
+        if self._tree is None:
+            self._tree = IntervalTree(self.start, self.end)
+        return self._tree
+
+    def _stab(self, time):
+        """
+        Return the sorted positions of the notes sounding at a given time.
+        """
+        first = np.searchsorted(self.max_end, time, side="right")
+        last = np.searchsorted(self.start, time, side="right")
+        if last - first <= SCAN_LIMIT:
+            candidates = np.arange(first, max(first, last))
+            return candidates[self.end[candidates] > time]
+        return self.tree.stab(time)
+
+    def window(self, start, end):
+        """
+        Return the notes sounding in [start, end), sorted by start time.
+
+        Returns
+        -------
+        np.ndarray
+            The positions of the notes in the indexed notes.
+        """
+        # the notes sounding at `start`, then the notes starting in (start, end)
+        first = np.searchsorted(self.start, start, side="right")
+        last = np.searchsorted(self.start, end, side="left")
+        positions = np.concatenate([self._stab(start), np.arange(first, max(first, last))])
+        return self.order[positions]
+
+    def active_at(self, time):
+        """
+        Return the notes sounding at a given time, sorted by start time.
+
+        Returns
+        -------
+        np.ndarray
+            The positions of the notes in the indexed notes.
+        """
+        return self.order[self._stab(time)]
+
+    def overlaps(self, start, duration):
+        """
+        Return the notes overlapping a note, sorted by start time.
+
+        Parameters
+        ----------
+        start : float
+            The start time of the note.
+        duration : float
+            The duration of the note.
+
+        Returns
+        -------
+        np.ndarray
+            The positions of the notes in the indexed notes.
+        """
+        return self.window(start, start + duration)
+
+    def overlapping_pairs(self):
+        """
+        Return all the pairs of overlapping notes.
+
+        Returns
+        -------
+        np.ndarray
+            A (P, 2) array of positions in the indexed notes. The first note of
+            each pair starts before (or with) the second one.
+        """
+        # the notes overlapping note k and starting after it are k+1, ..., last[k]-1
+        first = np.arange(self.size)
+        last = np.searchsorted(self.start, self.end, side="left")
+        counts = np.maximum(last - first - 1, 0)
+        left = np.repeat(first, counts)
+        right = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + left + 1
+        # a note of zero duration does not overlap the notes starting with it
+        keep = self.end[right] > self.start[left]
+        left, right = left[keep], right[keep]
+        return np.stack([self.order[left], self.order[right]], axis=1)
@@ -0,0 +1,277 @@
+"""
+Opt-in instrumentation of the composition pipeline.
+
+The instrumented functions (`Vector.project`, `Sequence.__init__`,
+`Sequence.send_to_ableton`, `save_to_midi`, ...) only record something when a
+`Profiler` is active; otherwise the cost is a global lookup per call.
+
+    with Profiler(trace_memory=True) as profiler:
+        render()
+    print(profiler.table())
+    profiler.save_chrome_trace("trace.json")
+"""
+from functools import wraps
+import json
+import threading
+import time
+import tracemalloc
+
+
+_profiler = None
+
+
+class Event:
+    """
+    A recorded call.
+
+    Attributes
+    ----------
+    name : str
+        The name of the operation.
+    start : float
+        The start time in seconds (`time.perf_counter`).
+    duration : float
+        The wall time in seconds.
+    elements : int or None
+        The number of elements processed.
+    allocated : int or None
+        The peak memory allocated during the call in bytes (when the memory is traced).
+    thread : int
+        The identifier of the calling thread.
+    """
+    __slots__ = ("name", "start", "duration", "elements", "allocated", "thread")
+
+    def __init__(self, name, start, duration, elements=None, allocated=None, thread=0):
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.elements = elements
+        self.allocated = allocated
+        self.thread = thread
+
+
+class Profiler:
+    """
+    Record the instrumented calls while active (context manager).
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Measure the peak allocation of each call with `tracemalloc` (default is False).
+        Tracing memory slows down every allocation of the program.
+
+    Attributes
+    ----------
+    events : list of Event
+        The recorded calls, in completion order.
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.events = []
+        self._local = threading.local()
+        self._started_tracemalloc = False
+        self._origin = time.perf_counter()
+        self._previous = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        """
+        Activate the profiler.
+        """
+        global _profiler
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._previous = _profiler
+        _profiler = self
+        return self
+
+    def stop(self):
+        """
+        Deactivate the profiler (the previously active one, if any, is restored).
+        """
+        global _profiler
+        _profiler = self._previous
+        self._previous = None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def enter(self):
+        """
+        Open a measurement and return its frame (see `exit`).
+        """
+        memory = self.trace_memory and tracemalloc.is_tracing()
+        frame = [time.perf_counter(), 0, 0]
+        if memory:
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self._stack()
+            if stack:
+                # the enclosing call keeps the peak reached before it is reset
+                stack[-1][2] = max(stack[-1][2], peak)
+            tracemalloc.reset_peak()
+            frame[1] = current
+            stack.append(frame)
+        return frame
+
+    def exit(self, name, frame, elements=None):
+        """
+        Close a measurement opened by `enter` and record the event.
+        """
+        end = time.perf_counter()
+        allocated = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            stack = self._stack()
+            peak = max(frame[2], tracemalloc.get_traced_memory()[1])
+            if stack and stack[-1] is frame:
+                stack.pop()
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+            allocated = peak - frame[1]
+        self.events.append(Event(name, frame[0], end - frame[0], elements, allocated, threading.get_ident()))
+
+    def summary(self):
+        """
+        Aggregate the events by operation.
+
+        Returns
+        -------
+        dict
+            For each operation name, a dict with the keys "calls", "total", "mean",
+            "max" (seconds), "elements" (total) and "allocated" (maximum peak in bytes).
+        """
+        stats = {}
+        for event in self.events:
+            entry = stats.setdefault(event.name, {"calls": 0, "total": 0.0, "max": 0.0, "elements": 0, "allocated": None})
+            entry["calls"] += 1
+            entry["total"] += event.duration
+            entry["max"] = max(entry["max"], event.duration)
+            if event.elements is not None:
+                entry["elements"] += event.elements
+            if event.allocated is not None:
+                entry["allocated"] = max(entry["allocated"] or 0, event.allocated)
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["calls"]
+        return stats
+
+    def table(self):
+        """
+        Return the summary as a text table sorted by total time.
+        """
+        stats = sorted(self.summary().items(), key=lambda item: -item[1]["total"])
+        lines = [f"{'operation':<32}{'calls':>8}{'total (ms)':>12}{'mean (ms)':>12}{'elements':>12}{'peak (kB)':>12}"]
+        for name, entry in stats:
+            allocated = "" if entry["allocated"] is None else f"{entry['allocated'] / 1e3:.1f}"
+            lines.append(f"{name:<32}{entry['calls']:>8}{1000 * entry['total']:>12.3f}{1000 * entry['mean']:>12.3f}"
+                         f"{entry['elements']:>12}{allocated:>12}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """
+        Return the events in the Chrome trace event format (chrome://tracing, Perfetto).
+        """
+        trace_events = []
+        for event in self.events:
+            args = {}
+            if event.elements is not None:
+                args["elements"] = event.elements
+            if event.allocated is not None:
+                args["allocated"] = event.allocated
+            trace_events.append({
+                "name": event.name,
+                "ph": "X",
+                "ts": 1e6 * (event.start - self._origin),
+                "dur": 1e6 * event.duration,
+                "pid": 0,
+                "tid": event.thread,
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, filename):
+        """
+        Write the Chrome trace JSON to a file.
+        """
+        with open(filename, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def get_profiler():
+    """
+    Return the active Profiler (None when the instrumentation is disabled).
+    """
+    return _profiler
+
+
+def instrument(name, elements=None):
+    """
+    Decorate a function to record its calls in the active Profiler.
+
+    Parameters
+    ----------
+    name : str
+        The name of the operation.
+    elements : callable, optional
+        Called with the arguments of the function after the call, returns
+        the number of elements processed.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            frame = profiler.enter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                count = None
+                if elements is not None:
+                    try:
+                        count = elements(*args, **kwargs)
+                    except Exception:
+                        pass
+                profiler.exit(name, frame, count)
+        return wrapper
+    return decorator
+
+
+class span:
+    """
+    Record a block of code in the active Profiler (context manager).
+
+    Parameters
+    ----------
+    name : str
+        The name of the operation.
+    elements : int, optional
+        The number of elements processed.
+    """
+    __slots__ = ("name", "elements", "_profiler", "_frame")
+
+    def __init__(self, name, elements=None):
+        self.name = name
+        self.elements = elements
+
+    def __enter__(self):
+        self._profiler = _profiler
+        if self._profiler is not None:
+            self._frame = self._profiler.enter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler is not None:
+            self._profiler.exit(self.name, self._frame, self.elements)
+        return False
@@ -0,0 +1,577 @@
+from .sequence import NoteBatch, Sequence
+import numpy as np
+import os
+import struct
+
+
+TICKS_PER_QUARTERNOTE = 960
+
+# secondary sort keys used by midiutil: note-off events come before note-on
+# events scheduled at the same tick
+NOTE_OFF_ORDER = 2
+NOTE_ON_ORDER = 3
+
+
+def get_batch(notes):
+    """
+    Return a NoteBatch from a NoteBatch, a Sequence or a list of `Note` objects.
+    """
+    if isinstance(notes, NoteBatch):
+        return notes
+    if isinstance(notes, Sequence):
+        return notes.notes
+    return NoteBatch.from_notes(notes)
+
+
+def encode_var_length(values):
+    """
+    Encode non-negative integers as MIDI variable length quantities.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        The integers to encode.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        A (N, 9) uint8 array with the encoded bytes (most significant first,
+        left aligned) and the number of bytes used by each value.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    if np.any(values < 0):
+        raise ValueError("Variable length quantities must be non-negative.")
+    position = np.arange(9)
+    nbytes = np.sum(values[:, None] >= (np.int64(1) << (7 * position[1:])), axis=1) + 1
+    shift = 7 * (nbytes[:, None] - 1 - position)
+    valid = position < nbytes[:, None]
+    output = (values[:, None] >> np.where(valid, shift, 0)) & 0x7F
+    output |= np.where(position < nbytes[:, None] - 1, 0x80, 0)
+    output[~valid] = 0
+    return output.astype(np.uint8), nbytes
+
+
+def encode_events(ticks, status, data1, data2):
+    """
+    Pack time-ordered channel events into the bytes of a MIDI track.
+
+    Parameters
+    ----------
+    ticks : np.ndarray
+        The absolute (sorted) ticks of the events.
+    status, data1, data2 : np.ndarray
+        The status byte and the two data bytes of each event.
+
+    Returns
+    -------
+    bytes
+        The encoded events (delta times included).
+    """
+    delta = np.diff(ticks, prepend=0)
+    var_length, nbytes = encode_var_length(delta)
+    size = nbytes + 3
+    offset = np.cumsum(size) - size
+    output = np.zeros(int(np.sum(size)), dtype=np.uint8)
+    for position in range(var_length.shape[1]):
+        mask = nbytes > position
+        if not mask.any():
+            break
+        output[offset[mask] + position] = var_length[mask, position]
+    output[offset + nbytes] = status
+    output[offset + nbytes + 1] = data1
+    output[offset + nbytes + 2] = data2
+    return output.tobytes()
+
+
+def note_events(notes, channel=0, ticks_per_quarternote=TICKS_PER_QUARTERNOTE):
+    """
+    Compute the sorted note-on/note-off events of a track.
+
+    This follows the processing of `midiutil.MIDIFile` (duplicate removal,
+    de-interleaving of overlapping notes with the same pitch and channel, and
+    ordering by tick, event type and insertion order) so that the encoded
+    track is byte-compatible with midiutil.
+
+    Parameters
+    ----------
+    notes : NoteBatch
+        The notes of the track (insertion order is the batch order).
+    channel : int or np.ndarray, optional
+        The MIDI channel of the notes (default is 0).
+    ticks_per_quarternote : int, optional
+        The time resolution (default is 960).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The ticks, status bytes, pitches and velocities of the events.
+    """
+    M = len(notes)
+    channel = np.broadcast_to(np.asarray(channel, dtype=np.int64), (M,))
+    if np.any((channel < 0) | (channel > 15)):
+        raise ValueError("MIDI channels must be in [0, 15].")
+    for name in ("pitch", "velocity"):
+        column = notes.data[name]
+        if np.any((column < 0) | (column > 255)):
+            raise ValueError(f"Note {name} must be in [0, 255].")
+
+    start = (notes.start_time * ticks_per_quarternote).astype(np.int64)
+    stop = start + (notes.duration * ticks_per_quarternote).astype(np.int64)
+    if np.any(start < 0) or np.any(stop < 0):
+        raise ValueError("Note times must be non-negative.")
+
+    order = np.arange(M)
+    tick = np.concatenate([start, stop])
+    kind = np.concatenate([np.full(M, NOTE_ON_ORDER), np.full(M, NOTE_OFF_ORDER)])
+    insertion = np.concatenate([order, order])
+    pitch = np.concatenate([notes.pitch, notes.pitch])
+    channel = np.concatenate([channel, channel])
+    velocity = np.concatenate([notes.velocity, notes.velocity])
+
+    # remove duplicated events (same type, tick, pitch and channel), keep the first one
+    key = np.stack([kind, tick, pitch, channel], axis=1)
+    _, first = np.unique(key, axis=0, return_index=True)
+    first.sort()
+    tick, kind, insertion, pitch, channel, velocity = (
+        column[first] for column in (tick, kind, insertion, pitch, channel, velocity)
+    )
+
+    index = np.lexsort((insertion, kind, tick))
+    tick, kind, insertion, pitch, channel, velocity = (
+        column[index] for column in (tick, kind, insertion, pitch, channel, velocity)
+    )
+    tick = deinterleave(tick, kind == NOTE_ON_ORDER, pitch, channel)
+
+    index = np.lexsort((insertion, kind, tick))
+    status = np.where(kind == NOTE_ON_ORDER, 0x90, 0x80) | channel
+    return tick[index], status[index], pitch[index], velocity[index]
+
+
+def deinterleave(tick, is_on, pitch, channel):
+    """
+    Move the note-off of overlapping notes like `midiutil.MIDITrack.deInterleaveNotes`.
+
+    For each (pitch, channel), note-on events push their tick on a stack and
+    note-off events pop it. When the stack holds more than one tick, the
+    note-off is moved to the popped tick. The stack is emulated by matching
+    each note-off with the last note-on of the same nesting level.
+
+    Parameters
+    ----------
+    tick : np.ndarray
+        The time-ordered ticks of the events.
+    is_on : np.ndarray
+        True for note-on events, False for note-off events.
+    pitch, channel : np.ndarray
+        The pitch and channel of the events.
+
+    Returns
+    -------
+    np.ndarray
+        The updated ticks.
+    """
+    if len(tick) == 0:
+        return tick
+
+    # midiutil identifies notes with the string str(pitch) + str(channel), so some
+    # (pitch, channel) pairs share a stack; the integer below has the same collisions
+    key = pitch * np.where(channel < 10, 10, 100) + channel
+    key = np.where(pitch == 0, -1 - channel, key)
+    _, group = np.unique(key, return_inverse=True)
+    position = np.arange(len(tick))
+    index = np.lexsort((position, group))
+    group_sorted = group[index]
+    step = np.where(is_on[index], 1, -1)
+    cumulative = np.cumsum(step)
+    first = np.searchsorted(group_sorted, group_sorted)
+    depth = cumulative - cumulative[first] + step[first]
+    if np.any(depth < 0):
+        raise ValueError("Unmatched note-off event: durations must be positive and notes with "
+                         "the same start, pitch and channel must have the same duration.")
+
+    # nesting level: depth after a push, depth before a pop
+    level = np.where(is_on[index], depth, depth + 1)
+    matching = np.lexsort((position[index], level, group_sorted))
+    sorted_index = index[matching]
+    is_off = ~is_on[sorted_index]
+    moved = is_off & (level[matching] > 1)
+    previous = np.roll(sorted_index, 1)
+
+    output = tick.copy()
+    output[sorted_index[moved]] = tick[previous[moved]]
+    return output
+
+
+def encode_track(notes, channel=0, ticks_per_quarternote=TICKS_PER_QUARTERNOTE):
+    """
+    Encode the notes of a track into a complete "MTrk" chunk.
+
+    Parameters
+    ----------
+    notes : NoteBatch, Sequence or list of Note
+        The notes of the track.
+    channel : int or np.ndarray, optional
+        The MIDI channel of the notes (default is 0).
+    ticks_per_quarternote : int, optional
+        The time resolution (default is 960).
+
+    Returns
+    -------
+    bytes
+        The track chunk.
+    """
+    events = note_events(get_batch(notes), channel, ticks_per_quarternote)
+    data = encode_events(*events) + b"\x00\xff\x2f\x00"
+    return b"MTrk" + struct.pack(">L", len(data)) + data
+
+
+def encode_tempo_track(bpm=120):
+    """
+    Encode the tempo track (first track of a format 1 file).
+
+    Parameters
+    ----------
+    bpm : float, optional
+        The tempo in beats per minute (default is 120).
+    """
+    data = b"\x00\xff\x51\x03" + struct.pack(">L", int(60000000 / bpm))[1:] + b"\x00\xff\x2f\x00"
+    return b"MTrk" + struct.pack(">L", len(data)) + data
+
+
+def write_midi(tracks, file, bpm=120, ticks_per_quarternote=TICKS_PER_QUARTERNOTE):
+    """
+    Write notes to a format 1 Standard MIDI File.
+
+    The output is byte-compatible with `midiutil.MIDIFile(len(tracks))` when
+    the tempo and notes are added in the same order. Each track is encoded
+    and written to the stream before the next one is processed.
+
+    Parameters
+    ----------
+    tracks : list
+        The tracks of the file. Each element is either notes (NoteBatch,
+        Sequence or list of Note, written on channel 0) or a (notes, channel)
+        tuple.
+    file : str, os.PathLike or file-like
+        The output filename or a stream opened in binary mode.
+    bpm : float, optional
+        The tempo in beats per minute (default is 120).
+    ticks_per_quarternote : int, optional
+        The time resolution (default is 960).
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as f:
+            return write_midi(tracks, f, bpm, ticks_per_quarternote)
+
+    file.write(b"MThd" + struct.pack(">LHHH", 6, 1, len(tracks) + 1, ticks_per_quarternote))
+    file.write(encode_tempo_track(bpm))
+    for track in tracks:
+        if isinstance(track, tuple):
+            notes, channel = track
+        else:
+            notes, channel = track, 0
+        file.write(encode_track(notes, channel, ticks_per_quarternote))
+
+
+def midi_bytes(tracks, bpm=120, ticks_per_quarternote=TICKS_PER_QUARTERNOTE):
+    """
+    Return the content of a Standard MIDI File as bytes (see `write_midi`).
+    """
+    import io
+
+    buffer = io.BytesIO()
+    write_midi(tracks, buffer, bpm, ticks_per_quarternote)
+    return buffer.getvalue()
+
+
+def arrange_tracks(arrangement):
+    """
+    Group sequences by MIDI track.
+
+    Parameters
+    ----------
+    arrangement : list or dict
+        Either a list of (sequence, track, channel) tuples or a dict mapping
+        each sequence to a (track, channel) tuple. Sequences sharing a track
+        are merged into that track.
+
+    Returns
+    -------
+    list of tuple
+        The (NoteBatch, channel array) of each track, for tracks 0 to the
+        highest track index (missing tracks are empty).
+    """
+    if isinstance(arrangement, dict):
+        arrangement = [(sequence, track, channel) for sequence, (track, channel) in arrangement.items()]
+
+    tracks = {}
+    for sequence, track, channel in arrangement:
+        if track < 0:
+            raise ValueError("Track indices must be non-negative.")
+        notes = get_batch(sequence)
+        tracks.setdefault(track, []).append((notes, np.full(len(notes), channel, dtype=np.int64)))
+
+    output = []
+    for track in range(max(tracks, default=-1) + 1):
+        parts = tracks.get(track, [])
+        notes = NoteBatch.concatenate([notes for notes, _ in parts])
+        channel = np.concatenate([channel for _, channel in parts]) if parts else np.zeros(0, dtype=np.int64)
+        output.append((notes, channel))
+    return output
+
+
+def write_sequences(arrangement, file, bpm=120, ticks_per_quarternote=TICKS_PER_QUARTERNOTE):
+    """
+    Write many sequences to a multi-track MIDI file in a single pass.
+
+    The notes of each track are merged into one columnar batch and encoded as
+    a single time-ordered event stream (see `write_midi`).
+
+    Parameters
+    ----------
+    arrangement : list or dict
+        The (sequence, track, channel) assignment (see `arrange_tracks`).
+    file : str, os.PathLike or file-like
+        The output filename or a stream opened in binary mode.
+    bpm : float, optional
+        The tempo in beats per minute (default is 120).
+    ticks_per_quarternote : int, optional
+        The time resolution (default is 960).
+    """
+    write_midi(arrange_tracks(arrangement), file, bpm, ticks_per_quarternote)
+
+
+def read_var_length(data, offset):
+    """
+    Read a variable length quantity.
+
+    Returns
+    -------
+    tuple of int
+        The value and the offset of the next byte.
+    """
+    value = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, offset
+
+
+def parse_track(data):
+    """
+    Parse the note events of the content of a "MTrk" chunk.
+
+    Parameters
+    ----------
+    data : bytes
+        The content of the chunk (without the chunk header).
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The absolute ticks, note-on flags, pitches, channels and velocities
+        of the note events, in file order, and the last tick of the track.
+    """
+    ticks, status_list, pitches, velocities = [], [], [], []
+    offset = 0
+    tick = 0
+    status = 0
+    size = len(data)
+    while offset < size:
+        delta, offset = read_var_length(data, offset)
+        tick += delta
+        byte = data[offset]
+        if byte >= 0x80:
+            offset += 1
+            if byte < 0xF0:
+                status = byte
+        elif status == 0:
+            raise ValueError("Invalid MIDI track: running status without status byte.")
+        else:
+            byte = status
+
+        if byte == 0xFF:
+            offset += 1
+            length, offset = read_var_length(data, offset)
+            offset += length
+        elif byte in (0xF0, 0xF7):
+            length, offset = read_var_length(data, offset)
+            offset += length
+        elif byte < 0xF0:
+            kind = byte & 0xF0
+            if kind in (0xC0, 0xD0):
+                offset += 1
+            else:
+                if kind in (0x80, 0x90):
+                    ticks.append(tick)
+                    status_list.append(byte)
+                    pitches.append(data[offset])
+                    velocities.append(data[offset + 1])
+                offset += 2
+        else:
+            raise ValueError(f"Invalid MIDI track: unsupported status byte {byte:#x}.")
+
+    status = np.array(status_list, dtype=np.int64)
+    velocity = np.array(velocities, dtype=np.int64)
+    is_on = ((status & 0xF0) == 0x90) & (velocity > 0)
+    return np.array(ticks, dtype=np.int64), is_on, np.array(pitches, dtype=np.int64), status & 0x0F, velocity, tick
+
+
+def pair_notes(tick, is_on, pitch, channel, velocity, end_tick):
+    """
+    Pair note-on and note-off events into notes.
+
+    For each (pitch, channel), the k-th note-off closes the k-th note-on
+    (first in, first out). Note-off events without a sounding note are
+    ignored and notes which are never closed end at `end_tick`.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        The start ticks, stop ticks, pitches, channels and velocities of the
+        notes, in the order of their note-on events.
+    """
+    if len(tick) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, empty, empty
+
+    group = pitch * 16 + channel
+    position = np.arange(len(tick))
+    index = np.lexsort((position, group))
+    group_sorted = group[index]
+    on_sorted = is_on[index]
+    first = np.searchsorted(group_sorted, group_sorted)
+
+    # number of sounding notes of the group: d = s - min(0, running min of s), with
+    # s the cumulative count of (on - off) events. A note-off is ignored when
+    # nothing sounds, i.e. when it lowers min(0, running min of s).
+    step = np.where(on_sorted, 1, -1)
+    cumulative = np.cumsum(step)
+    s = cumulative - cumulative[first] + step[first]
+    # decreasing offsets keep the running minimum within each group
+    shift = 2 * (len(tick) + 1) * group_sorted
+    running_min = np.minimum(np.minimum.accumulate(s - shift) + shift, 0)
+    previous_min = np.where(first == np.arange(len(tick)), 0, np.roll(running_min, 1))
+    valid = on_sorted | (running_min == previous_min)
+
+    # rank of each valid event among the events of the same kind in its group
+    on_index = index[on_sorted]
+    off_index = index[valid & ~on_sorted]
+    on_group = group[on_index]
+    off_group = group[off_index]
+    on_rank = np.arange(len(on_index)) - np.searchsorted(on_group, on_group)
+    off_rank = np.arange(len(off_index)) - np.searchsorted(off_group, off_group)
+
+    # match (group, rank) pairs
+    on_key = on_group * (len(tick) + 1) + on_rank
+    off_key = off_group * (len(tick) + 1) + off_rank
+    stop = np.full(len(on_index), end_tick, dtype=np.int64)
+    if len(off_key) > 0:
+        match = np.minimum(np.searchsorted(off_key, on_key), len(off_key) - 1)
+        closed = off_key[match] == on_key
+        stop[closed] = tick[off_index[match[closed]]]
+
+    order = np.argsort(on_index, kind="stable")
+    on_index = on_index[order]
+    return tick[on_index], stop[order], pitch[on_index], channel[on_index], velocity[on_index]
+
+
+def read_midi_tracks(file):
+    """
+    Read the notes of each track of a Standard MIDI File.
+
+    Parameters
+    ----------
+    file : str, os.PathLike, bytes or file-like
+        The filename, the content of the file or a stream opened in binary mode.
+
+    Returns
+    -------
+    list of tuple
+        The (NoteBatch, channel array) of each track. Times are in beats.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a valid Standard MIDI File.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as f:
+            data = f.read()
+    elif isinstance(file, (bytes, bytearray)):
+        data = bytes(file)
+    else:
+        data = file.read()
+
+    if data[:4] != b"MThd":
+        raise ValueError("Invalid MIDI file: missing MThd header.")
+    header_size, _, n_tracks, division = struct.unpack(">LHHH", data[4:14])
+    if division & 0x8000:
+        raise ValueError("SMPTE time division is not supported.")
+
+    tracks = []
+    offset = 8 + header_size
+    while offset + 8 <= len(data) and len(tracks) < n_tracks:
+        chunk_type = data[offset:offset + 4]
+        (length,) = struct.unpack(">L", data[offset + 4:offset + 8])
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 8 + length
+        if chunk_type != b"MTrk":
+            continue
+        tick, is_on, pitch, channel, velocity, end_tick = parse_track(chunk)
+        start, stop, pitch, channel, velocity = pair_notes(tick, is_on, pitch, channel, velocity, end_tick)
+        notes = NoteBatch(pitch, start / division, (stop - start) / division, velocity)
+        tracks.append((notes, channel))
+    return tracks
+
+
+def read_midi(file, merge=True):
+    """
+    Read a Standard MIDI File into Sequences.
+
+    Parameters
+    ----------
+    file : str, os.PathLike, bytes or file-like
+        The filename, the content of the file or a stream opened in binary mode.
+    merge : bool, optional
+        If True, return a single Sequence with the notes of all the tracks
+        sorted by start time, otherwise one Sequence per track (default is True).
+    """
+    tracks = [Sequence.from_batch(notes) for notes, _ in read_midi_tracks(file)]
+    if merge:
+        return Sequence.merge(tracks)
+    return tracks
+
+
+def read_midi_dir(directory, pattern="*.mid", processes=None, merge=True):
+    """
+    Read all the MIDI files of a directory in parallel worker processes.
+
+    Parameters
+    ----------
+    directory : str
+        The directory.
+    pattern : str, optional
+        The filename pattern (default is "*.mid").
+    processes : int, optional
+        The number of worker processes (default is the number of CPUs, 0 reads in the current process).
+    merge : bool, optional
+        See `read_midi` (default is True).
+
+    Returns
+    -------
+    dict
+        The Sequence (or list of Sequences) of each filename.
+    """
+    import glob
+    from concurrent.futures import ProcessPoolExecutor
+
+    filenames = sorted(glob.glob(os.path.join(directory, pattern)))
+    merges = [merge] * len(filenames)
+    if processes == 0:
+        return {filename: read_midi(filename, merge) for filename in filenames}
+    chunksize = max(1, len(filenames) // (4 * (processes or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return dict(zip(filenames, executor.map(read_midi, filenames, merges, chunksize=chunksize)))
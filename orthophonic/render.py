@@ -0,0 +1,162 @@
+from .sequence import Sequence, NoteBatch
+from .midi import write_sequences
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import itertools
+import os
+import numpy as np
+
+
+def parameter_grid(**parameters):
+    """
+    Return the cartesian product of parameter values as a list of dictionaries.
+
+    Example: `parameter_grid(M=[3, 5], theta=[0, 0.5])` gives 4 dictionaries.
+    """
+    names = list(parameters)
+    return [dict(zip(names, values)) for values in itertools.product(*parameters.values())]
+
+
+def get_arrangement(output):
+    """
+    Convert the output of a recipe to a (sequence, track, channel) arrangement.
+
+    A recipe can return a Sequence (track 0), a list of Sequences (one track
+    each) or a list of (sequence, track, channel) tuples.
+    """
+    if isinstance(output, Sequence):
+        return [(output, 0, 0)]
+    return [item if isinstance(item, tuple) else (item, track, 0) for track, item in enumerate(output)]
+
+
+def render_job(recipe, parameters, seed_sequence):
+    """
+    Run a recipe with an independent random generator.
+
+    The legacy global NumPy generator is also seeded from the job seed, so
+    that recipes calling `Vector.rvs_normal` without `rng` are reproducible.
+    Its previous state is restored afterwards.
+    """
+    state = np.random.get_state()
+    np.random.seed(seed_sequence.generate_state(1)[0])
+    try:
+        rng = np.random.default_rng(seed_sequence)
+        return get_arrangement(recipe(parameters, rng))
+    finally:
+        np.random.set_state(state)
+
+
+def render_chunk(recipe, jobs, output_dir, format="midi", bpm=120):
+    """
+    Render a chunk of jobs in a worker process and write the outputs.
+
+    Parameters
+    ----------
+    recipe : callable
+        A function `recipe(parameters, rng)` returning the sequences of a job.
+    jobs : list of tuple
+        The (index, parameters, seed_sequence) of each job.
+    output_dir : str
+        The output directory.
+    format : str, optional
+        "midi" writes one MIDI file per job, "npz" writes one columnar file
+        per chunk (default is "midi").
+    bpm : float, optional
+        The tempo of the MIDI files (default is 120).
+
+    Returns
+    -------
+    list of str
+        The written files.
+    """
+    paths = []
+    columns = []
+    for index, parameters, seed_sequence in jobs:
+        arrangement = render_job(recipe, parameters, seed_sequence)
+        if format == "midi":
+            path = os.path.join(output_dir, f"{index:06d}.mid")
+            write_sequences(arrangement, path, bpm=bpm)
+            paths.append(path)
+        elif format == "npz":
+            for sequence, track, channel in arrangement:
+                notes = sequence.notes.data
+                columns.append((notes, np.full(len(notes), index), np.full(len(notes), track), np.full(len(notes), channel)))
+        else:
+            raise ValueError("Invalid format. Use 'midi' or 'npz'.")
+
+    if format == "npz" and jobs:
+        path = os.path.join(output_dir, f"chunk_{jobs[0][0]:06d}.npz")
+        notes = np.concatenate([notes for notes, _, _, _ in columns]) if columns else NoteBatch.empty().data
+        store = {name: notes[name] for name in notes.dtype.names}
+        for position, name in enumerate(["job", "track", "channel"], start=1):
+            store[name] = np.concatenate([column[position] for column in columns]).astype(int) if columns else np.zeros(0, dtype=int)
+        np.savez(path, **store)
+        paths.append(path)
+    return paths
+
+
+def render_batch(recipe, parameters, output_dir, processes=None, chunksize=16, seed=None, format="midi", bpm=120):
+    """
+    Render many variations in parallel worker processes.
+
+    The jobs are split into chunks sent to a process pool. Each job gets an
+    independent random generator spawned from `seed`, so the outputs do not
+    depend on the number of processes. Workers write their outputs directly
+    and only return file names.
+
+    Parameters
+    ----------
+    recipe : callable
+        A picklable function `recipe(parameters, rng)` returning a Sequence,
+        a list of Sequences or a list of (sequence, track, channel) tuples.
+    parameters : list of dict
+        The parameters of each job (see `parameter_grid`).
+    output_dir : str
+        The output directory (created if needed).
+    processes : int, optional
+        The number of worker processes (default is the number of CPUs, 0 runs in the current process).
+    chunksize : int, optional
+        The number of jobs per chunk (default is 16).
+    seed : int, optional
+        The root seed of the random generators.
+    format : str, optional
+        "midi" (one file per job) or "npz" (one columnar file per chunk).
+    bpm : float, optional
+        The tempo of the MIDI files (default is 120).
+
+    Returns
+    -------
+    list of str
+        The written files, in job order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    seeds = np.random.SeedSequence(seed).spawn(len(parameters))
+    jobs = list(zip(range(len(parameters)), parameters, seeds))
+    chunks = [jobs[index:index + chunksize] for index in range(0, len(jobs), chunksize)]
+
+    if processes == 0:
+        results = [render_chunk(recipe, chunk, output_dir, format, bpm) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(render_chunk, recipe, chunk, output_dir, format, bpm) for chunk in chunks]
+            results = [future.result() for future in futures]
+    return [path for paths in results for path in paths]
+
+
+def load_store(output_dir):
+    """
+    Load the columnar files written by `render_batch(..., format="npz")`.
+
+    Returns
+    -------
+    tuple
+        A NoteBatch with all the notes and a dictionary with the "job",
+        "track" and "channel" columns.
+    """
+    files = sorted(glob.glob(os.path.join(output_dir, "chunk_*.npz")))
+    parts = [np.load(path) for path in files]
+    if len(parts) == 0:
+        return NoteBatch.empty(), {name: np.zeros(0, dtype=int) for name in ["job", "track", "channel"]}
+    columns = {name: np.concatenate([part[name] for part in parts]) for name in parts[0].files}
+    notes = NoteBatch(columns["pitch"], columns["start_time"], columns["duration"], columns["velocity"], columns["mute"])
+    return notes, {name: columns[name] for name in ["job", "track", "channel"]}
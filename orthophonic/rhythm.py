@@ -0,0 +1,238 @@
+from .base import Vector, sine_zeros_onsets
+import math
+import numpy as np
+
+
+WORD_SIZE = 64
+
+# number of set bits of each byte, used when np.bitwise_count is not available
+POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def popcount(words):
+    """
+    Return the number of set bits of each uint64 word.
+    """
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape + (8,))
+    return POPCOUNT_TABLE[as_bytes].sum(axis=-1)
+
+
+class Rhythm:
+    """
+    A set of rhythms of N steps stored as packed bits.
+
+    Each rhythm is a row of uint64 words, the step `i` being the bit `i % 64`
+    of the word `i // 64`. All the operations apply to every row at once.
+
+    Attributes
+    ----------
+    words : np.ndarray
+        A (patterns, words) array of np.uint64.
+    N : int
+        The number of steps of the rhythms.
+    """
+    def __init__(self, words, N):
+        """
+        Initialize the rhythms from packed words.
+
+        Parameters
+        ----------
+        words : np.ndarray
+            A (patterns, ceil(N / 64)) array of np.uint64 (unused bits must be 0).
+        N : int
+            The number of steps.
+        """
+        words = np.asarray(words, dtype=np.uint64)
+        if words.ndim == 1:
+            words = words[None, :]
+        if words.shape[1] != -(-N // WORD_SIZE):
+            raise ValueError("The number of words does not match the number of steps.")
+        self.words = words
+        self.N = N
+
+    @classmethod
+    def from_mask(cls, mask):
+        """
+        Create rhythms from boolean step masks.
+
+        Parameters
+        ----------
+        mask : array_like
+            A (N,) or (patterns, N) boolean array.
+        """
+        mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+        patterns, N = mask.shape
+        n_words = -(-N // WORD_SIZE)
+        padded = np.zeros((patterns, n_words * WORD_SIZE), dtype=bool)
+        padded[:, :N] = mask
+        packed = np.packbits(padded, axis=1, bitorder="little")
+        words = np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+        return cls(words, N)
+
+    @classmethod
+    def from_onsets(cls, onsets, N):
+        """
+        Create rhythms from integer onsets.
+
+        Parameters
+        ----------
+        onsets : Vector, array_like or list of them
+            The onsets (steps) of one rhythm, or a list of onsets for several rhythms.
+        N : int
+            The number of steps (onsets are taken modulo N).
+        """
+        single = isinstance(onsets, Vector) or (isinstance(onsets, np.ndarray) and onsets.ndim == 1)
+        if single or (isinstance(onsets, list) and len(onsets) > 0 and np.isscalar(onsets[0])):
+            onsets = [onsets]
+        mask = np.zeros((len(onsets), N), dtype=bool)
+        for row, values in enumerate(onsets):
+            values = values.array if isinstance(values, Vector) else np.asarray(values)
+            mask[row, values.astype(int) % N] = True
+        return cls.from_mask(mask)
+
+    @classmethod
+    def from_sine_zeros(cls, M, N, theta=0, repeat=1):
+        """
+        Create the rhythms of quantized `Sine_Zeros` (see `sine_zeros_onsets`).
+
+        `M` and `theta` may be arrays: one rhythm is created for each (M, theta) pair.
+        """
+        M, theta = np.broadcast_arrays(np.atleast_1d(M), np.atleast_1d(theta))
+        onsets = [sine_zeros_onsets(m, N, t, repeat) for m, t in zip(M.tolist(), theta.tolist())]
+        return cls.from_onsets(onsets, repeat * N)
+
+    @classmethod
+    def combinations(cls, M, N):
+        """
+        Create all the rhythms with M onsets among N steps.
+
+        The rhythms are in the lexicographic order of their onsets (the order of
+        `itertools.combinations`). The words are built directly, level by level:
+        the rhythms with m onsets starting at step f are the rhythms with m-1
+        onsets after f (a suffix of the previous level) with the bit f set.
+        """
+        n_words = -(-N // WORD_SIZE)
+        if M < 0 or M > N:
+            return cls(np.zeros((0, n_words), dtype=np.uint64), N)
+        # level m holds the rhythms with m onsets among steps 0..N-1 (lexicographic order)
+        level = np.zeros((1, n_words), dtype=np.uint64)
+        for m in range(1, M + 1):
+            output = np.empty((math.comb(N, m), n_words), dtype=np.uint64)
+            position = 0
+            for f in range(N - m + 1):
+                # the rhythms with m-1 onsets among steps f+1..N-1 end the previous level
+                suffix = level[len(level) - math.comb(N - f - 1, m - 1):]
+                piece = output[position:position + len(suffix)]
+                piece[:] = suffix
+                piece[:, f // WORD_SIZE] |= np.uint64(1 << (f % WORD_SIZE))
+                position += len(suffix)
+            level = output
+        return cls(level, N)
+
+    @property
+    def valid_bits(self):
+        """
+        Return the words with all the bits of the N steps set.
+        """
+        return Rhythm.from_mask(np.ones(self.N, dtype=bool)).words[0]
+
+    def to_mask(self):
+        """
+        Return the (patterns, N) boolean step masks.
+        """
+        as_bytes = np.ascontiguousarray(self.words.astype("<u8")).view(np.uint8)
+        return np.unpackbits(as_bytes, axis=1, bitorder="little")[:, :self.N].astype(bool)
+
+    def to_onsets(self):
+        """
+        Return the onsets of each rhythm as a list of integer arrays.
+        """
+        return [np.flatnonzero(row) for row in self.to_mask()]
+
+    def to_vectors(self):
+        """
+        Return the onsets of each rhythm as a list of Vector.
+        """
+        return [Vector(onsets) for onsets in self.to_onsets()]
+
+    def _other_words(self, other):
+        if not isinstance(other, Rhythm) or other.N != self.N:
+            raise ValueError("Rhythms must have the same number of steps.")
+        return other.words
+
+    def __or__(self, other):
+        return Rhythm(self.words | self._other_words(other), self.N)
+
+    def __and__(self, other):
+        return Rhythm(self.words & self._other_words(other), self.N)
+
+    def __xor__(self, other):
+        return Rhythm(self.words ^ self._other_words(other), self.N)
+
+    def __invert__(self):
+        return Rhythm(~self.words & self.valid_bits, self.N)
+
+    def difference(self, other):
+        """
+        Return the steps of self which are not in other (self AND NOT other).
+        """
+        return Rhythm(self.words & ~self._other_words(other), self.N)
+
+    def roll(self, shift):
+        """
+        Rotate the steps of the rhythms by a specified amount (like `np.roll` on the step masks).
+        """
+        shift = shift % self.N if self.N else 0
+        if shift == 0:
+            return Rhythm(self.words.copy(), self.N)
+        if self.words.shape[1] == 1:
+            words = self.words[:, 0]
+            rotated = (words << np.uint64(shift)) | (words >> np.uint64(self.N - shift))
+            return Rhythm((rotated & self.valid_bits[0])[:, None], self.N)
+        return Rhythm.from_mask(np.roll(self.to_mask(), shift, axis=1))
+
+    def popcount(self):
+        """
+        Return the number of onsets of each rhythm.
+        """
+        return popcount(self.words).sum(axis=1).astype(int)
+
+    def density(self):
+        """
+        Return the proportion of steps with an onset for each rhythm.
+        """
+        return self.popcount() / self.N
+
+    def hamming(self, other):
+        """
+        Return the number of steps which differ between self and other.
+        """
+        return popcount(self.words ^ self._other_words(other)).sum(axis=1).astype(int)
+
+    def jaccard(self, other):
+        """
+        Return the Jaccard similarity (|A AND B| / |A OR B|) between self and other.
+        """
+        words = self._other_words(other)
+        intersection = popcount(self.words & words).sum(axis=1)
+        union = popcount(self.words | words).sum(axis=1)
+        return np.where(union > 0, intersection / np.maximum(union, 1), 1.0)
+
+    def __len__(self):
+        """
+        Return the number of rhythms.
+        """
+        return len(self.words)
+
+    def __getitem__(self, index):
+        """
+        Return a subset of the rhythms.
+        """
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        return Rhythm(self.words[index], self.N)
+
+    def __repr__(self):
+        return f"Rhythm({len(self.words)} patterns, N={self.N})"
@@ -0,0 +1,250 @@
+from .ableton import send_notes, MAX_NOTES_PER_MESSAGE
+from .sequence import NoteBatch
+import asyncio
+import time
+import numpy as np
+
+
+class BeatClock:
+    """
+    A clock returning the current position in beats from the wall time.
+
+    Parameters
+    ----------
+    bpm : float, optional
+        The tempo in beats per minute (default is 120).
+    """
+    def __init__(self, bpm=120):
+        self.bpm = bpm
+        self.start()
+
+    def start(self):
+        """
+        Reset the position to beat 0.
+        """
+        self.origin = time.perf_counter()
+
+    def __call__(self):
+        return (time.perf_counter() - self.origin) * self.bpm / 60
+
+
+class LiveClock:
+    """
+    A clock returning Live's song position in beats.
+
+    The song position and the tempo are queried at most every `resync`
+    seconds; in between, the position is extrapolated from the wall time, so
+    polling the clock does not wait for Live.
+
+    Parameters
+    ----------
+    transport : object
+        An object with the `query(msg, args)` method of `live.Query` (e.g. an
+        `orthophonic.session.Session`).
+    resync : float, optional
+        The period of the queries in seconds (default is 1).
+    """
+    def __init__(self, transport, resync=1.0):
+        self.transport = transport
+        self.resync = resync
+        self.synced = None
+
+    def sync(self):
+        """
+        Query the song position and the tempo.
+        """
+        beat = float(self.transport.query("/live/song/get/current_song_time")[0])
+        tempo = float(self.transport.query("/live/song/get/tempo")[0])
+        self.synced = (time.perf_counter(), beat, tempo)
+
+    def __call__(self):
+        if self.synced is None or time.perf_counter() - self.synced[0] >= self.resync:
+            self.sync()
+        origin, beat, tempo = self.synced
+        return beat + (time.perf_counter() - origin) * tempo / 60
+
+
+class SchedulerStats:
+    """
+    Timing statistics of a Scheduler.
+
+    Attributes
+    ----------
+    lateness : list of float
+        The delay (in seconds) between the requested and the actual wake-up times.
+    lead : list of float
+        The position (in beats) of each sent chunk ahead of the playhead.
+    notes : int
+        The number of notes sent.
+    messages : int
+        The number of OSC messages sent.
+    """
+    def __init__(self):
+        self.lateness = []
+        self.lead = []
+        self.notes = 0
+        self.messages = 0
+
+    @property
+    def latency(self):
+        """
+        Return the mean wake-up delay in seconds.
+        """
+        return float(np.mean(self.lateness)) if self.lateness else 0.0
+
+    @property
+    def jitter(self):
+        """
+        Return the standard deviation of the wake-up delay in seconds.
+        """
+        return float(np.std(self.lateness)) if self.lateness else 0.0
+
+    @property
+    def min_lead(self):
+        """
+        Return the smallest lead (in beats) of a sent chunk (negative if a chunk was late).
+        """
+        return float(np.min(self.lead)) if self.lead else 0.0
+
+    def __repr__(self):
+        return f"SchedulerStats(notes={self.notes}, messages={self.messages}, latency={self.latency:.6f}, jitter={self.jitter:.6f}, min_lead={self.min_lead:.3f})"
+
+
+class Scheduler:
+    """
+    An asyncio scheduler sending Sequence chunks to an Ableton clip ahead of the playhead.
+
+    Each source is an iterable of Sequence (e.g. `orthophonic.stream.sequence_stream`).
+    A chunk is sent as soon as its first note enters the lookahead window
+    [playhead, playhead + lookahead]. Sending happens in a worker thread, so
+    the event loop keeps generating the next chunks.
+
+    In a looping clip of `loop_length` beats, the start times are wrapped to
+    the loop and the region of `chunk_length` beats written by each chunk is
+    cleared first, so the clip keeps its length and each chunk replaces the
+    previous loop iteration (the clip is assumed to start at a multiple of
+    `loop_length` in the song, see `LiveClock`).
+
+    Parameters
+    ----------
+    clip : live.Clip
+        The destination clip.
+    transport : object, optional
+        An object with a `cmd(msg, args)` method (default is `clip.live`).
+    lookahead : float, optional
+        The size of the lookahead window in beats (default is 4).
+    clock : callable, optional
+        A function returning the playhead position in beats (default is a
+        BeatClock at 120 bpm, use a `LiveClock` to follow Live's song position).
+    interval : float, optional
+        The polling period in seconds (default is 0.01).
+    batch_size : int, optional
+        The maximum number of notes per OSC message.
+    loop_length : float, optional
+        The length of the clip loop in beats (default is `clip.length` if it
+        exists, None sends the notes at their absolute times).
+    chunk_length : float, optional
+        The length in beats of the region written by each chunk (default is 4, one bar).
+    """
+    def __init__(self, clip, transport=None, lookahead=4, clock=None, interval=0.01, batch_size=MAX_NOTES_PER_MESSAGE,
+                 loop_length=None, chunk_length=4):
+        self.clip = clip
+        self.transport = transport
+        self.lookahead = lookahead
+        self.clock = BeatClock() if clock is None else clock
+        self.interval = interval
+        self.batch_size = batch_size
+        self.loop_length = getattr(clip, "length", None) if loop_length is None else loop_length
+        self.chunk_length = chunk_length
+        self.sources = []
+        self.stats = SchedulerStats()
+
+    def add_source(self, source):
+        """
+        Add a source of Sequence chunks.
+
+        Parameters
+        ----------
+        source : iterable of Sequence
+            The chunks, ordered by start time.
+        """
+        self.sources.append(source)
+        return self
+
+    async def sleep(self, delay):
+        """
+        Sleep and record the wake-up delay.
+        """
+        target = time.perf_counter() + delay
+        await asyncio.sleep(delay)
+        self.stats.lateness.append(time.perf_counter() - target)
+
+    def write(self, sequence):
+        """
+        Send a chunk to the clip (blocking), wrapped to the loop if any.
+        """
+        notes = sequence.notes
+        messages = 0
+        if self.loop_length:
+            transport = self.clip.live if self.transport is None else self.transport
+            region = np.floor(np.min(notes.start_time) / self.chunk_length) * self.chunk_length
+            transport.cmd("/live/clip/remove/notes", (self.clip.track.index, self.clip.index, 0, 128,
+                                                      float(np.mod(region, self.loop_length)), float(self.chunk_length)))
+            messages += 1
+            notes = NoteBatch.from_array(notes.data.copy())
+            notes.data["start_time"] = np.mod(notes.start_time, self.loop_length)
+        transfer = send_notes(self.clip, notes, self.transport, self.batch_size)
+        transfer.messages += messages
+        return transfer
+
+    async def send(self, sequence):
+        """
+        Send a chunk in a worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        transfer = await loop.run_in_executor(None, self.write, sequence)
+        self.stats.notes += transfer.notes
+        self.stats.messages += transfer.messages
+
+    async def play_source(self, source, until=None):
+        """
+        Send the chunks of a source when they enter the lookahead window.
+        """
+        pending = []
+        try:
+            for sequence in source:
+                if len(sequence) == 0:
+                    continue
+                start = float(np.min(sequence.notes.start_time))
+                if until is not None and start >= until:
+                    break
+                while start > self.clock() + self.lookahead:
+                    await self.sleep(self.interval)
+                self.stats.lead.append(start - self.clock())
+                pending.append(asyncio.ensure_future(self.send(sequence)))
+                for task in pending:
+                    if task.done():
+                        task.result()  # raise the error of a failed send
+                pending = [task for task in pending if not task.done()]
+                await asyncio.sleep(0)
+            await asyncio.gather(*pending)
+        finally:
+            # retrieve the results of the remaining sends if a send failed
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run(self, until=None):
+        """
+        Run all the sources concurrently.
+
+        Parameters
+        ----------
+        until : float, optional
+            Stop the sources at this position in beats (required for unbounded sources).
+
+        Returns
+        -------
+        SchedulerStats
+            The timing statistics.
+        """
+        await asyncio.gather(*(self.play_source(source, until) for source in self.sources))
+        return self.stats
@@ -1,4 +1,7 @@
-from .base import Vector
+from .base import Vector, get_rng
+from .ableton import send_notes, MAX_NOTES_PER_MESSAGE
+from .instrument import instrument
+from .index import NoteIndex
 import numpy as np
 
 
@@ -6,6 +9,10 @@ class Note:
     """
     A class representing a musical note.
 
+    A note taken from a NoteBatch or a Sequence (iteration, integer indexing,
+    `note_list`) is a view on its row: setting one of its attributes modifies
+    the stored note.
+
     Attributes
     ----------
     pitch : int
@@ -16,6 +23,8 @@ class Note:
         The start time of the note.
     duration : float
         The duration of the note.
+    mute : bool
+        The mute flag of the note.
     """
     def __init__(self, pitch, velocity, start_time, duration, mute=False):
         """
@@ -32,12 +41,69 @@ class Note:
         duration : float
             The duration of the note.
         """
-        self.pitch = int(pitch)
+        self._batch = None
+        self._row = np.zeros(1, dtype=NOTE_DTYPE)[0]
+        self.pitch = pitch
         self.start_time = start_time
-        self.velocity = int(velocity)
+        self.velocity = velocity
         self.duration = duration
         self.mute = mute
 
+    @classmethod
+    def from_batch(cls, batch, index):
+        """
+        Return a view on the note at a given index of a NoteBatch.
+        """
+        note = cls.__new__(cls)
+        note._batch = batch
+        note._row = batch.data[index]
+        return note
+
+    def _set(self, field, value):
+        self._row[field] = value
+        if self._batch is not None:
+            self._batch.version += 1
+
+    @property
+    def pitch(self):
+        return int(self._row["pitch"])
+
+    @pitch.setter
+    def pitch(self, value):
+        self._set("pitch", int(value))
+
+    @property
+    def start_time(self):
+        return float(self._row["start_time"])
+
+    @start_time.setter
+    def start_time(self, value):
+        self._set("start_time", value)
+
+    @property
+    def duration(self):
+        return float(self._row["duration"])
+
+    @duration.setter
+    def duration(self, value):
+        self._set("duration", value)
+
+    @property
+    def velocity(self):
+        return int(self._row["velocity"])
+
+    @velocity.setter
+    def velocity(self, value):
+        self._set("velocity", int(value))
+
+    @property
+    def mute(self):
+        return bool(self._row["mute"])
+
+    @mute.setter
+    def mute(self, value):
+        self._set("mute", value)
+
     def __repr__(self):
         """
         Return a string representation of the Note.
@@ -56,15 +122,192 @@ class Note:
         return [self.pitch, self.start_time, self.duration, self.velocity, self.mute]
 
 
+NOTE_DTYPE = np.dtype([
+    ("pitch", np.int64),
+    ("start_time", np.float64),
+    ("duration", np.float64),
+    ("velocity", np.int64),
+    ("mute", np.bool_),
+])
+
+
+class NoteBatch:
+    """
+    A columnar (struct-of-arrays) container of musical notes.
+
+    The notes are stored in a single structured array with the fields of
+    `NOTE_DTYPE`. `Note` objects are only created when the batch is iterated
+    or indexed with an integer, as views on their rows.
+
+    Attributes
+    ----------
+    data : np.ndarray
+        A structured array with fields pitch, start_time, duration, velocity and mute.
+    version : int
+        The number of modifications made through `Note` views.
+    """
+    def __init__(self, pitch, start_time, duration, velocity, mute=False):
+        """
+        Initialize a NoteBatch from columns.
+
+        Parameters
+        ----------
+        pitch : array_like
+            The pitch values of the notes.
+        start_time : array_like
+            The start times of the notes.
+        duration : array_like
+            The durations of the notes (broadcast to the number of notes).
+        velocity : array_like
+            The velocities of the notes (broadcast to the number of notes).
+        mute : bool or array_like, optional
+            The mute flags of the notes (default is False).
+        """
+        start_time = np.asarray(start_time, dtype=np.float64)
+        data = np.empty(len(start_time), dtype=NOTE_DTYPE)
+        data["pitch"] = np.asarray(pitch).astype(np.int64)
+        data["start_time"] = start_time
+        data["duration"] = duration
+        data["velocity"] = np.asarray(velocity).astype(np.int64)
+        data["mute"] = mute
+        self.data = data
+        self.version = 0
+
+    @classmethod
+    def from_array(cls, data):
+        """
+        Create a NoteBatch from a structured array with the `NOTE_DTYPE` fields (no copy).
+        """
+        batch = cls.__new__(cls)
+        batch.data = np.asarray(data, dtype=NOTE_DTYPE)
+        batch.version = 0
+        return batch
+
+    @classmethod
+    def from_notes(cls, notes):
+        """
+        Create a NoteBatch from an iterable of `Note` objects.
+
+        Parameters
+        ----------
+        notes : iterable of Note
+            The notes to store.
+        """
+        rows = [(note.pitch, note.start_time, note.duration, note.velocity, note.mute) for note in notes]
+        return cls.from_array(np.array(rows, dtype=NOTE_DTYPE))
+
+    @classmethod
+    def empty(cls):
+        """
+        Create an empty NoteBatch.
+        """
+        return cls.from_array(np.empty(0, dtype=NOTE_DTYPE))
+
+    @classmethod
+    def concatenate(cls, batches):
+        """
+        Merge several NoteBatch objects into a single one.
+
+        Parameters
+        ----------
+        batches : iterable of NoteBatch
+            The batches to merge.
+        """
+        arrays = [batch.data for batch in batches]
+        if len(arrays) == 0:
+            return cls.empty()
+        return cls.from_array(np.concatenate(arrays))
+
+    @property
+    def pitch(self):
+        return self.data["pitch"]
+
+    @property
+    def start_time(self):
+        return self.data["start_time"]
+
+    @property
+    def duration(self):
+        return self.data["duration"]
+
+    @property
+    def velocity(self):
+        return self.data["velocity"]
+
+    @property
+    def mute(self):
+        return self.data["mute"]
+
+    def sort(self, key="start_time"):
+        """
+        Return a new NoteBatch sorted by the given field (stable sort).
+
+        Parameters
+        ----------
+        key : str, optional
+            The field used for sorting (default is "start_time").
+        """
+        index = np.argsort(self.data[key], kind="stable")
+        return NoteBatch.from_array(self.data[index])
+
+    def note(self, index):
+        """
+        Return the note at a given index as a `Note` view (see `Note`).
+        """
+        return Note.from_batch(self, index)
+
+    def tolist(self):
+        """
+        Convert the batch to a list of [pitch, start_time, duration, velocity, mute] lists.
+        """
+        return [list(row) for row in self.data.tolist()]
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        """
+        Iterate over the notes as `Note` objects.
+        """
+        for index in range(len(self.data)):
+            yield self.note(index)
+
+    def __getitem__(self, index):
+        """
+        Return a `Note` for an integer index, or a NoteBatch for a slice, mask or index array.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.note(index)
+        return NoteBatch.from_array(self.data[index])
+
+    def __repr__(self):
+        return f"NoteBatch({len(self.data)} notes)"
+
+
+def _get_column(vector, M, dtype=None):
+    """
+    Return the values of a vector for M notes: a scalar for a vector of
+    length 1, otherwise the array of the vector resized to M.
+    """
+    if len(vector) == 1:
+        value = vector.array[0]
+        return value if dtype is None else dtype(value)
+    vector.resize(M)
+    if dtype is not None:
+        vector.astype(dtype)
+    return vector.array
+
+
 class Sequence:
     """
     A class representing a sequence of musical notes.
     
     Attributes
     ----------
-    note_list : list of Note
-        A list containing Note objects.
+    notes : NoteBatch
+        The columnar storage of the notes.
     """
+    @instrument("Sequence.__init__", elements=lambda self, *args, **kwargs: len(self.notes))
     def __init__(self, start_time_vector, pitch_vector, velocity_vector=None, duration_vector=None):
         """
         Initialize a Sequence of notes.
@@ -82,33 +325,150 @@ class Sequence:
         """
         M = len(start_time_vector)
 
-        pitch_vector.resize(M).astype(int)
-
         if velocity_vector is None:
             velocity_vector = Vector(100)
-        velocity_vector = velocity_vector.resize(M).astype(int)
-    
         if duration_vector is None:
             duration_vector = Vector(0.5)
 
-        duration_vector = duration_vector.resize(M)
+        # length-1 columns are broadcast by NoteBatch instead of being resized
+        pitch = _get_column(pitch_vector, M, int)
+        velocity = _get_column(velocity_vector, M, int)
+        duration = _get_column(duration_vector, M)
+        self.notes = NoteBatch(pitch, start_time_vector.array, duration, velocity)
+
+    @classmethod
+    def from_batch(cls, notes):
+        """
+        Create a Sequence from a NoteBatch.
+
+        Parameters
+        ----------
+        notes : NoteBatch
+            The notes of the sequence.
+        """
+        sequence = cls.__new__(cls)
+        sequence.notes = notes
+        return sequence
+
+    @classmethod
+    def merge(cls, sequences, sort=True):
+        """
+        Merge several sequences into a single one.
+
+        Parameters
+        ----------
+        sequences : iterable of Sequence
+            The sequences to merge.
+        sort : bool, optional
+            If True, sort the merged notes by start time (default is True).
+        """
+        notes = NoteBatch.concatenate([sequence.notes for sequence in sequences])
+        if sort:
+            notes = notes.sort()
+        return cls.from_batch(notes)
+
+    @property
+    def note_list(self):
+        """
+        Return the notes as a list of `Note` objects.
+
+        The notes are views on the rows of `notes`: setting their attributes
+        modifies the sequence. The list itself is built on each access, so
+        adding or removing notes requires assigning a new list (or `append`).
+        """
+        return list(self.notes)
 
-        note_list = []
-        for m in range(M):
-            start_time = start_time_vector[m]
-            pitch = pitch_vector[m]
-            velocity = velocity_vector[m]
-            duration = duration_vector[m]
-            note_temp = Note(pitch, velocity, start_time, duration)
-            note_list.append(note_temp)
+    @note_list.setter
+    def note_list(self, notes):
+        self.notes = NoteBatch.from_notes(notes)
 
-        self.note_list = note_list
+    @property
+    def index(self):
+        """
+        Return the time-range index of the notes (see `NoteIndex`).
+
+        The index is built on first use and kept up to date by `append`. It is
+        rebuilt when the notes are replaced (e.g. by `sort`) or modified (by
+        `humanize` or through `Note` views).
+        """
+        index = getattr(self, "_index", None)
+        if (index is None or getattr(self, "_index_notes", None) is not self.notes
+                or self._index_version != self.notes.version):
+            index = NoteIndex(self.notes.start_time, self.notes.duration)
+            self._index, self._index_notes, self._index_version = index, self.notes, self.notes.version
+        return index
+
+    def append(self, notes):
+        """
+        Append notes to the sequence (the time-range index is updated, not rebuilt).
+
+        Parameters
+        ----------
+        notes : NoteBatch or Sequence
+            The notes to append.
+        """
+        if isinstance(notes, Sequence):
+            notes = notes.notes
+        index = self.index
+        self.notes = NoteBatch.concatenate([self.notes, notes])
+        index.append(notes.start_time, notes.duration)
+        self._index_notes, self._index_version = self.notes, self.notes.version
+        return self
+
+    def window(self, start, end):
+        """
+        Return the notes sounding between two times (in beats), sorted by start time.
+
+        Parameters
+        ----------
+        start : float
+            The start of the window.
+        end : float
+            The end of the window (excluded).
+        """
+        return self[self.index.window(start, end)]
+
+    def active_at(self, time):
+        """
+        Return the notes sounding at a given time (in beats), sorted by start time.
+        """
+        return self[self.index.active_at(time)]
 
     def reset(self):
         """
         Reset the sequence by clearing all notes.
         """
-        self.note_list = []
+        self.notes = NoteBatch.empty()
+
+    def sort(self):
+        """
+        Sort the notes by start time.
+        """
+        self.notes = self.notes.sort()
+        return self
+
+    def humanize(self, time_scale=0, velocity_scale=0, rng=None):
+        """
+        Add normally distributed random noise to the start times and velocities.
+
+        See `humanize` for the parameters.
+        """
+        humanize([self], time_scale, velocity_scale, rng)
+        return self
+
+    def __len__(self):
+        """
+        Return the number of notes in the sequence.
+        """
+        return len(self.notes)
+
+    def __getitem__(self, index):
+        """
+        Return a `Note` for an integer index, or a Sequence for a slice, mask or index array.
+        """
+        if isinstance(index, (int, np.integer)):
+            return self.notes[index]
+        return Sequence.from_batch(self.notes[index])
 
     def __iter__(self):
         """
@@ -119,7 +479,7 @@ class Sequence:
         iterator
             An iterator over the notes in the sequence.
         """
-        return iter(self.note_list)
+        return iter(self.notes)
 
     def get_notes(self):
         """
@@ -128,11 +488,65 @@ class Sequence:
         return self.note_list
 
 
-    def send_to_ableton(self, clip, length=16):
+    @instrument("Sequence.send_to_ableton", elements=lambda self, *args, **kwargs: len(self.notes))
+    def send_to_ableton(self, clip, length=16, transport=None, batch_size=MAX_NOTES_PER_MESSAGE, sync=None):
         """
         Send sequence to ableton clip
+
+        The notes are packed by chunks of `batch_size` into "/live/clip/add/notes"
+        messages (see `orthophonic.ableton.send_notes`). With a `ClipSync`,
+        the clip content is replaced by the sequence and only the notes which
+        changed since the last update are sent.
+
+        Parameters
+        ----------
+        clip : live.Clip
+            The destination clip.
+        length : float, optional
+            The length of the clip in beats (default is 16).
+        transport : object, optional
+            An object with a `cmd(msg, args)` method (default is `clip.live`).
+        batch_size : int, optional
+            The maximum number of notes per OSC message.
+        sync : ClipSync, optional
+            The clip synchronizer (its transport and batch size are used).
+
+        Returns
+        -------
+        TransferStats
+            The number of notes and messages sent and the elapsed time.
         """
-        for note in self.note_list:   
-            clip.add_note(note.pitch, note.start_time, note.duration, note.velocity, note.mute)
+        if sync is not None:
+            return sync.update(clip, self.notes)
+        return send_notes(clip, self.notes, transport=transport, batch_size=batch_size)
+
+
+def humanize(sequences, time_scale=0, velocity_scale=0, rng=None):
+    """
+    Add normally distributed noise to the start times and velocities of many sequences.
+
+    The noise of all the notes is drawn with a single call to the generator.
+    Start times are clipped to be non-negative and velocities to [1, 127].
 
-        return None
+    Parameters
+    ----------
+    sequences : list of Sequence
+        The sequences to modify (in place).
+    time_scale : float, optional
+        Standard deviation of the timing noise in beats (default is 0).
+    velocity_scale : float, optional
+        Standard deviation of the velocity noise (default is 0).
+    rng : int or np.random.Generator, optional
+        The random generator or its seed (default is the global NumPy generator).
+    """
+    lengths = [len(sequence) for sequence in sequences]
+    noise = get_rng(rng).normal(size=(2, sum(lengths)))
+    offsets = np.cumsum([0] + lengths)
+    for index, sequence in enumerate(sequences):
+        time_noise, velocity_noise = noise[:, offsets[index]:offsets[index + 1]]
+        notes = sequence.notes.data
+        notes["start_time"] = np.maximum(notes["start_time"] + time_scale * time_noise, 0)
+        velocity = (notes["velocity"] + velocity_scale * velocity_noise).astype(np.int64)
+        notes["velocity"] = np.clip(velocity, 1, 127)
+        sequence._index = None
+    return sequences
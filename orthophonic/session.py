@@ -0,0 +1,298 @@
+class Session:
+    """
+    Lazy handles on a Live set.
+
+    Unlike `live.Set(scan=True)`, which queries every track and clip of the set,
+    a Session only queries the tracks and clip slots which are used, once: the
+    handles and their properties are cached until `refresh` is called. All the
+    handles share the transport of the session (a single OSC connection).
+
+    It exposes the interface of `live.Set` used by `create_clip`:
+
+        session = Session()
+        clip = create_clip(session, track_index, clip_index, 16)
+
+    Parameters
+    ----------
+    transport : object, optional
+        An object with the `cmd(msg, args)` and `query(msg, args)` methods of
+        `live.Query` (default is the `live.Query` instance, created on first use).
+
+    Attributes
+    ----------
+    tracks : TrackList
+        The lazily created track handles, indexed by track index.
+    queries : int
+        The number of queries sent to Live.
+    messages : int
+        The number of commands sent to Live.
+    """
+    def __init__(self, transport=None):
+        self._transport = transport
+        self._tracks = {}
+        self._num_tracks = None
+        self.tracks = TrackList(self)
+        self.queries = 0
+        self.messages = 0
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            from live import Query
+
+            self._transport = Query()
+        return self._transport
+
+    def cmd(self, msg, args=()):
+        """
+        Send a command to Live without expecting a response.
+        """
+        self.messages += 1
+        self.transport.cmd(msg, args)
+
+    def query(self, msg, args=()):
+        """
+        Send a query to Live and return its response.
+        """
+        self.queries += 1
+        return self.transport.query(msg, args)
+
+    @property
+    def num_tracks(self):
+        """
+        Return the number of tracks of the set (cached).
+        """
+        if self._num_tracks is None:
+            self._num_tracks = int(self.query("/live/song/get/num_tracks")[0])
+        return self._num_tracks
+
+    def track(self, index):
+        """
+        Return the handle of a track (cached, nothing is queried).
+        """
+        track = self._tracks.get(index)
+        if track is None:
+            track = self._tracks[index] = TrackHandle(self, index)
+        return track
+
+    def clip(self, track_index, clip_index):
+        """
+        Return the handle of a clip, or None if the clip slot is empty.
+        """
+        return self.track(track_index).clips[clip_index]
+
+    def refresh(self, track_index=None, clip_index=None):
+        """
+        Forget cached state so that it is queried again.
+
+        Parameters
+        ----------
+        track_index : int, optional
+            The track to refresh (default is all the tracks).
+        clip_index : int, optional
+            The clip slot to refresh (default is the whole track).
+        """
+        if track_index is None:
+            self._tracks.clear()
+            self._num_tracks = None
+        elif clip_index is None:
+            self._tracks.pop(track_index, None)
+        elif track_index in self._tracks:
+            self._tracks[track_index].clips.refresh(clip_index)
+
+
+class TrackList:
+    """
+    Track handles of a Session, created on access (`session.tracks[index]`).
+    """
+    def __init__(self, session):
+        self.session = session
+
+    def __getitem__(self, index):
+        return self.session.track(index)
+
+    def __len__(self):
+        return self.session.num_tracks
+
+
+class TrackHandle:
+    """
+    A lazy handle on a Live track.
+
+    Attributes
+    ----------
+    index : int
+        The index of the track.
+    live : Session
+        The session used to communicate with Live.
+    clips : ClipSlots
+        The clip handles, queried on access (`track.clips[index]`).
+    """
+    def __init__(self, session, index):
+        self.live = session
+        self.index = index
+        self.clips = ClipSlots(self)
+        self._is_midi_track = None
+
+    @property
+    def is_midi_track(self):
+        """
+        Return True if the track is a MIDI track (cached).
+        """
+        if self._is_midi_track is None:
+            self._is_midi_track = bool(self.live.query("/live/track/get/has_midi_input", (self.index,))[1])
+        return self._is_midi_track
+
+    def create_clip(self, clip_index, length):
+        """
+        Create a MIDI clip in a clip slot and return its handle.
+
+        Raises
+        ------
+        ValueError
+            If the clip slot already contains a clip.
+        """
+        if self.clips[clip_index] is not None:
+            raise ValueError(f"Clip [{self.index}, {clip_index}] already exists")
+        self.live.cmd("/live/clip_slot/create_clip", (self.index, clip_index, length))
+        clip = ClipHandle(self, clip_index, length)
+        self.clips.set(clip_index, clip)
+        return clip
+
+    def delete_clip(self, clip_index):
+        """
+        Delete the clip of a clip slot.
+        """
+        self.live.cmd("/live/clip_slot/delete_clip", (self.index, clip_index))
+        self.clips.set(clip_index, None)
+
+    def __repr__(self):
+        return f"TrackHandle({self.index})"
+
+
+class ClipSlots:
+    """
+    The clip slots of a track handle. Each slot is queried once, on first access.
+    """
+    def __init__(self, track):
+        self.track = track
+        self._clips = {}
+
+    def __getitem__(self, index):
+        if index not in self._clips:
+            track = self.track
+            has_clip = track.live.query("/live/clip_slot/get/has_clip", (track.index, index))[2]
+            self._clips[index] = ClipHandle(track, index) if has_clip else None
+        return self._clips[index]
+
+    def set(self, index, clip):
+        self._clips[index] = clip
+
+    def refresh(self, index=None):
+        """
+        Forget the cached clip of a slot (default is all the slots).
+        """
+        if index is None:
+            self._clips.clear()
+        else:
+            self._clips.pop(index, None)
+
+
+class ClipHandle:
+    """
+    A lazy handle on a Live clip, usable with `send_notes`, `ClipSync` and
+    `Sequence.send_to_ableton`.
+
+    Attributes
+    ----------
+    track : TrackHandle
+        The track of the clip.
+    index : int
+        The index of the clip slot.
+    live : Session
+        The session used to communicate with Live.
+    """
+    def __init__(self, track, index, length=None):
+        self.track = track
+        self.index = index
+        self.live = track.live
+        self._length = length
+
+    @property
+    def length(self):
+        """
+        Return the length of the clip in beats (cached).
+        """
+        if self._length is None:
+            self._length = self.live.query("/live/clip/get/length", (self.track.index, self.index))[2]
+        return self._length
+
+    def __repr__(self):
+        return f"ClipHandle({self.track.index}, {self.index})"
+
+
+class MockTransport:
+    """
+    An in-memory stand-in for Live and AbletonOSC, for tests.
+
+    It answers the queries used by `Session` and applies the clip and note
+    commands to its model of the set.
+
+    Parameters
+    ----------
+    tracks : list of bool
+        For each track, True for a MIDI track and False for an audio track.
+    clips : dict, optional
+        A dict mapping (track, clip) to the length of the existing clips.
+
+    Attributes
+    ----------
+    clips : dict
+        A dict mapping (track, clip) to a dict with the "length" and the
+        "notes" (list of (pitch, start_time, duration, velocity, mute) tuples).
+    messages : list
+        The (msg, args) of the received commands and queries.
+    """
+    def __init__(self, tracks, clips=None):
+        self.tracks = list(tracks)
+        self.clips = {key: {"length": length, "notes": []} for key, length in (clips or {}).items()}
+        self.messages = []
+
+    def count(self, msg):
+        """
+        Return the number of received commands or queries with a given address.
+        """
+        return sum(1 for address, _ in self.messages if address == msg)
+
+    def query(self, msg, args=()):
+        self.messages.append((msg, tuple(args)))
+        if msg == "/live/song/get/num_tracks":
+            return (len(self.tracks),)
+        if msg == "/live/track/get/has_midi_input":
+            return (args[0], self.tracks[args[0]])
+        if msg == "/live/track/get/has_audio_input":
+            return (args[0], not self.tracks[args[0]])
+        if msg == "/live/clip_slot/get/has_clip":
+            return (args[0], args[1], tuple(args[:2]) in self.clips)
+        if msg == "/live/clip/get/length":
+            return (args[0], args[1], self.clips[tuple(args[:2])]["length"])
+        raise ValueError(f"Unsupported query {msg}")
+
+    def cmd(self, msg, args=()):
+        self.messages.append((msg, tuple(args)))
+        key = tuple(args[:2])
+        if msg == "/live/clip_slot/create_clip":
+            self.clips[key] = {"length": args[2], "notes": []}
+        elif msg == "/live/clip_slot/delete_clip":
+            self.clips.pop(key, None)
+        elif msg == "/live/clip/add/notes":
+            values = args[2:]
+            self.clips[key]["notes"] += [tuple(values[index:index + 5]) for index in range(0, len(values), 5)]
+        elif msg == "/live/clip/remove/notes" and len(args) == 2:
+            self.clips[key]["notes"] = []
+        elif msg == "/live/clip/remove/notes":
+            pitch, pitch_span, start_time, time_span = args[2:]
+            self.clips[key]["notes"] = [
+                note for note in self.clips[key]["notes"]
+                if not (pitch <= note[0] < pitch + pitch_span and start_time <= note[1] < start_time + time_span)
+            ]
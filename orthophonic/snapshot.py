@@ -0,0 +1,210 @@
+from .base import Vector
+from .sequence import Sequence, NoteBatch, NOTE_DTYPE
+import os
+import struct
+import numpy as np
+
+
+MAGIC = b"ORTHSNAP"
+VERSION = 2
+HEADER_SIZE = 128
+
+KIND_VECTOR = 1
+KIND_SEQUENCE = 2
+
+# header: magic, version, kind, dtype string (16 bytes), count, number of
+# columns and the offset of each column (MAX_COLUMNS entries)
+MAX_COLUMNS = 8
+HEADER_FORMAT = f"<8sHH16sQQ{MAX_COLUMNS}Q"
+
+# each column starts at a multiple of COLUMN_ALIGNMENT bytes
+COLUMN_ALIGNMENT = 64
+
+# fixed-width, little-endian layout of the notes on disk
+NOTE_FILE_DTYPE = NOTE_DTYPE.newbyteorder("<")
+
+
+def _align(offset):
+    return -(-offset // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+
+
+def write_snapshot(file, kind, array):
+    """
+    Write a header followed by the columns of an array.
+
+    A structured array (the notes) is stored field by field: each field is a
+    contiguous block, so a single field can be read without the others.
+
+    Parameters
+    ----------
+    file : str, os.PathLike or file-like
+        The output filename or a stream opened in binary mode.
+    kind : int
+        KIND_VECTOR or KIND_SEQUENCE.
+    array : np.ndarray
+        The 1-D array to store.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "wb") as f:
+            return write_snapshot(f, kind, array)
+
+    descr = array.dtype.str.encode() if array.dtype.names is None else b"notes"
+    columns = [array] if array.dtype.names is None else [array[name] for name in array.dtype.names]
+    offsets = []
+    offset = HEADER_SIZE
+    for column in columns:
+        offsets.append(offset)
+        offset = _align(offset + column.nbytes)
+    header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, kind, descr, len(array), len(columns),
+                         *offsets, *[0] * (MAX_COLUMNS - len(offsets)))
+    file.write(header.ljust(HEADER_SIZE, b"\0"))
+    position = HEADER_SIZE
+    for column, offset in zip(columns, offsets):
+        file.write(b"\0" * (offset - position))
+        file.write(np.ascontiguousarray(column).tobytes())
+        position = offset + column.nbytes
+
+
+def read_header(filename):
+    """
+    Read the header of a snapshot file.
+
+    Returns
+    -------
+    dict
+        The version, kind, dtype, count and column offsets of the file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a snapshot or has an unsupported version.
+    """
+    with open(filename, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError("Invalid snapshot: truncated header.")
+    magic, version, kind, descr, count, n_columns, *offsets = struct.unpack_from(HEADER_FORMAT, header)
+    if magic != MAGIC:
+        raise ValueError("Invalid snapshot: wrong magic number.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}.")
+    descr = descr.rstrip(b"\0").decode()
+    dtype = NOTE_FILE_DTYPE if descr == "notes" else np.dtype(descr)
+    if n_columns != len(dtype.names or [None]):
+        raise ValueError("Invalid snapshot: unexpected number of columns.")
+    return {"version": version, "kind": kind, "dtype": dtype, "count": count, "offsets": offsets[:n_columns]}
+
+
+def read_columns(filename, kind, mmap=True):
+    """
+    Return the columns stored in a snapshot file.
+
+    Parameters
+    ----------
+    filename : str or os.PathLike
+        The snapshot filename.
+    kind : int
+        The expected kind of content.
+    mmap : bool, optional
+        If True, each column is a read-only `np.memmap` of its block of the
+        file (default is True).
+
+    Returns
+    -------
+    dict
+        The columns by field name ("data" for a Vector).
+    """
+    header = read_header(filename)
+    if header["kind"] != kind:
+        raise ValueError("Invalid snapshot: unexpected content kind.")
+    dtype, count = header["dtype"], header["count"]
+    fields = [(name, dtype[name]) for name in dtype.names] if dtype.names is not None else [("data", dtype)]
+    columns = {}
+    for (name, column_dtype), offset in zip(fields, header["offsets"]):
+        if count == 0:
+            columns[name] = np.zeros(0, dtype=column_dtype)
+        elif mmap:
+            columns[name] = np.memmap(filename, dtype=column_dtype, mode="r", offset=offset, shape=(count,))
+        else:
+            with open(filename, "rb") as f:
+                f.seek(offset)
+                columns[name] = np.fromfile(f, dtype=column_dtype, count=count)
+    return columns
+
+
+def save_vector(vector, file):
+    """
+    Save a Vector to a snapshot file (its dtype is preserved).
+    """
+    array = vector.array
+    write_snapshot(file, KIND_VECTOR, array.astype(array.dtype.newbyteorder("<"), copy=False))
+
+
+def load_vector(filename, mmap=True):
+    """
+    Load a Vector from a snapshot file.
+
+    Parameters
+    ----------
+    filename : str or os.PathLike
+        The snapshot filename.
+    mmap : bool, optional
+        If True, the vector shares a read-only memory map of the file (default is True).
+    """
+    vector = Vector(0)
+    vector.array = read_columns(filename, KIND_VECTOR, mmap)["data"]
+    return vector
+
+
+def save_sequence(sequence, file):
+    """
+    Save the notes of a Sequence (or a NoteBatch) to a snapshot file, one column per field.
+    """
+    notes = sequence.notes if isinstance(sequence, Sequence) else sequence
+    write_snapshot(file, KIND_SEQUENCE, notes.data.astype(NOTE_FILE_DTYPE, copy=False))
+
+
+def load_columns(filename, mmap=True):
+    """
+    Return the note columns of a sequence snapshot.
+
+    With `mmap=True`, the columns are read-only memory maps of the file, so
+    reading one field (e.g. the start times of a large archive) does not
+    read the others.
+
+    Parameters
+    ----------
+    filename : str or os.PathLike
+        The snapshot filename.
+    mmap : bool, optional
+        If True, each column is a read-only `np.memmap` (default is True).
+
+    Returns
+    -------
+    dict
+        The pitch, start_time, duration, velocity and mute columns.
+    """
+    return read_columns(filename, KIND_SEQUENCE, mmap)
+
+
+def load_sequence(filename, mmap=True, start=None, stop=None):
+    """
+    Load a Sequence (or a range of its notes) from a snapshot file.
+
+    The notes are copied into a NoteBatch. With `mmap=True`, only the
+    requested range of each column is read from the file.
+
+    Parameters
+    ----------
+    filename : str or os.PathLike
+        The snapshot filename.
+    mmap : bool, optional
+        If True, the columns are read through memory maps (default is True).
+    start, stop : int, optional
+        The range of notes to load (default is all the notes).
+    """
+    columns = load_columns(filename, mmap)
+    data = np.empty(len(columns["pitch"][start:stop]), dtype=NOTE_DTYPE)
+    for name in NOTE_DTYPE.names:
+        data[name] = columns[name][start:stop]
+    return Sequence.from_batch(NoteBatch.from_array(data))
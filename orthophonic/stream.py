@@ -0,0 +1,133 @@
+from .base import Vector, Sine_Zeros
+from .sequence import Sequence
+import itertools
+import numbers
+import numpy as np
+
+
+def bar_range(bars=None):
+    """
+    Return the bar indices of a stream (unbounded if `bars` is None).
+    """
+    if bars is None:
+        return itertools.count()
+    return range(bars)
+
+
+def get_value(value, bar):
+    """
+    Return the value of a stream parameter for a given bar.
+
+    Parameters
+    ----------
+    value : object or callable
+        A constant, or a function of the bar index.
+    bar : int
+        The bar index.
+    """
+    if callable(value):
+        return value(bar)
+    return value
+
+
+def vector_source(source):
+    """
+    Convert a source of values into a function of (bar, length) returning a Vector.
+
+    Parameters
+    ----------
+    source : number, list, np.ndarray, Vector, iterator or callable
+        - a constant (number including NumPy scalars, list, array or Vector) is copied for every bar,
+        - an iterator yields one Vector (or array) per bar,
+        - a callable is called as `source(bar, length)`.
+    """
+    if callable(source) and not isinstance(source, Vector):
+        return source
+    if isinstance(source, numbers.Number):
+        value = float(source)
+        return lambda bar, length: Vector(value)
+    if isinstance(source, (list, np.ndarray, Vector)):
+        array = source.array if isinstance(source, Vector) else source
+        return lambda bar, length: Vector(array)
+    iterator = iter(source)
+    return lambda bar, length: next_vector(iterator)
+
+
+def next_vector(iterator):
+    """
+    Return the next element of an iterator as a Vector.
+    """
+    value = next(iterator)
+    if isinstance(value, Vector):
+        return value
+    if isinstance(value, numbers.Number):
+        return Vector(float(value))
+    return Vector(value)
+
+
+def rhythm_stream(M, N, theta=0, grid=None, scale=0, bars=None):
+    """
+    Yield the onsets of a Sine_Zeros rhythm bar by bar.
+
+    Only one bar is computed at a time, so the memory does not depend on the
+    number of bars. `M` and `theta` can be functions of the bar index to
+    obtain evolving patterns.
+
+    Parameters
+    ----------
+    M : int or callable
+        The number of onsets per bar.
+    N : int
+        The number of steps per bar.
+    theta : float or callable, optional
+        Phase shift of the sine wave (default is 0).
+    grid : list, np.ndarray or Vector, optional
+        The grid used to project the onsets (default is `np.arange(N)`).
+    scale : float, optional
+        The hardness of the projection (see `Vector.project`).
+    bars : int, optional
+        The number of bars (default is None, i.e. unbounded).
+
+    Yields
+    ------
+    Vector
+        The onsets of the bar, in steps relative to the start of the bar.
+    """
+    if grid is None:
+        grid = np.arange(N)
+    for bar in bar_range(bars):
+        vector = Sine_Zeros(get_value(M, bar), N, theta=get_value(theta, bar))
+        yield vector.project(grid, scale=scale)
+
+
+def sequence_stream(rhythm, pitch, velocity=None, duration=None, step=0.25, bar_length=4):
+    """
+    Combine per-bar sources into a stream of Sequence chunks.
+
+    Parameters
+    ----------
+    rhythm : iterable of Vector
+        The onsets of each bar in steps (e.g. `rhythm_stream(...)`).
+    pitch : number, Vector, iterator or callable
+        The pitch source (see `vector_source`).
+    velocity : number, Vector, iterator or callable, optional
+        The velocity source (default is 100).
+    duration : number, Vector, iterator or callable, optional
+        The duration source (default is 0.5).
+    step : float, optional
+        The duration of a step in beats (default is 0.25).
+    bar_length : float, optional
+        The duration of a bar in beats (default is 4).
+
+    Yields
+    ------
+    Sequence
+        The notes of each bar, with absolute start times in beats.
+    """
+    pitch = vector_source(pitch)
+    velocity = vector_source(100 if velocity is None else velocity)
+    duration = vector_source(0.5 if duration is None else duration)
+    for bar, onsets in enumerate(rhythm):
+        length = len(onsets)
+        start_time_vector = onsets.multiply(step).add(bar * bar_length)
+        yield Sequence(start_time_vector, pitch(bar, length), velocity(bar, length), duration(bar, length))
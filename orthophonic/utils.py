@@ -1,8 +1,104 @@
-from .base import Vector, Sine_Zeros
+from .base import Vector, ScaleTable, sine_zeros_onsets
+from .midi import write_midi, write_sequences
+from .instrument import instrument
+from collections import OrderedDict
 import numpy as np
-import matplotlib.pyplot as plt
-import live
-from midiutil import MIDIFile
+
+
+class LRUCache:
+    """
+    A bounded least-recently-used cache with hit/miss statistics.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The maximum number of entries (default is 256).
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, factory):
+        """
+        Return the cached value of `key`, computing it with `factory()` on a miss.
+        """
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = factory()
+        if self.maxsize > 0:
+            self.entries[key] = value
+            self.trim()
+        return value
+
+    def trim(self):
+        """
+        Remove the least recently used entries above `maxsize`.
+        """
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def resize(self, maxsize):
+        """
+        Change the maximum number of entries.
+        """
+        self.maxsize = maxsize
+        self.trim()
+
+    def clear(self):
+        """
+        Remove all the entries and reset the statistics.
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self):
+        """
+        Return the cache statistics as a dictionary.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.entries), "maxsize": self.maxsize}
+
+
+scale_cache = LRUCache()
+grid_cache = LRUCache()
+
+
+def cache_info():
+    """
+    Return the statistics of the scale and grid caches.
+    """
+    return {"scale": scale_cache.info(), "grid": grid_cache.info()}
+
+
+def clear_cache():
+    """
+    Clear the scale and grid caches.
+    """
+    scale_cache.clear()
+    grid_cache.clear()
+
+
+def set_cache_size(maxsize):
+    """
+    Set the maximum number of entries of the scale and grid caches (0 disables caching).
+    """
+    scale_cache.resize(maxsize)
+    grid_cache.resize(maxsize)
+
+
+def read_only_vector(array):
+    """
+    Return a Vector sharing a read-only array.
+    """
+    array.flags.writeable = False
+    vector = Vector(0)
+    vector.array = array
+    return vector
 
 
 def generate_scale(M=7, root=0, N=12, theta=0):
@@ -23,16 +119,45 @@ def generate_scale(M=7, root=0, N=12, theta=0):
     Returns
     -------
     Vector
-        A vector containing the generated scale.
+        A vector containing the generated scale. The results are cached (see
+        `scale_cache`) and the returned vectors share a read-only array.
     """
     repeat = 12
     root_shifted = root % N
-    scale = (Sine_Zeros(M, N, theta=theta, repeat=repeat)
-             .project(np.arange(repeat * N))
-             .add(root_shifted - N)
-             .clip()
-             .astype(int))
-    return scale
+
+    def factory():
+        scale = sine_zeros_onsets(M, N, theta=theta, repeat=repeat) + (root_shifted - N)
+        return np.clip(scale, 0, 127)
+
+    return read_only_vector(scale_cache.get((M, root_shifted, N, theta), factory))
+
+
+def generate_scale_table(M=7, root=0, N=12, theta=0):
+    """
+    Generate a musical scale compiled into MIDI pitch lookup tables.
+
+    `vector.project(generate_scale_table(...), scale)` gives the same result as
+    `vector.project(generate_scale(...), scale)` with a gather instead of a search.
+
+    Parameters
+    ----------
+    M : int, optional
+        Number of steps in the scale (default is 7).
+    root : int, optional
+        Root note of the scale (default is 0).
+    N : int, optional
+        Total number of notes (default is 12).
+    theta : float, optional
+        Phase shift for the scale generation (default is 0).
+
+    Returns
+    -------
+    ScaleTable
+        The compiled scale, with octaves of N notes and `root` as first
+        degree. The results are cached (see `scale_cache`).
+    """
+    factory = lambda: ScaleTable(generate_scale(M, root, N, theta), period=N, root=root)
+    return scale_cache.get(("table", M, root % N, N, theta), factory)
 
 
 def generate_grid(N=16, repeat=4):
@@ -49,10 +174,11 @@ def generate_grid(N=16, repeat=4):
     Returns
     -------
     Vector
-        A vector containing the generated time grid.
+        A vector containing the generated time grid. The results are cached
+        (see `grid_cache`) and the returned vectors share a read-only array.
     """
-    grid = Vector(np.arange(N * repeat)).astype(int)
-    return grid
+    factory = lambda: Vector(np.arange(N * repeat)).astype(int).array
+    return read_only_vector(grid_cache.get((N, repeat), factory))
 
 
 def create_clip(set, track_id, clip_id, length, erase=True):
@@ -62,7 +188,8 @@ def create_clip(set, track_id, clip_id, length, erase=True):
     Parameters
     ----------
     set : object
-        The Live set object containing tracks and clips.
+        The Live set object containing tracks and clips (a `live.Set` or an
+        `orthophonic.session.Session`, which only queries the requested track and clip).
     track_id : int
         The index of the track where the clip will be created.
     clip_id : int
@@ -71,6 +198,7 @@ def create_clip(set, track_id, clip_id, length, erase=True):
         The length of the clip in beats.
     erase : bool, optional
         If True, removes existing notes from the clip before creation (default is True).
+        Use False when the clip is updated by a `orthophonic.ableton.ClipSync`.
 
     Returns
     -------
@@ -87,7 +215,7 @@ def create_clip(set, track_id, clip_id, length, erase=True):
     if not track.is_midi_track:
         raise ValueError("First track must be a MIDI track")
 
-    clip = set.tracks[track_id].clips[clip_id]
+    clip = track.clips[clip_id]
     if clip is None:
         clip = track.create_clip(clip_id, length)
     else:
@@ -97,35 +225,38 @@ def create_clip(set, track_id, clip_id, length, erase=True):
     return clip
 
 
+@instrument("save_to_midi", elements=lambda note_list, *args, **kwargs: len(note_list))
 def save_to_midi(note_list, filename="output.mid", bpm=120):
     """
-    Export a Sequence of Notes to a MIDI file using midiutil.
+    Export a Sequence of Notes to a MIDI file.
+
+    The file is encoded with `orthophonic.midi.write_midi` and is identical to
+    the one produced by midiutil for the same notes.
 
     Parameters
     ----------
-    note_list : list of Note
-        The list of notes to be exported.
-    filename : str, optional
-        The name of the output MIDI file (default is "output.mid").
+    note_list : list of Note, NoteBatch or Sequence
+        The notes to be exported.
+    filename : str, os.PathLike or file-like, optional
+        The name of the output MIDI file or a binary stream (default is "output.mid").
     bpm : int, optional
         The tempo of the MIDI file in beats per minute (default is 120 BPM).
     """
-    midi = MIDIFile(1)
-    midi.addTempo(track=0, time=0, tempo=bpm)
-    
-    for note in note_list:
-        pitch = note.pitch
-        velocity = note.velocity
-        start_time = note.start_time  # Time in beats
-        duration = note.duration  # Duration in beats
+    write_midi([note_list], filename, bpm=bpm)
 
-        # Add note to MIDI track (channel=0, track=0)
-        midi.addNote(track=0, channel=0, pitch=pitch, time=start_time, 
-                    duration=duration, volume=velocity)
 
-    # Save to file
-    with open(filename, "wb") as f:
-        midi.writeFile(f)
-
-    print(f"MIDI file saved as {filename}")
+def save_sequences_to_midi(arrangement, filename="output.mid", bpm=120):
+    """
+    Export several Sequences to a multi-track MIDI file.
 
+    Parameters
+    ----------
+    arrangement : list or dict
+        Either a list of (sequence, track, channel) tuples or a dict mapping
+        each sequence to a (track, channel) tuple.
+    filename : str, os.PathLike or file-like, optional
+        The name of the output MIDI file or a binary stream (default is "output.mid").
+    bpm : int, optional
+        The tempo of the MIDI file in beats per minute (default is 120 BPM).
+    """
+    write_sequences(arrangement, filename, bpm=bpm)
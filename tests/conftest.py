@@ -0,0 +1,100 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_server import ThreadingOSCUDPServer
+import importlib.util
+import os
+import threading
+import time
+import numpy as np
+import pytest
+
+
+class OSCServer:
+    """
+    A local UDP stand-in for AbletonOSC that records received messages.
+    """
+    def __init__(self):
+        self.messages = []
+        dispatcher = Dispatcher()
+        dispatcher.set_default_handler(lambda address, *args: self.messages.append((address, args)))
+        self.server = ThreadingOSCUDPServer(("127.0.0.1", 0), dispatcher)
+        self.address = self.server.server_address
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def wait(self, count, timeout=2.0):
+        deadline = time.time() + timeout
+        while len(self.messages) < count and time.time() < deadline:
+            time.sleep(0.01)
+        return self.messages
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class Track:
+    index = 2
+
+
+class Clip:
+    track = Track()
+    index = 1
+
+
+@pytest.fixture
+def osc_server():
+    server = OSCServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def clip():
+    return Clip()
+
+
+@pytest.fixture(scope="session")
+def benchmark_runner():
+    """
+    The benchmarks/run.py module (its benchmarks and test doubles).
+    """
+    path = os.path.join(os.path.dirname(__file__), "..", "benchmarks", "run.py")
+    spec = importlib.util.spec_from_file_location("benchmarks_run", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def make_sequence():
+    """
+    A factory of test sequences.
+
+    Each voice is `Sine_Zeros(M, N, repeat=repeat)` projected on the grid and
+    scaled by `step`; the voices are merged. Without a seed, the notes have
+    pitch 36, velocity 100 and duration 0.25. With a seed, the pitches (one
+    per voice, all different), the velocities and the durations are drawn at
+    random. Explicit values override the defaults.
+    """
+    def make(M=(3, 2, 5, 7, 9), pitch=None, N=16, repeat=1, step=0.25, velocity=None, duration=None, seed=None):
+        M = np.atleast_1d(M)
+        rng = np.random.default_rng(seed)
+        if pitch is None:
+            pitch = 36 if seed is None else rng.choice(np.arange(36, 60), size=len(M), replace=False)
+        pitch = np.broadcast_to(pitch, M.shape)
+        grid = np.arange(N * repeat)
+        sequence = Sequence.merge([
+            Sequence(Sine_Zeros(m, N, repeat=repeat).project(grid).multiply(step), Vector(p))
+            for m, p in zip(M, pitch)
+        ])
+        notes = sequence.notes.data
+        if velocity is None:
+            velocity = 100 if seed is None else rng.integers(40, 127, len(notes))
+        if duration is None:
+            duration = 0.25 if seed is None else rng.uniform(0.1, 2, len(notes))
+        notes["velocity"] = velocity
+        notes["duration"] = duration
+        return sequence
+    return make
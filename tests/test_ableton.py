@@ -0,0 +1,20 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.ableton import OSCTransport
+import numpy as np
+
+
+def test_send_to_ableton_batches_notes(osc_server, clip):
+    grid = np.arange(64)
+    sequence = Sequence.merge([
+        Sequence(Sine_Zeros(M, 16, repeat=4).project(grid).multiply(0.25), Vector(pitch), Vector(100), Vector(0.25))
+        for M, pitch in [(3, 36), (2, 41), (5, 44), (7, 57), (9, 49), (5, 55)]
+    ])
+    stats = sequence.send_to_ableton(clip, transport=OSCTransport(osc_server.address), batch_size=50)
+    messages = osc_server.wait(stats.messages)
+
+    assert stats.notes == len(sequence) == 124
+    assert stats.messages == len(messages) == 3
+    args = [arg for address, values in messages for arg in values[2:]]
+    assert all(address == "/live/clip/add/notes" and values[:2] == (2, 1) for address, values in messages)
+    assert sorted(args[0::5]) == sorted(sequence.notes.pitch.tolist())
@@ -0,0 +1,93 @@
+from orthophonic.base import Vector
+from orthophonic.sequence import Sequence
+from orthophonic.audio import Synth, Sampler, render_audio, render_blocks, save_to_wav, write_wav, read_wav
+import numpy as np
+import pytest
+
+
+def reference(sequence, voice, bpm, sample_rate, gain):
+    """
+    Render the notes one by one.
+    """
+    notes = sequence.notes
+    samples_per_beat = 60 * sample_rate / bpm
+    start = np.round(notes.start_time * samples_per_beat).astype(np.int64)
+    duration = np.round(notes.duration * samples_per_beat).astype(np.int64)
+    length = np.broadcast_to(voice.lengths(notes.pitch, duration, sample_rate), start.shape)
+    output = np.zeros((start + length).max())
+    velocity = notes.velocity.astype(float)
+    for k in range(len(notes)):
+        position = np.arange(length[k])
+        note = np.full(length[k], k)
+        output[start[k]:start[k] + length[k]] += voice.render(notes.pitch, velocity, duration, note, position, sample_rate)
+    return output * gain
+
+
+@pytest.mark.parametrize("waveform", ["sine", "square", "saw", "triangle"])
+def test_synth_matches_reference(waveform, make_sequence):
+    sequence = make_sequence(repeat=4, seed=0)
+    voice = Synth(waveform)
+    expected = reference(sequence, voice, 120, 8000, 0.5)
+    for block_size in (64, 1000, 10 ** 6):
+        output = render_audio(sequence, voice, bpm=120, sample_rate=8000, block_size=block_size)
+        assert np.allclose(output, expected)
+    assert np.abs(expected).max() > 0
+
+
+def test_sampler_drum_map():
+    rng = np.random.default_rng(1)
+    samples = {36: rng.uniform(-1, 1, 300), 38: rng.uniform(-1, 1, 50)}
+    voice = Sampler(samples)
+    sequence = Sequence(Vector([0, 0.5, 1, 1.5]), Vector([36, 38, 40, 36]), Vector(127), Vector(0.25))
+    output = render_audio(sequence, voice, bpm=120, sample_rate=1000, block_size=128, gain=1)
+    expected = np.zeros(1050)
+    expected[0:300] += samples[36]
+    expected[250:300] += samples[38]
+    expected[750:1050] += samples[36]
+    assert np.allclose(output, expected)
+
+
+def test_tracks_with_voices_and_mute(make_sequence):
+    sequence = make_sequence(repeat=4, seed=0)
+    other = make_sequence(repeat=4, seed=2)
+    other.notes.data["mute"][::2] = True
+    voice1, voice2 = Synth("saw"), Synth("sine", release=0)
+    output = render_audio([(sequence, voice1), (other, voice2)], sample_rate=8000, block_size=333)
+    first = render_audio(sequence, voice1, sample_rate=8000)
+    second = render_audio(other, voice2, sample_rate=8000)
+    length = max(len(first), len(second))
+    assert len(output) == length
+    assert np.allclose(output, np.pad(first, (0, length - len(first))) + np.pad(second, (0, length - len(second))))
+
+
+def test_bounded_blocks(make_sequence):
+    blocks = list(render_blocks(make_sequence(repeat=4, seed=0), block_size=512, sample_rate=8000))
+    assert all(len(block) == 512 for block in blocks[:-1])
+    assert 0 < len(blocks[-1]) <= 512
+
+
+def test_wav(tmp_path, make_sequence):
+    sequence = make_sequence(repeat=4, seed=0)
+    filename = str(tmp_path / "output.wav")
+    frames = save_to_wav(sequence, filename, sample_rate=8000, block_size=1000)
+    buffer, sample_rate = read_wav(filename)
+    expected = render_audio(sequence, sample_rate=8000)
+    assert sample_rate == 8000 and frames == len(buffer) == len(expected)
+    assert np.abs(buffer - np.clip(expected, -1, 1)).max() <= 2 / 32768
+
+    write_wav(filename, expected, 8000)
+    assert np.array_equal(read_wav(filename)[0], buffer)
+
+
+def test_sampler_sample_rate(tmp_path):
+    # a 1 s ramp recorded at 500 Hz, rendered at 1000 Hz
+    sample = np.linspace(0, 0.998, 500)
+    write_wav(tmp_path / "ramp.wav", sample, 500)
+    voice = Sampler.from_files({36: tmp_path / "ramp.wav"})
+    sequence = Sequence(Vector([0]), Vector([36]), Vector(127), Vector(0.25))
+    output = render_audio(sequence, voice, bpm=120, sample_rate=1000, gain=1)
+    assert len(output) == 1000
+    assert np.abs(output[:999] - np.linspace(0, 0.998, 999)).max() <= 2 / 32768
+    # same rate: played as is
+    same = render_audio(sequence, voice, bpm=120, sample_rate=500, gain=1)
+    assert np.array_equal(same, read_wav(tmp_path / "ramp.wav")[0])
@@ -0,0 +1,41 @@
+from orthophonic.base import Sine_Zeros
+from orthophonic.batch import Sine_Zeros_Batch, VectorBatch
+import numpy as np
+
+
+def test_batch_matches_vectors():
+    M = np.array([3, 5, 7, 2])
+    theta = np.array([0, 0.2, 0.4, -0.1])
+    shift = [1, 2, 3, -1]
+    offset = [1, 2, 3, 4]
+    batch = Sine_Zeros_Batch(M, 16, theta, repeat=4)
+    batch.project(np.arange(64)).multiply(0.25).roll(shift).add(offset).clip(0, 10)
+
+    for index, vector in enumerate(batch.to_vectors()):
+        expected = (Sine_Zeros(M[index], 16, theta[index], repeat=4)
+                    .project(np.arange(64))
+                    .multiply(0.25)
+                    .roll(shift[index])
+                    .add(offset[index])
+                    .clip(0, 10))
+        assert np.array_equal(vector.array, expected.array)
+
+
+def test_ragged_rows():
+    batch = VectorBatch([[1, 2, 3], [4], []])
+    assert batch.lengths.tolist() == [3, 1, 0]
+    assert batch.rvs_normal(scale=0).roll(1)[0].tolist() == [3, 1, 2]
+    assert batch[1].tolist() == [4]
+    assert batch[2].tolist() == []
+
+
+def test_broadcast_parameters():
+    batch = Sine_Zeros_Batch(3, 16)
+    assert len(batch.to_vectors()) == 1
+    assert np.array_equal(batch[0], Sine_Zeros(3, 16).array)
+
+    batch = Sine_Zeros_Batch(np.array([3, 5])[:, None], 16, theta=[0, 0.5])
+    vectors = batch.to_vectors()
+    assert len(vectors) == 4
+    for vector, (M, theta) in zip(vectors, [(3, 0), (3, 0.5), (5, 0), (5, 0.5)]):
+        assert np.array_equal(vector.array, Sine_Zeros(M, 16, theta).array)
@@ -0,0 +1,18 @@
+import os
+
+
+def test_suite_runs_and_compares(tmp_path, benchmark_runner):
+    run = benchmark_runner
+    results = run.run_suite(repeat=1, max_size=100)
+    assert "vector.project.small[16]" in results
+    assert all(result["time"] > 0 and result["memory"] >= 0 for result in results.values())
+
+    baseline = {key: {"time": 2 * value["time"], "memory": 2 * value["memory"] + 1} for key, value in results.items()}
+    assert run.compare(results, baseline, threshold=0.25) == []
+    key = "vector.project.small[16]"
+    baseline[key] = {"time": results[key]["time"] / 10, "memory": results[key]["memory"]}
+    assert run.compare(results, baseline, threshold=0.25) == [f"{key} time: 10.00x baseline"]
+
+    path = str(tmp_path / "baseline.json")
+    assert run.main(["--filter", "small", "--repeat", "1", "--baseline", path, "--save"]) == 0
+    assert os.path.exists(path)
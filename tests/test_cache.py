@@ -0,0 +1,32 @@
+from orthophonic.base import Sine_Zeros
+from orthophonic.utils import generate_scale, generate_grid, cache_info, clear_cache, set_cache_size, scale_cache
+import numpy as np
+import pytest
+
+
+def test_scale_cache():
+    clear_cache()
+    first = generate_scale(root=40, theta=1/6)
+    second = generate_scale(root=28, theta=1/6)
+    assert np.shares_memory(first.array, second.array)
+    assert cache_info()["scale"] == {"hits": 1, "misses": 1, "size": 1, "maxsize": 256}
+
+    expected = Sine_Zeros(7, 12, theta=1/6, repeat=12).project(np.arange(144)).add(4 - 12).clip().astype(int)
+    assert np.array_equal(first.array, expected.array)
+    with pytest.raises(ValueError):
+        first.add(1)
+    assert first.project(generate_grid(), scale=0).clip(0, 10) is first
+
+
+def test_cache_size_limit():
+    clear_cache()
+    set_cache_size(2)
+    try:
+        for N in [8, 12, 16, 8]:
+            generate_grid(N=N)
+        assert cache_info()["grid"] == {"hits": 0, "misses": 4, "size": 2, "maxsize": 2}
+        set_cache_size(0)
+        generate_scale()
+        assert len(scale_cache.entries) == 0
+    finally:
+        set_cache_size(256)
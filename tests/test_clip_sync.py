@@ -0,0 +1,91 @@
+from orthophonic.sequence import Sequence, NoteBatch
+from orthophonic.ableton import ClipSync, OSCTransport, diff_notes
+from orthophonic.session import MockTransport
+from collections import Counter
+import numpy as np
+
+
+def new_model(clip):
+    return MockTransport([True] * (clip.track.index + 1), {(clip.track.index, clip.index): 16})
+
+
+def clip_notes(model, clip):
+    return model.clips[(clip.track.index, clip.index)]["notes"]
+
+
+def addresses(model):
+    return [msg for msg, _ in model.messages]
+
+
+def content(sequence):
+    return Counter(tuple(row) for row in sequence.notes.data.tolist())
+
+
+def test_diff_notes_multiset():
+    old = NoteBatch([36, 36, 38, 40], [0, 0, 1, 2], 0.25, 100).data
+    new = NoteBatch([36, 38, 40, 40], [0, 1, 2, 2], 0.25, [100, 100, 100, 90]).data
+    removed, added = diff_notes(old, new)
+    assert removed.tolist() == [False, True, False, False]
+    assert added.tolist() == [False, False, False, True]
+
+
+def test_incremental_updates(clip, make_sequence):
+    model = new_model(clip)
+    sync = ClipSync(model)
+    sequence = make_sequence(repeat=4, velocity=100, duration=0.25, seed=0)
+    stats = sequence.send_to_ableton(clip, sync=sync)
+    assert addresses(model)[0] == "/live/clip/remove/notes" and stats.notes == len(sequence)
+    assert Counter(clip_notes(model, clip)) == content(sequence)
+
+    # nothing changed
+    model.messages.clear()
+    stats = sequence.send_to_ableton(clip, sync=sync)
+    assert stats.messages == stats.notes == len(model.messages) == 0
+
+    # a velocity and a start time change, a new note, a removed note and a duplicate
+    data = sequence.notes.data.copy()
+    data["velocity"][3] = 60
+    data["start_time"][10] += 0.0001
+    data = np.concatenate([data[1:], data[[5]], np.array([(70, 1.5, 0.5, 80, False)], dtype=data.dtype)])
+    updated = Sequence.from_batch(NoteBatch.from_array(data))
+    model.messages.clear()
+    stats = updated.send_to_ableton(clip, sync=sync)
+    assert Counter(clip_notes(model, clip)) == content(updated)
+    assert stats.removed == 3
+    assert len(model.messages) == stats.messages == 4
+    assert stats.notes <= 6
+
+    # a completely different sequence falls back to erasing the clip
+    other = make_sequence(repeat=4, velocity=100, duration=0.25, seed=1)
+    other.notes.data["start_time"] += 0.125
+    model.messages.clear()
+    stats = other.send_to_ableton(clip, sync=sync)
+    assert addresses(model)[0] == "/live/clip/remove/notes" and stats.messages == 2
+    assert Counter(clip_notes(model, clip)) == content(other)
+
+    sync.forget(clip)
+    model.messages.clear()
+    stats = other.send_to_ableton(clip, sync=sync)
+    assert addresses(model) == ["/live/clip/remove/notes", "/live/clip/add/notes"] and stats.removed == 1
+
+
+def test_removal_range_resends_neighbours(clip):
+    model = new_model(clip)
+    sync = ClipSync(model, time_span=0.01)
+    first = NoteBatch([60, 60, 62], [1.0, 1.005, 1.0], 0.25, 100)
+    sync.update(clip, first)
+    second = NoteBatch([60, 62], [1.005, 1.0], 0.25, 100)
+    stats = sync.update(clip, second)
+    assert stats.removed == 1 and stats.notes == 1
+    assert sorted(clip_notes(model, clip)) == sorted(tuple(row) for row in second.data.tolist())
+
+
+def test_message_count_over_udp(osc_server, clip, make_sequence):
+    sync = ClipSync(OSCTransport(osc_server.address), batch_size=50)
+    sequence = make_sequence(repeat=4, velocity=100, duration=0.25, seed=0)
+    first = sequence.send_to_ableton(clip, sync=sync)
+    sequence.notes.data["velocity"][:2] = 90
+    second = sequence.send_to_ableton(clip, sync=sync)
+    messages = osc_server.wait(first.messages + second.messages)
+    assert len(messages) == first.messages + second.messages == 4 + 3
+    assert [address for address, _ in messages[-3:]] == ["/live/clip/remove/notes"] * 2 + ["/live/clip/add/notes"]
@@ -0,0 +1,41 @@
+from orthophonic.base import Vector, Lattice, direct_sum
+import numpy as np
+import pytest
+
+
+def kron_sum(array1, array2):
+    return np.kron(array1, np.ones(len(array2))) + np.kron(np.ones(len(array1)), array2)
+
+
+def test_matches_kron():
+    rng = np.random.default_rng(0)
+    a, b, c = rng.normal(size=7), rng.integers(0, 12, 5), rng.normal(size=3)
+    assert np.array_equal(Vector(a).direct_sum(b).array, kron_sum(a, b))
+    assert np.array_equal(Vector(a).direct_sum(Vector(b), c).array, kron_sum(kron_sum(a, b), c))
+    assert np.array_equal(direct_sum(a), a)
+    assert Vector([0, 4, 7]).direct_sum([0, 12]).array.tolist() == [0, 12, 4, 16, 7, 19]
+
+
+def test_lattice_indexing():
+    progression, voicing, octave = [0, 5, 7, 3], [0, 4, 7], [0, 12, 24]
+    lattice = Vector(progression).direct_sum(voicing, octave, lazy=True)
+    full = Vector(progression).direct_sum(voicing, octave).array
+    assert len(lattice) == len(full) == 36 and lattice.shape == (4, 3, 3)
+    assert np.array_equal(lattice[:], full)
+    assert np.array_equal(lattice[5:30:7], full[5:30:7])
+    assert np.array_equal(lattice[np.array([0, -1, 17])], full[[0, -1, 17]])
+    assert lattice[-1] == full[-1]
+    assert np.array_equal(np.concatenate(list(lattice.chunks(10))), full)
+    assert np.array_equal(lattice.to_vector().array, full)
+    with pytest.raises(IndexError):
+        lattice[36]
+
+
+@pytest.mark.parametrize("scale", [0, 0.3])
+def test_lattice_project(scale):
+    rng = np.random.default_rng(1)
+    operands = [rng.uniform(0, 12, 40), rng.uniform(0, 12, 30), [0, 12, 24]]
+    grid = [0, 2, 4, 5, 7, 9, 11, 12, 14, 16, 17, 19, 21, 23, 24]
+    expected = Vector(operands[0]).direct_sum(*operands[1:]).project(grid, scale=scale).array
+    projected = Lattice(*operands).project(grid, scale=scale, chunk_size=257).array
+    assert np.array_equal(projected, expected)
@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+IMPORT_BUDGET = 1.0  # seconds
+HEAVY_MODULES = ["matplotlib", "live", "midiutil", "pythonosc"]
+
+SCRIPT = f"""
+import sys, time
+start = time.perf_counter()
+import orthophonic.utils
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(",".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))
+"""
+
+
+def test_utils_import_is_light():
+    output = subprocess.run([sys.executable, "-c", SCRIPT], capture_output=True, text=True, check=True).stdout
+    elapsed, loaded = output.splitlines()
+    assert loaded == ""
+    assert float(elapsed) < IMPORT_BUDGET
@@ -0,0 +1,104 @@
+from orthophonic.base import Vector
+from orthophonic.sequence import Sequence, humanize
+from orthophonic.index import NoteIndex, IntervalTree
+import numpy as np
+import pytest
+
+
+def make_notes(size, seed=0, drone=False):
+    rng = np.random.default_rng(seed)
+    start_time = rng.integers(0, 200, size) * 0.25
+    duration = rng.choice([0, 0.25, 1, 4, 16], size)
+    if drone:
+        # a note sounding during the whole sequence
+        start_time[0], duration[0] = 0, 1000
+    return start_time, duration
+
+
+def sounding(start_time, duration, start, end):
+    mask = (start_time < end) & (start_time + duration > start)
+    index = np.flatnonzero(mask)
+    return index[np.argsort(start_time[index], kind="stable")]
+
+
+@pytest.mark.parametrize("drone", [False, True])
+def test_queries_match_scan(drone):
+    start_time, duration = make_notes(500, drone=drone)
+    index = NoteIndex(start_time, duration)
+    for start, end in [(0, 1), (10, 10.5), (12.25, 30), (49, 80), (-5, 0), (100, 120)]:
+        assert np.array_equal(index.window(start, end), sounding(start_time, duration, start, end))
+        expected = np.flatnonzero((start_time >= start) & (start_time < end))
+        assert np.array_equal(index.starting(start, end), expected[np.argsort(start_time[expected], kind="stable")])
+    for time in [0, 3.25, 10, 25.1, 49.75, 60]:
+        active = np.flatnonzero((start_time <= time) & (start_time + duration > time))
+        assert np.array_equal(index.active_at(time), active[np.argsort(start_time[active], kind="stable")])
+    assert np.array_equal(index.overlaps(12, 2), index.window(12, 14))
+
+
+def test_overlapping_pairs():
+    start_time, duration = make_notes(300, seed=1)
+    pairs = NoteIndex(start_time, duration).overlapping_pairs()
+    end = start_time + duration
+    overlap = (start_time[:, None] < end[None, :]) & (start_time[None, :] < end[:, None])
+    np.fill_diagonal(overlap, False)
+    expected = {tuple(sorted(pair)) for pair in np.argwhere(overlap)}
+    assert len(pairs) == len(expected)
+    assert {tuple(sorted(pair)) for pair in pairs.tolist()} == expected
+    assert np.all(start_time[pairs[:, 0]] <= start_time[pairs[:, 1]])
+
+
+def test_append_in_order_and_merge():
+    start_time, duration = make_notes(400, seed=2)
+    order = np.argsort(start_time, kind="stable")
+    start_time, duration = start_time[order], duration[order]
+    index = NoteIndex(start_time[:10], duration[:10])
+    for chunk in range(10, 300, 10):
+        index.append(start_time[chunk:chunk + 10], duration[chunk:chunk + 10])
+    shuffled = np.random.default_rng(3).permutation(np.arange(300, 400))
+    index.append(start_time[shuffled], duration[shuffled])
+    positions = np.concatenate([np.arange(300), shuffled])
+    reference = NoteIndex(start_time[positions], duration[positions])
+    for array in ("start", "end", "max_end", "order"):
+        assert np.array_equal(getattr(index, array), getattr(reference, array))
+
+
+def test_sequence_queries():
+    start_time, duration = make_notes(200, seed=4)
+    sequence = Sequence(Vector(start_time), Vector(60), Vector(100), Vector(duration))
+    window = sequence.window(8, 12)
+    assert np.array_equal(window.notes.data, sequence.notes.data[sounding(start_time, duration, 8, 12)])
+    assert all(note.start_time <= 20 < note.start_time + note.duration for note in sequence.active_at(20))
+
+    index = sequence.index
+    sequence.append(Sequence(Vector([60.0, 1.0]), Vector(62), Vector(90), Vector(2)))
+    assert sequence.index is index and len(index) == 202
+    assert 200 in sequence.index.active_at(61) and 201 in sequence.index.active_at(2.5)
+    assert sequence.window(60, 61).notes.pitch.tolist()[-1] == 62
+
+    humanize([sequence], time_scale=1, rng=0)
+    rebuilt = sequence.index
+    assert rebuilt is not index
+    assert np.array_equal(np.sort(rebuilt.start), np.sort(sequence.notes.start_time))
+
+
+def test_interval_tree_stab():
+    rng = np.random.default_rng(5)
+    start = np.sort(rng.uniform(0, 100, 3000))
+    end = start + rng.choice([0, 0.1, 1, 10, 100], 3000)
+    tree = IntervalTree(start, end)
+    for time in np.concatenate([rng.uniform(-1, 201, 50), start[:20], end[:20]]):
+        assert np.array_equal(tree.stab(time), np.flatnonzero((start <= time) & (end > time)))
+    assert IntervalTree(np.empty(0), np.empty(0)).stab(1.0).tolist() == []
+
+
+def test_long_note_uses_the_tree():
+    start_time = np.arange(100000) * 0.25
+    duration = np.full(100000, 0.25)
+    duration[0] = 1e6
+    index = NoteIndex(start_time, duration)
+    assert index.window(1000, 1004).tolist() == [0] + list(range(4000, 4016))
+    assert index.active_at(1000.1).tolist() == [0, 4000]
+    assert index._tree is not None
+    index.append([25000.0], [1.0])
+    assert index._tree is None
+    assert index.active_at(25000.5).tolist() == [0, 100000]
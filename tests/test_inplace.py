@@ -0,0 +1,47 @@
+from orthophonic.base import Vector
+import numpy as np
+import tracemalloc
+
+
+def chain(vector, grid):
+    return vector.multiply(4).add(0.3).roll(1000).clip(0, 4000).project(grid, scale=0.1).reverse().roll(-7)
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def test_inplace_chain_matches_copy_chain():
+    data = np.random.default_rng(0).uniform(0, 1000, 100000)
+    grid = np.arange(0, 4000, 3)
+    expected = chain(Vector(data), grid)
+    buffer = data.copy()
+    vector = chain(Vector(buffer, copy=False), grid)
+    assert np.array_equal(vector.array, expected.array)
+    assert vector.array is buffer
+
+
+def test_inplace_chain_peak_memory():
+    size = 1000000
+    grid = np.arange(0, 4000, 3)
+    data = np.random.default_rng(0).uniform(0, 1000, size)
+    buffer = data.copy()
+    peak_copy = peak_memory(lambda: chain(Vector(data), grid))
+    peak_inplace = peak_memory(lambda: chain(Vector(buffer, copy=False), grid))
+    assert peak_inplace < peak_copy
+
+
+def test_inplace_caller_buffer_holds_the_result():
+    data = np.array([0.4, 1.6, 2.2] * 3000)
+    expected = Vector(data).roll(1).project(np.arange(5), 0.5).roll(2).clip(0, 2).array
+    buffer = data.copy()
+    vector = Vector(buffer, copy=False).roll(1).project(np.arange(5), 0.5)
+    assert np.array_equal(buffer, Vector(data).roll(1).project(np.arange(5), 0.5).array)
+    vector.roll(2).clip(0, 2)
+    assert vector.array is buffer
+    assert np.array_equal(buffer, expected)
@@ -0,0 +1,59 @@
+from orthophonic.base import Vector
+from orthophonic.sequence import Sequence
+from orthophonic.utils import save_to_midi
+from orthophonic.instrument import Profiler, get_profiler, span
+import io
+import json
+import numpy as np
+
+
+def pipeline(size, runner):
+    start_time_vector = Vector(np.arange(size) * 0.25).project(np.arange(size) * 0.5)
+    sequence = Sequence(start_time_vector, Vector(36), Vector(100), Vector(0.25))
+    sequence.send_to_ableton(runner.NullClip(), transport=runner.NullTransport())
+    save_to_midi(sequence, io.BytesIO())
+    return sequence
+
+
+def test_disabled_records_nothing(benchmark_runner):
+    assert get_profiler() is None
+    with Profiler() as profiler:
+        pass
+    pipeline(10, benchmark_runner)
+    assert profiler.events == []
+
+
+def test_summary_and_trace(tmp_path, benchmark_runner):
+    with Profiler(trace_memory=True) as profiler:
+        assert get_profiler() is profiler
+        pipeline(100, benchmark_runner)
+        with span("custom", elements=3):
+            np.zeros(100000)
+    assert get_profiler() is None
+
+    stats = profiler.summary()
+    for name in ("Vector.project", "Sequence.__init__", "Sequence.send_to_ableton", "save_to_midi", "custom"):
+        assert stats[name]["calls"] == 1
+        assert stats[name]["total"] > 0
+    assert stats["Vector.project"]["elements"] == 100
+    assert stats["save_to_midi"]["elements"] == 100
+    assert stats["custom"]["elements"] == 3
+    assert stats["custom"]["allocated"] >= 800000
+    assert "Sequence.__init__" in profiler.table()
+
+    filename = str(tmp_path / "trace.json")
+    profiler.save_chrome_trace(filename)
+    with open(filename) as f:
+        trace = json.load(f)
+    assert len(trace["traceEvents"]) == 5
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in trace["traceEvents"])
+
+
+def test_nested_peak_propagates():
+    with Profiler(trace_memory=True) as profiler:
+        with span("outer"):
+            with span("inner"):
+                np.ones(200000)
+            np.ones(10)
+    stats = profiler.summary()
+    assert stats["outer"]["allocated"] >= stats["inner"]["allocated"] >= 1600000
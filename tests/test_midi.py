@@ -0,0 +1,107 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence, NoteBatch
+from orthophonic.midi import midi_bytes, encode_var_length, read_midi, read_midi_tracks, read_midi_dir
+from orthophonic.utils import save_to_midi, save_sequences_to_midi
+from midiutil import MIDIFile
+import io
+import struct
+import numpy as np
+
+
+def midiutil_bytes(tracks, bpm=120):
+    midi = MIDIFile(len(tracks))
+    midi.addTempo(track=0, time=0, tempo=bpm)
+    for track, (notes, channel) in enumerate(tracks):
+        for note in notes:
+            midi.addNote(track, channel, note.pitch, note.start_time, note.duration, note.velocity)
+    buffer = io.BytesIO()
+    midi.writeFile(buffer)
+    return buffer.getvalue()
+
+
+def test_var_length():
+    output, nbytes = encode_var_length(np.array([0, 127, 128, 8192, 16383, 16384]))
+    assert nbytes.tolist() == [1, 1, 2, 2, 2, 3]
+    assert output[5, :3].tolist() == [0x81, 0x80, 0x00]
+
+
+def test_save_to_midi_matches_midiutil():
+    grid = np.arange(64)
+    notes = []
+    for M, pitch in [(3, 36), (2, 41), (5, 44), (7, 57)]:
+        start_time_vector = Sine_Zeros(M, 16, repeat=4).rvs_normal(scale=0.3).project(grid, scale=0.2).clip(0, 64).multiply(0.25)
+        velocity_vector = Vector(100).resize(len(start_time_vector)).rvs_normal(scale=10).clip(1, 127)
+        notes += Sequence(start_time_vector, Vector(pitch), velocity_vector, Vector(1.5)).get_notes()
+
+    buffer = io.BytesIO()
+    save_to_midi(notes, buffer, bpm=97)
+    assert buffer.getvalue() == midiutil_bytes([(notes, 0)], bpm=97)
+
+
+def test_multitrack_overlapping_notes():
+    rng = np.random.default_rng(0)
+    tracks = []
+    for channel in [0, 1, 10]:
+        M = 40
+        pitch = rng.integers(10, 13, M)
+        batch = NoteBatch(pitch, rng.integers(0, 32, M) / 4, (pitch - 9) / 2, rng.integers(1, 128, M))
+        tracks.append((batch, channel))
+    assert midi_bytes(tracks) == midiutil_bytes([(list(batch), channel) for batch, channel in tracks])
+
+
+def test_save_sequences_to_midi():
+    grid = np.arange(64)
+    sequences = [
+        Sequence(Sine_Zeros(M, 16, repeat=4).project(grid).multiply(0.25), Vector(pitch), Vector(100), Vector(0.25))
+        for M, pitch in [(3, 36), (2, 41), (5, 44)]
+    ]
+    arrangement = [(sequences[0], 0, 9), (sequences[1], 2, 9), (sequences[2], 0, 1)]
+    buffer = io.BytesIO()
+    save_sequences_to_midi(arrangement, buffer)
+
+    midi = MIDIFile(3)
+    midi.addTempo(track=0, time=0, tempo=120)
+    for sequence, track, channel in arrangement:
+        for note in sequence:
+            midi.addNote(track, channel, note.pitch, note.start_time, note.duration, note.velocity)
+    expected = io.BytesIO()
+    midi.writeFile(expected)
+    assert buffer.getvalue() == expected.getvalue()
+
+
+def test_read_midi_round_trip(tmp_path):
+    grid = np.arange(64)
+    sequences = [
+        Sequence(Sine_Zeros(M, 16, repeat=4).project(grid).multiply(0.25), Vector(pitch), Vector(90 + M), Vector(0.25))
+        for M, pitch in [(3, 36), (5, 44), (7, 57)]
+    ]
+    filename = str(tmp_path / "song.mid")
+    save_sequences_to_midi([(sequence, track, track) for track, sequence in enumerate(sequences)], filename, bpm=90)
+
+    tracks = read_midi_tracks(filename)
+    assert len(tracks) == 4 and len(tracks[0][0]) == 0
+    for (notes, channel), sequence in zip(tracks[1:], sequences):
+        assert np.array_equal(notes.data, sequence.notes.data)
+        assert np.all(channel == sequences.index(sequence))
+
+    merged = read_midi(filename)
+    assert np.array_equal(merged.notes.data, Sequence.merge(sequences).notes.data)
+    assert list(read_midi_dir(str(tmp_path), processes=2)) == [filename]
+
+
+def test_read_midi_running_status():
+    # note-on with running status and a zero-velocity note-on as note-off
+    track = bytes([0x00, 0x90, 60, 100, 0x00, 64, 90, 0x83, 0x60, 60, 0, 0x00, 0x80, 64, 0, 0x00, 0xFF, 0x2F, 0x00])
+    data = b"MThd" + struct.pack(">LHHH", 6, 0, 1, 480) + b"MTrk" + struct.pack(">L", len(track)) + track
+    notes, channel = read_midi_tracks(data)[0]
+    assert notes.pitch.tolist() == [60, 64]
+    assert notes.duration.tolist() == [1.0, 1.0]
+    assert notes.velocity.tolist() == [100, 90]
+
+
+def test_path_like(tmp_path):
+    sequence = Sequence(Vector([0, 1, 2]), Vector(60), Vector(100), Vector(0.5))
+    path = tmp_path / "path.mid"
+    save_to_midi(sequence, path)
+    assert path.read_bytes() == midi_bytes([sequence])
+    assert np.array_equal(read_midi(path).notes.data, sequence.notes.data)
@@ -0,0 +1,17 @@
+from orthophonic.base import Sine_Zeros, sine_zeros_onsets, sine_zeros_mask
+import numpy as np
+
+
+def test_onsets_match_projection():
+    for M in range(1, 12):
+        for N in [7, 12, 16]:
+            for theta in [0, 0.5, -0.5, 1/6, 0.37, -2.2, N / M / 2]:
+                for repeat in [1, 4]:
+                    expected = Sine_Zeros(M, N, theta, repeat).project(np.arange(repeat * N)).astype(int)
+                    assert np.array_equal(sine_zeros_onsets(M, N, theta, repeat), expected.array)
+
+
+def test_mask():
+    mask = sine_zeros_mask(3, 8)
+    assert mask.tolist() == [True, False, False, True, False, True, False, False]
+    assert sine_zeros_mask(3, 8, packed=True).tolist() == [0b10010100]
@@ -0,0 +1,25 @@
+from orthophonic.base import Sine_Zeros, _project_dense, _project_sorted
+import numpy as np
+
+
+def test_sorted_projection_matches_dense():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        grid = rng.integers(-5, 20, size=rng.integers(1, 30)) / 2
+        grid = np.insert(grid, 0, 0)
+        array = np.append(rng.integers(-20, 40, size=50) / 4, [np.nan, np.inf, -np.inf])
+        assert np.array_equal(_project_dense(array, grid), _project_sorted(array, grid), equal_nan=True)
+
+
+def test_sorted_projection_rounded_distances():
+    grid = np.insert(np.arange(100) * 0.25, 0, 0)
+    array = np.array([1e20, -1e20, 2.0**53 + 2, 1e300, 3.3])
+    assert np.array_equal(_project_dense(array, grid), _project_sorted(array, grid))
+
+
+def test_project_large_input():
+    grid = np.arange(960 * 16)
+    v = Sine_Zeros(7, 16, theta=0.3, repeat=64).multiply(15)
+    expected = _project_dense(v.array, np.insert(grid, 0, 0))
+    v.project(grid, scale=0.25)
+    assert np.allclose(v.array, 0.25 * Sine_Zeros(7, 16, theta=0.3, repeat=64).multiply(15).array + 0.75 * expected)
@@ -0,0 +1,29 @@
+from orthophonic.base import Vector, spawn_generators
+from orthophonic.batch import VectorBatch
+from orthophonic.sequence import humanize
+import numpy as np
+
+
+def test_rvs_normal_seed():
+    first = Vector(np.zeros(16)).rvs_normal(scale=2, rng=3)
+    second = Vector(np.zeros(16)).rvs_normal(scale=2, rng=np.random.default_rng(3))
+    assert np.array_equal(first.array, second.array)
+    batch = VectorBatch([np.zeros(3), np.zeros(5)]).rvs_normal(rng=1)
+    assert np.all(np.isfinite(batch[1].array))
+
+
+def test_spawned_streams_are_independent():
+    a, b = spawn_generators(7, 2)
+    again, _ = spawn_generators(7, 2)
+    assert not np.array_equal(a.normal(size=4), b.normal(size=4))
+    assert np.array_equal(again.normal(size=4), spawn_generators(7, 2)[0].normal(size=4))
+
+
+def test_bulk_humanize(make_sequence):
+    sequences = [make_sequence(8, N=8, step=0.5) for _ in range(3)]
+    humanize(sequences, time_scale=0.01, velocity_scale=5, rng=0)
+    single = make_sequence(8, N=8, step=0.5).humanize(time_scale=0.01, velocity_scale=5, rng=0)
+    again = humanize([make_sequence(8, N=8, step=0.5) for _ in range(3)], time_scale=0.01, velocity_scale=5, rng=0)
+    assert all(np.array_equal(a.notes.data, b.notes.data) for a, b in zip(sequences, again))
+    assert not np.array_equal(sequences[0].notes.start_time, sequences[1].notes.start_time)
+    assert np.all(single.notes.velocity <= 127) and np.all(single.notes.start_time >= 0)
@@ -0,0 +1,36 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.render import render_batch, parameter_grid, load_store
+import numpy as np
+
+
+def recipe(parameters, rng):
+    M = parameters["M"]
+    start_time_vector = Sine_Zeros(M, 16, theta=parameters["theta"]).project(np.arange(16)).multiply(0.25)
+    velocity_vector = Vector(100 + rng.normal(scale=10, size=M)).clip(1, 127)
+    return Sequence(start_time_vector, Vector(36), velocity_vector, Vector(0.25).rvs_normal(scale=0.01).clip(0.1, 1))
+
+
+def test_render_batch_midi(tmp_path):
+    parameters = parameter_grid(M=[3, 5, 7], theta=[0, 0.25])
+    paths = render_batch(recipe, parameters, str(tmp_path / "parallel"), processes=2, chunksize=2, seed=1)
+    serial = render_batch(recipe, parameters, str(tmp_path / "serial"), processes=0, chunksize=4, seed=1)
+    assert len(paths) == len(serial) == 6
+    for a, b in zip(paths, serial):
+        assert open(a, "rb").read() == open(b, "rb").read()
+
+
+def test_render_batch_npz(tmp_path):
+    parameters = parameter_grid(M=[3, 5], theta=[0, 0.5, 0.25])
+    render_batch(recipe, parameters, str(tmp_path), processes=2, chunksize=4, seed=2, format="npz")
+    notes, columns = load_store(str(tmp_path))
+    assert len(notes) == 3 * 3 + 3 * 5
+    assert np.array_equal(np.bincount(columns["job"]), [3, 3, 3, 5, 5, 5])
+
+
+def test_render_batch_keeps_global_state(tmp_path):
+    np.random.seed(5)
+    expected = np.random.random(3)
+    np.random.seed(5)
+    render_batch(recipe, parameter_grid(M=[3], theta=[0]), str(tmp_path), processes=0, seed=1)
+    assert np.array_equal(np.random.random(3), expected)
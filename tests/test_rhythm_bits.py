@@ -0,0 +1,35 @@
+from orthophonic.base import Sine_Zeros
+import itertools
+from orthophonic.rhythm import Rhythm
+import numpy as np
+
+
+def test_round_trip_and_algebra():
+    kick = Rhythm.from_sine_zeros(3, 16)
+    snare = Rhythm.from_onsets(Sine_Zeros(2, 16).add(4).project(np.arange(16)), 16)
+    assert kick.to_onsets()[0].tolist() == Sine_Zeros(3, 16).project(np.arange(16)).astype(int).tolist()
+    assert snare.to_onsets()[0].tolist() == [4, 12]
+    assert (kick | snare).popcount().tolist() == [5]
+    assert (kick & ~snare).to_onsets()[0].tolist() == kick.difference(snare).to_onsets()[0].tolist()
+    assert (~kick).popcount().tolist() == [13]
+
+
+def test_vectorized_operations():
+    for N in [8, 16, 70]:
+        rhythms = Rhythm.combinations(3, N) if N <= 16 else Rhythm.from_sine_zeros(np.arange(1, 20), N)
+        mask = rhythms.to_mask()
+        for shift in [1, 5, -3]:
+            assert np.array_equal(rhythms.roll(shift).to_mask(), np.roll(mask, shift, axis=1))
+        other = rhythms.roll(2)
+        assert np.array_equal(rhythms.hamming(other), (mask != np.roll(mask, 2, axis=1)).sum(axis=1))
+        assert np.array_equal(rhythms.popcount(), mask.sum(axis=1))
+        assert np.all(rhythms.jaccard(rhythms) == 1)
+    assert len(Rhythm.combinations(4, 16)) == 1820
+
+
+def test_combinations_order():
+    for M, N in [(0, 5), (3, 10), (5, 5), (6, 5), (2, 70), (3, 130)]:
+        rhythms = Rhythm.combinations(M, N)
+        expected = [list(onsets) for onsets in itertools.combinations(range(N), M)]
+        assert len(rhythms) == len(expected)
+        assert [onsets.tolist() for onsets in rhythms.to_onsets()] == expected
@@ -0,0 +1,69 @@
+from orthophonic.base import Vector, ScaleTable
+from orthophonic.utils import generate_scale, generate_scale_table
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("theta", [0, 1/6, 0.5])
+@pytest.mark.parametrize("scale", [0, 0.25, 1])
+def test_matches_project(theta, scale):
+    rng = np.random.default_rng(0)
+    pitches = np.concatenate([np.arange(-5, 140), rng.integers(0, 128, 5000), rng.uniform(-10, 140, 100), [np.nan]])
+    scale_vector = generate_scale(root=40, theta=theta)
+    table = generate_scale_table(root=40, theta=theta)
+    expected = Vector(pitches).project(scale_vector, scale=scale).array
+    assert np.array_equal(Vector(pitches).project(table, scale=scale).array, expected, equal_nan=True)
+    assert np.array_equal(Vector(pitches.copy(), copy=False).project(table, scale=scale).array, expected, equal_nan=True)
+    integers = Vector(pitches[5:133]).astype(int)
+    assert np.array_equal(integers.project(table, scale=scale).array, expected[5:133])
+
+
+def test_ties_and_inserted_zero():
+    # 5 is as close to 4 as to 6: the first element of the alphabet wins
+    for grid in ([6, 4, 20], [4, 6, 20]):
+        table = ScaleTable(grid)
+        pitches = np.arange(128)
+        expected = Vector(pitches).project(grid).array
+        assert np.array_equal(table.snap(pitches), expected)
+        assert table.snap_table[1] == 0
+    assert ScaleTable([6, 4, 20]).snap_table[5] == 6
+    assert ScaleTable([4, 6, 20]).snap_table[5] == 4
+
+
+def test_degree_and_octave():
+    table = ScaleTable(np.array([0, 2, 4, 5, 7, 9, 11]) + 12 * np.arange(11)[:, None])
+    pitches = np.array([60, 61, 62, 71, 72, 127])
+    assert table.snap(pitches).tolist() == [60, 60, 62, 71, 72, 127]
+    assert table.degree(pitches).tolist() == [0, 0, 1, 6, 0, 4]
+    assert table.octave(pitches).tolist() == [5, 5, 5, 5, 6, 10]
+    assert table.step(pitches).tolist() == [35, 35, 36, 41, 42, 74]
+    assert table.step(np.array([0, 1])).tolist() == [0, 0]
+    assert table.degree(np.array([60.5, 62])).tolist() == [0, 1]
+    assert table.octave(np.array([200.0])).tolist() == [10]
+
+
+def test_cached():
+    assert generate_scale_table(root=40) is generate_scale_table(root=28)
+    with pytest.raises(ValueError):
+        generate_scale_table().snap_table[0] = 1
+
+
+def test_degree_without_pitch_class_zero():
+    # D major: the inserted 0 is not a degree of the scale
+    table = ScaleTable(np.array([2, 4, 6, 7, 9, 11, 13]) + 12 * np.arange(10)[:, None])
+    assert table.classes.tolist() == [2, 4, 6, 7, 9, 11, 1]
+    pitches = np.array([62, 64, 73, 74, 0, 1, 2])
+    assert table.snap(pitches).tolist() == [62, 64, 73, 74, 0, 0, 2]
+    assert table.degree(pitches).tolist() == [0, 1, 6, 0, -1, -1, 0]
+    assert table.step(pitches).tolist() == [35, 36, 41, 42, -1, -1, 0]
+    assert table.octave(pitches).tolist() == [5, 5, 6, 6, 0, 0, 0]
+    assert table.degree(np.array([62.0, 0.5])).tolist() == [0, -1]
+    assert table.step(np.array([2.0, 0.25])).tolist() == [0, -1]
+
+
+def test_generated_scale_degrees():
+    # E minor (theta=1/6) from generate_scale: 0 is a clipped scale pitch, E is the first degree
+    table = generate_scale_table(root=40, theta=1/6)
+    assert table.classes.tolist()[0] == 4
+    assert table.degree(np.array([40, 52, 64])).tolist() == [0, 0, 0]
+    assert table.degree(np.array([42, 43])).tolist() == [1, 2]
@@ -0,0 +1,87 @@
+from orthophonic.base import Vector
+from orthophonic.scheduler import Scheduler, BeatClock, LiveClock
+from orthophonic.stream import rhythm_stream, sequence_stream
+import asyncio
+import time
+import pytest
+
+
+class Transport:
+    def __init__(self, clock):
+        self.clock = clock
+        self.messages = []
+
+    def cmd(self, msg, args=()):
+        self.messages.append((self.clock(), msg, args))
+
+
+def test_scheduler_sends_ahead_of_playhead(clip):
+    clock = BeatClock(bpm=3000)
+    transport = Transport(clock)
+    scheduler = Scheduler(clip, transport=transport, lookahead=2, clock=clock, interval=0.001)
+    scheduler.add_source(sequence_stream(rhythm_stream(3, 16), Vector(36)))
+    scheduler.add_source(sequence_stream(rhythm_stream(5, 16), Vector(41)))
+    clock.start()
+    stats = asyncio.run(scheduler.run(until=16))
+
+    assert stats.notes == 4 * (3 + 5)
+    assert len(transport.messages) == stats.messages == 8
+    for beat, msg, args in transport.messages:
+        first_start = min(args[3::5])
+        assert first_start - 2 - 0.5 <= beat
+    assert stats.min_lead <= 2
+    assert stats.jitter >= 0
+
+
+class FailingTransport:
+    def cmd(self, msg, args=()):
+        raise ConnectionError("Live is not running")
+
+
+def test_failed_send_is_raised(clip):
+    clock = BeatClock(bpm=6000)
+    scheduler = Scheduler(clip, transport=FailingTransport(), lookahead=2, clock=clock, interval=0.001)
+    scheduler.add_source(sequence_stream(rhythm_stream(3, 16), Vector(36)))
+    with pytest.raises(ConnectionError):
+        asyncio.run(scheduler.run(until=64))
+
+
+def test_looping_clip(clip):
+    clip.length = 8
+    clock = BeatClock(bpm=6000)
+    transport = Transport(clock)
+    scheduler = Scheduler(clip, transport=transport, lookahead=2, clock=clock, interval=0.001)
+    assert scheduler.loop_length == 8
+    scheduler.add_source(sequence_stream(rhythm_stream(3, 16), Vector(36)))
+    clock.start()
+    stats = asyncio.run(scheduler.run(until=16))
+
+    assert stats.notes == 12 and stats.messages == 8
+    removals = [args for _, msg, args in transport.messages if msg == "/live/clip/remove/notes"]
+    assert [args[4] for args in removals] == [0, 4, 0, 4]
+    assert all(args[2:4] == (0, 128) and args[5] == 4 for args in removals)
+    starts = [start for _, msg, args in transport.messages if msg == "/live/clip/add/notes" for start in args[3::5]]
+    assert all(0 <= start < 8 for start in starts)
+    assert sorted(starts[:3]) == sorted(starts[6:9])
+
+
+class LiveQuery:
+    def __init__(self):
+        self.queries = 0
+
+    def query(self, msg, args=()):
+        self.queries += 1
+        return {"/live/song/get/current_song_time": (32.0,), "/live/song/get/tempo": (120.0,)}[msg]
+
+
+def test_live_clock():
+    query = LiveQuery()
+    clock = LiveClock(query, resync=10)
+    first = clock()
+    time.sleep(0.05)
+    second = clock()
+    assert query.queries == 2
+    assert 32 <= first < second < 32 + 0.5
+    clock.resync = 0
+    clock()
+    assert query.queries == 4
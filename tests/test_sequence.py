@@ -0,0 +1,49 @@
+from orthophonic.base import Vector
+from orthophonic.sequence import Sequence, NoteBatch, Note
+import numpy as np
+
+
+def test_sequence_columns(make_sequence):
+    sequence = make_sequence(5, 36)
+    notes = sequence.get_notes()
+    assert len(notes) == 5
+    assert np.array_equal(sequence.notes.start_time, [note.start_time for note in notes])
+    assert all(note.pitch == 36 and note.velocity == 100 for note in notes)
+
+
+def test_merge_and_slice(make_sequence):
+    merged = Sequence.merge([make_sequence(3, 36), make_sequence(4, 41)])
+    assert len(merged) == 7
+    assert np.all(np.diff(merged.notes.start_time) >= 0)
+    assert isinstance(merged[2:], Sequence) and len(merged[2:]) == 5
+    assert merged[0].pitch in (36, 41)
+    assert len(NoteBatch.concatenate([])) == 0
+
+
+def test_note_list_write_through(make_sequence):
+    sequence = make_sequence(4, 36)
+    assert len(sequence.active_at(3.6)) == 0
+    notes = sequence.note_list
+    notes[1].pitch = 40
+    notes[2].start_time = 3.5
+    sequence[3].mute = True
+    assert sequence.notes.pitch.tolist() == [36, 40, 36, 36]
+    assert sequence.notes.start_time[2] == 3.5
+    assert sequence.notes.mute.tolist() == [False, False, False, True]
+    # the index is rebuilt after the edit
+    assert sequence.active_at(3.6).notes.start_time.tolist() == [3.5]
+
+    sequence.note_list = notes[:2] + [Note(60, 90, 8, 1)]
+    assert sequence.notes.pitch.tolist() == [36, 40, 60]
+    assert sequence.notes.velocity.tolist() == [100, 100, 90]
+
+
+def test_default_columns():
+    sequence = Sequence(Vector([0, 0.5, 1]), Vector(36.7))
+    assert sequence.notes.pitch.tolist() == [36] * 3
+    assert sequence.notes.velocity.tolist() == [100] * 3
+    assert sequence.notes.duration.tolist() == [0.5] * 3
+    sequence = Sequence(Vector([0, 0.5, 1, 1.5, 2]), Vector([36, 38]), Vector([90.5, 80]), Vector([0.25, 0.5, 1]))
+    assert sequence.notes.pitch.tolist() == [36, 38, 36, 38, 36]
+    assert sequence.notes.velocity.tolist() == [90, 80, 90, 80, 90]
+    assert sequence.notes.duration.tolist() == [0.25, 0.5, 1, 0.25, 0.5]
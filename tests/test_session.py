@@ -0,0 +1,59 @@
+from orthophonic.ableton import ClipSync
+from orthophonic.session import Session, MockTransport
+from orthophonic.utils import create_clip
+import pytest
+
+
+def test_lazy_queries():
+    transport = MockTransport([True] * 50, clips={(3, 1): 8})
+    session = Session(transport)
+    clip = create_clip(session, 3, 1, 16, erase=True)
+    # one query for the track type and one for the clip slot, whatever the size of the set
+    assert session.queries == 2 and session.messages == 1
+    assert transport.messages[-1] == ("/live/clip/remove/notes", (3, 1))
+    assert clip.track.index == 3 and clip.index == 1 and clip.length == 8
+
+    assert create_clip(session, 3, 1, 16, erase=False) is clip
+    assert session.queries == 3
+
+    new_clip = create_clip(session, 3, 2, 16)
+    assert new_clip.length == 16 and transport.clips[(3, 2)]["length"] == 16
+    assert transport.count("/live/clip_slot/create_clip") == 1
+    assert len(session.tracks) == 50
+
+
+def test_audio_track_and_existing_clip():
+    session = Session(MockTransport([False, True], clips={(1, 0): 4}))
+    with pytest.raises(ValueError):
+        create_clip(session, 0, 0, 16)
+    with pytest.raises(ValueError):
+        session.track(1).create_clip(0, 16)
+
+
+def test_refresh():
+    transport = MockTransport([True, True])
+    session = Session(transport)
+    assert session.clip(0, 0) is None
+    transport.clips[(0, 0)] = {"length": 4, "notes": []}
+    assert session.clip(0, 0) is None
+    session.refresh(0, 0)
+    assert session.clip(0, 0).length == 4
+    track = session.track(1)
+    session.refresh(1)
+    assert session.track(1) is not track
+    session.refresh()
+    assert session.track(0).clips._clips == {}
+
+
+def test_many_clip_writes_share_the_transport(make_sequence):
+    transport = MockTransport([True] * 8)
+    session = Session(transport)
+    sync = ClipSync()
+    for track in range(8):
+        clip = create_clip(session, track, 0, 4)
+        make_sequence(4, 36 + track, N=4, step=1, duration=0.5).send_to_ableton(clip)
+        make_sequence(4, 36 + track, N=4, step=1, duration=0.5).send_to_ableton(clip, sync=sync)
+    assert session.queries == 16
+    assert transport.count("/live/clip/add/notes") == 16
+    assert all(len(transport.clips[(track, 0)]["notes"]) == 4 for track in range(8))
+    assert all(note[0] == 36 + track for track in range(8) for note in transport.clips[(track, 0)]["notes"])
@@ -0,0 +1,58 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.snapshot import save_vector, load_vector, save_sequence, load_sequence, load_columns
+import numpy as np
+import pytest
+
+
+def test_vector_round_trip(tmp_path):
+    filename = str(tmp_path / "vector.snap")
+    vector = Sine_Zeros(5, 16, theta=0.3).project(np.arange(16)).astype(int)
+    save_vector(vector, filename)
+    loaded = load_vector(filename)
+    assert loaded.array.dtype == vector.array.dtype
+    assert np.array_equal(loaded.array, vector.array)
+    assert np.array_equal(load_vector(filename, mmap=False).array, vector.array)
+
+
+def test_sequence_round_trip(tmp_path):
+    filename = str(tmp_path / "sequence.snap")
+    velocity_vector = Vector(100).resize(4000).rvs_normal(scale=10, rng=0)
+    sequence = Sequence(Vector(np.arange(4000)).multiply(0.25), Vector([36, 38, 42]), velocity_vector, Vector(0.1))
+    sequence.notes.data["mute"][::7] = True
+    save_sequence(sequence, filename)
+
+    loaded = load_sequence(filename)
+    assert np.array_equal(loaded.notes.data, sequence.notes.data)
+    assert np.array_equal(load_sequence(filename, mmap=False).notes.data, sequence.notes.data)
+    window = load_sequence(filename, start=1000, stop=1010)
+    assert np.array_equal(window.notes.data, sequence.notes.data[1000:1010])
+
+    # each field is a contiguous column of the file
+    columns = load_columns(filename)
+    for name in ["pitch", "start_time", "duration", "velocity", "mute"]:
+        assert isinstance(columns[name], np.memmap)
+        assert columns[name].strides == (columns[name].itemsize,)
+        assert np.array_equal(columns[name], sequence.notes.data[name])
+    offsets = [columns[name].offset for name in columns]
+    assert offsets == sorted(offsets) and offsets[1] - offsets[0] >= 4000 * 8
+
+
+def test_invalid_file(tmp_path):
+    filename = tmp_path / "invalid.snap"
+    filename.write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError):
+        load_sequence(str(filename))
+
+
+def test_path_like(tmp_path):
+    vector = Vector([1.0, 2.0, 3.0])
+    path = tmp_path / "vector.snap"
+    save_vector(vector, path)
+    assert np.array_equal(load_vector(path).array, vector.array)
+
+
+def test_empty_sequence(tmp_path):
+    filename = tmp_path / "empty.snap"
+    save_sequence(Sequence(Vector([]), Vector(36)), filename)
+    assert len(load_sequence(filename)) == 0
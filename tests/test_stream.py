@@ -0,0 +1,34 @@
+from orthophonic.base import Vector, Sine_Zeros
+from orthophonic.sequence import Sequence
+from orthophonic.stream import rhythm_stream, sequence_stream
+import itertools
+import numpy as np
+
+
+def test_stream_matches_repeated_pattern():
+    chunks = sequence_stream(rhythm_stream(5, 16, theta=0.3), Vector(36), Vector(90), Vector(0.25))
+    merged = Sequence.merge(itertools.islice(chunks, 4))
+
+    start_time_vector = Sine_Zeros(5, 16, theta=0.3, repeat=4).project(np.arange(64)).multiply(0.25)
+    expected = Sequence(start_time_vector, Vector(36), Vector(90), Vector(0.25))
+    assert np.allclose(merged.notes.start_time, expected.notes.start_time)
+    assert np.array_equal(merged.notes.pitch, expected.notes.pitch)
+
+
+def test_evolving_unbounded_stream():
+    pitches = (Vector([36, 38]) for _ in itertools.count())
+    velocity = lambda bar, length: Vector(100).resize(length).add(-bar).clip(1, 127)
+    chunks = sequence_stream(rhythm_stream(lambda bar: 2 + bar % 3, 16), pitches, velocity)
+    for bar, sequence in enumerate(itertools.islice(chunks, 1000)):
+        assert len(sequence) == 2 + bar % 3
+        assert np.all(sequence.notes.start_time >= 4 * bar)
+        assert np.all(sequence.notes.velocity == max(100 - bar, 1))
+
+
+def test_numpy_scalar_sources():
+    pitch = np.array([36, 41])[0]
+    stream = sequence_stream(rhythm_stream(3, 16), pitch, velocity=np.float32(90), duration=iter([np.int32(1)] * 2))
+    for chunk in itertools.islice(stream, 2):
+        assert chunk.notes.pitch.tolist() == [36, 36, 36]
+        assert chunk.notes.velocity.tolist() == [90, 90, 90]
+        assert chunk.notes.duration.tolist() == [1, 1, 1]